@@ -0,0 +1,166 @@
+from datetime import date
+
+import numpy as np
+
+NEW_WINDOW_DAYS = 30
+ADULT_AGE = 18
+
+
+def day_ordinals(values):
+    """Parse "YYYY-MM-DD" strings into int64 days since the epoch in one C pass.
+
+    Missing or malformed dates become NaT; callers mask them out with `valid`.
+    """
+    cleaned = [v[:10] if isinstance(v, str) and v else "NaT" for v in values]
+    try:
+        days = np.array(cleaned, dtype="datetime64[D]")
+    except ValueError:
+        days = np.array([_parse_day(v) for v in cleaned], dtype="datetime64[D]")
+    return days.astype(np.int64), ~np.isnat(days)
+
+
+def _parse_day(value):
+    try:
+        return np.datetime64(value, "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+def ordinal(day):
+    return np.datetime64(day, "D").astype(np.int64)
+
+
+def month_index(days):
+    # Months since the epoch for an array of day ordinals.
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def years_ago(day, years):
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        # 29 February in a non-leap target year.
+        return day.replace(year=day.year - years, day=28)
+
+
+def daily_counts(days, start, length, weights=None):
+    """Per-day totals for `length` days from `start` (a day ordinal)."""
+    offsets = days - start
+    inside = (offsets >= 0) & (offsets < length)
+    return np.bincount(
+        offsets[inside],
+        weights=None if weights is None else weights[inside],
+        minlength=length,
+    )[:length]
+
+
+def select(rows, mask):
+    return [rows[i] for i in np.flatnonzero(mask)]
+
+
+class PatientAnalytics:
+    """Every patient KPI and chart series from a single pass over the records."""
+
+    def __init__(self, patients, today=None):
+        self.rows = patients
+        today = today or date.today()
+        self.today = today
+
+        added, dob, gender = [], [], []
+        for pat in patients:
+            added.append(pat.get("date_added"))
+            dob.append(pat.get("patient_dob"))
+            gender.append((pat.get("patient_gender") or "").lower())
+
+        added, added_ok = day_ordinals(added)
+        dob, dob_ok = day_ordinals(dob)
+        gender = np.array(gender, dtype=object)
+        today_ord = ordinal(today)
+
+        self.masks = {
+            "total": np.ones(len(patients), dtype=bool),
+            "new": added_ok & (added >= today_ord - NEW_WINDOW_DAYS) & (added <= today_ord),
+            "adults": dob_ok & (dob <= ordinal(years_ago(today, ADULT_AGE))),
+            "children": dob_ok & (dob > ordinal(years_ago(today, ADULT_AGE))),
+            "male": gender == "male",
+            "female": gender == "female",
+        }
+        self.counts = {name: int(mask.sum()) for name, mask in self.masks.items()}
+
+        week = daily_counts(added[added_ok], today_ord - 6, 7)
+        self.weekly_days = [date.fromordinal(today.toordinal() - i) for i in range(6, -1, -1)]
+        self.weekly_counts = week.astype(int).tolist()
+
+        first = today.replace(day=1)
+        month = daily_counts(added[added_ok], ordinal(first), today.day)
+        self.month_days = [first.replace(day=d) for d in range(1, today.day + 1)]
+        self.monthly_counts = month.astype(int).tolist()
+
+    def select(self, name):
+        return select(self.rows, self.masks[name])
+
+
+class DrugAnalytics:
+    """Drug stock KPIs; every status is a mask over the same parsed columns."""
+
+    def __init__(self, drugs, today=None):
+        self.rows = drugs
+        today = today or date.today()
+
+        added, expiry, quantity = [], [], []
+        for drug in drugs:
+            added.append(drug.get("date_added"))
+            expiry.append(drug.get("drug_expiry"))
+            quantity.append(drug.get("drug_quantity") or 0)
+
+        added, added_ok = day_ordinals(added)
+        expiry, expiry_ok = day_ordinals(expiry)
+        quantity = np.array(quantity, dtype=np.float64)
+        today_ord = ordinal(today)
+
+        expired = expiry_ok & (expiry <= today_ord)
+        available = quantity > 0
+        self.masks = {
+            "total": np.ones(len(drugs), dtype=bool),
+            "new": added_ok & (added >= today_ord - NEW_WINDOW_DAYS) & (added <= today_ord),
+            "expired": expired,
+            "safe": expiry_ok & (expiry > today_ord),
+            "available": available,
+            "depleted": ~available,
+            "sellable": available & ~expired,
+        }
+        self.counts = {name: int(mask.sum()) for name, mask in self.masks.items()}
+
+    def select(self, name):
+        return select(self.rows, self.masks[name])
+
+
+class BillingAnalytics:
+    """Monthly revenue totals and this month's daily revenue series."""
+
+    def __init__(self, billings, today=None):
+        self.rows = billings
+        today = today or date.today()
+
+        created, totals = [], []
+        for bill in billings:
+            created.append(bill.get("created_at"))
+            totals.append(bill.get("total") or 0)
+
+        created, created_ok = day_ordinals(created)
+        totals = np.array(totals) if totals else np.zeros(0)
+        if totals.dtype.kind not in "iuf":
+            totals = totals.astype(np.float64)
+        created, totals = created[created_ok], totals[created_ok]
+
+        months = month_index(created)
+        this_month = month_index(np.array([ordinal(today)]))[0]
+        self.this_month_total = totals[months == this_month].sum().item()
+        self.last_month_total = totals[months == this_month - 1].sum().item()
+
+        first = today.replace(day=1)
+        daily = daily_counts(created, ordinal(first), today.day, weights=totals.astype(np.float64))
+        if totals.dtype.kind in "iu":
+            daily = daily.astype(np.int64)
+        self.month_days = [first.replace(day=d) for d in range(1, today.day + 1)]
+        self.daily_revenue = daily.tolist()
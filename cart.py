@@ -0,0 +1,88 @@
+class Cart:
+    """POS cart lines with a running grand total.
+
+    Each drug has at most one line; adding it again raises that line's
+    quantity. Every change reports only the affected line to
+    `on_change(action, index, line)` with action "add", "edit" or "remove"
+    ("clear" passes None for both), so a view can patch a single row.
+    """
+
+    def __init__(self, on_change=None):
+        self.lines = []
+        self.total = 0
+        self.on_change = on_change
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def index(self, line_id):
+        for i, line in enumerate(self.lines):
+            if line["line_id"] == line_id:
+                return i
+        raise KeyError(line_id)
+
+    def line(self, line_id):
+        return self.lines[self.index(line_id)]
+
+    def qty_of(self, drug_id):
+        return sum(line["qty"] for line in self.lines if line["drug_id"] == drug_id)
+
+    def add(self, drug: dict, qty: int):
+        for line in self.lines:
+            if line["drug_id"] == drug.get("drug_id"):
+                return self.set_qty(line["line_id"], line["qty"] + qty)
+
+        self.next_id += 1
+        price = drug.get("drug_price") or 0
+        line = {
+            "line_id": self.next_id,
+            "drug_id": drug.get("drug_id"),
+            "item": drug.get("drug_name"),
+            "price": price,
+            "qty": qty,
+            "net_price": price * qty,
+            "drug": dict(drug),
+        }
+        self.lines.append(line)
+        self.total += line["net_price"]
+        self.changed("add", len(self.lines) - 1, line)
+        return line
+
+    def set_qty(self, line_id, qty: int):
+        index = self.index(line_id)
+        line = self.lines[index]
+        net_price = line["price"] * qty
+        self.total += net_price - line["net_price"]
+        line["qty"] = qty
+        line["net_price"] = net_price
+        self.changed("edit", index, line)
+        return line
+
+    def remove(self, line_id):
+        index = self.index(line_id)
+        line = self.lines.pop(index)
+        # An empty cart is exactly zero, whatever float drift edits left behind.
+        self.total = self.total - line["net_price"] if self.lines else 0
+        self.changed("remove", index, line)
+        return line
+
+    def restore(self, lines: list):
+        """Append previously removed lines as they were (e.g. a rejected sale)."""
+        for line in lines:
+            self.lines.append(line)
+            self.total += line["net_price"]
+            self.next_id = max(self.next_id, line["line_id"])
+            self.changed("add", len(self.lines) - 1, line)
+
+    def clear(self):
+        self.lines = []
+        self.total = 0
+        self.changed("clear", None, None)
+
+    def changed(self, action, index, line):
+        if self.on_change:
+            self.on_change(action, index, line)
@@ -0,0 +1,116 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+from kivy.clock import mainthread
+from kivy.graphics.texture import Texture
+from kivy.uix.image import Image
+
+from tasks import POOL
+
+CHART_CACHE_SIZE = 24
+
+# matplotlib's font cache and text layout are not thread-safe, so only one
+# pool worker draws at a time.
+DRAW_LOCK = Lock()
+
+
+class ChartImage:
+    """A rendered chart: raw RGBA pixels plus the texture made from them."""
+
+    def __init__(self, width, height, pixels):
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+        self._texture = None
+
+    def texture(self):
+        # Textures belong to the GL context, so this must run on the main
+        # thread; it is built once and reused for every later display.
+        if self._texture is None:
+            texture = Texture.create(size=(self.width, self.height), colorfmt="rgba")
+            texture.blit_buffer(self.pixels, colorfmt="rgba", bufferfmt="ubyte")
+            texture.flip_vertical()
+            self._texture = texture
+        return self._texture
+
+
+def chart_key(name, inputs, figsize, dpi):
+    return hashlib.sha1(repr((name, inputs, figsize, dpi)).encode()).hexdigest()
+
+
+class ChartRenderer:
+    """Draws matplotlib charts on the task pool and shows them as textures.
+
+    `draw(fig, *inputs)` builds the chart on a plain Figure (never pyplot, so
+    nothing is registered globally); drawing holds `DRAW_LOCK`. The
+    rendered pixels are cached by a hash of the chart's inputs, so an
+    unchanged series is displayed without drawing it again.
+    """
+
+    def __init__(self, max_entries=CHART_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.lock = Lock()
+        self.latest = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, name, draw, inputs, target, figsize, dpi=100):
+        key = chart_key(name, inputs, figsize, dpi)
+        with self.lock:
+            self.latest[name] = key
+            image = self.cache.get(key)
+            if image is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if image is not None:
+            show_chart(target, image)
+            return
+
+        POOL.cancel(f"chart-{name}")
+        POOL.submit(self._render, name, key, draw, inputs, target, figsize, dpi, group=f"chart-{name}")
+
+    def _render(self, name, key, draw, inputs, target, figsize, dpi):
+        # matplotlib is imported here, on a pool worker, so its import cost
+        # is never paid on the main thread or at startup.
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        with DRAW_LOCK:
+            fig = Figure(figsize=figsize, dpi=dpi)
+            canvas = FigureCanvasAgg(fig)
+            try:
+                draw(fig, *inputs)
+                canvas.draw()
+                buffer = canvas.buffer_rgba()
+                height, width = buffer.shape[:2]
+                image = ChartImage(width, height, bytes(buffer))
+            finally:
+                fig.clear()
+                del canvas, fig
+
+        with self.lock:
+            self.cache[key] = image
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+            # Skip the display if a newer render of this chart was requested meanwhile.
+            current = self.latest.get(name) == key
+        if current:
+            show_chart(target, image)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+@mainthread
+def show_chart(target, image):
+    target.clear_widgets()
+    target.add_widget(Image(texture=image.texture(), fit_mode="contain"))
+
+
+CHARTS = ChartRenderer()
@@ -1,9 +1,57 @@
-from kivy.storage.jsonstore import JsonStore
 import os, sys, platform
 
-SERVER_URL = "https://neptunev2.onrender.com/"
+from settings import SettingsStore, HospitalContext
+from startup import TRACER
+
+SERVER_URL = os.environ.get("NEPTUNE_SERVER_URL", "https://neptunev2.onrender.com/")
 #SERVER_URL = "http://127.0.0.1:8000/"
 
+# Seconds a search field must stay idle before a search request is sent.
+SEARCH_DEBOUNCE = 0.35
+
+# Seconds a list view's last result set may be re-sorted locally before
+# a sort goes back to the server.
+RESULTS_TTL = 60
+
+# Rows per page when a list view maps its rows into the RecycleView, and
+# per request when a first sync pages through an entity's full listing.
+PAGE_SIZE = 50
+SYNC_PAGE_SIZE = 500
+
+# Screens other than home are built on first navigation. When pre-warming
+# is on they are also built one per frame, starting this many seconds
+# after the app has started.
+PREWARM_SCREENS = True
+PREWARM_DELAY = 1.5
+
+# The hosted backend sleeps after about 15 minutes without traffic; the
+# keepalive pings it once the app has sent nothing for this many seconds.
+KEEPALIVE_IDLE = 600
+
+# Median seconds to a server response above which the connection is
+# reported as degraded rather than online.
+DEGRADED_LATENCY = 3.0
+
+# GET responses kept, already parsed, for conditional requests.
+HTTP_CACHE_ENTRIES = 200
+
+# Seconds a fetch_* result is reused before going back to the network,
+# per entity. A write to an entity clears its results straight away.
+FETCH_CACHE_TTLS = {
+    "services": 300,
+    "lab_tests": 300,
+    "workers": 300,
+    "drugs": 60,
+    "patients": 60,
+    "billings": 30,
+}
+FETCH_CACHE_DEFAULT_TTL = 30
+# Rows held across all cached results before the least recently used go.
+FETCH_CACHE_MAX_ROWS = 20000
+
+# Frames longer than this (seconds) count as jank when NEPTUNE_JANK is set.
+JANK_BUDGET = 0.05
+
 
 def get_app_data_path(filename):
     system = platform.system()
@@ -23,7 +71,9 @@ def get_app_data_path(filename):
 json_path = get_app_data_path("hospital_data.json")
 
 
-STORE = JsonStore(json_path)
+with TRACER.span("settings store load"):
+    STORE = SettingsStore(get_app_data_path("hospital_data.db"), legacy_json=json_path)
+    HOSPITAL = HospitalContext(STORE)
 
 
 def resource_path(relative_path):
@@ -0,0 +1,104 @@
+import time
+from collections import deque
+from threading import Lock
+
+from config import SERVER_URL, DEGRADED_LATENCY
+from keepalive import KEEPALIVE
+from network import HTTP
+
+UNKNOWN = "unknown"
+ONLINE = "online"
+DEGRADED = "degraded"
+OFFLINE = "offline"
+
+# Outcomes of recent server calls that decide between online and degraded.
+RECENT_REQUESTS = 20
+RECENT_WINDOW = 120
+# Share of recent calls that failed (unreachable or 5xx) that counts as degraded.
+DEGRADED_ERROR_RATE = 0.25
+# Seconds without any server traffic after which a read asks for a probe.
+STALE_AFTER = 60
+
+
+class ConnectivityMonitor:
+    """Cached online/degraded/offline state of the link to the server.
+
+    The state comes from the outcome of every request the app already
+    makes. When nothing has been heard for a while, reading it asks the
+    keepalive thread for a background HEAD probe. Reads never block, and
+    `subscribe` reports each change instead of callers polling.
+    """
+
+    def __init__(self, http=HTTP, keepalive=KEEPALIVE, base_url=SERVER_URL):
+        self.keepalive = keepalive
+        self.base_url = base_url
+        self.lock = Lock()
+        self.recent = deque(maxlen=RECENT_REQUESTS)
+        self.state = UNKNOWN
+        self.changed_at = time.time()
+        self.last_heard = None
+        self.listeners = []
+        http.observers.append(self.observe)
+
+    def observe(self, url, seconds, status, error):
+        if not url.startswith(self.base_url):
+            return
+        now = time.monotonic()
+        with self.lock:
+            self.last_heard = now
+            self.recent.append((now, error is None, error is None and status < 500, seconds))
+            state = self.classify(now)
+            previous, self.state = self.state, state
+            if state == previous:
+                return
+            self.changed_at = time.time()
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(state, previous)
+            except Exception as e:
+                print(f"Connectivity listener failed: {e}")
+
+    def classify(self, now):
+        latest = self.recent[-1]
+        if not latest[1]:
+            return OFFLINE
+        recent = [r for r in self.recent if now - r[0] <= RECENT_WINDOW]
+        failed = sum(1 for r in recent if not r[2])
+        slow = sorted(r[3] for r in recent if r[1])
+        if failed / len(recent) >= DEGRADED_ERROR_RATE:
+            return DEGRADED
+        if slow and slow[len(slow) // 2] > DEGRADED_LATENCY:
+            return DEGRADED
+        return ONLINE
+
+    def current(self):
+        """The cached state; asks for a background probe when it has gone stale."""
+        with self.lock:
+            stale = self.last_heard is None or time.monotonic() - self.last_heard > STALE_AFTER
+            state = self.state
+        if stale:
+            self.keepalive.probe()
+        return state
+
+    def is_online(self):
+        # Unknown counts as online so nothing is held back before the first
+        # request has finished; the request itself will say otherwise.
+        return self.current() != OFFLINE
+
+    def subscribe(self, listener):
+        """Call `listener(state, previous)` from the reporting thread on every change."""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def stats(self):
+        with self.lock:
+            return {"state": self.state, "changed_at": self.changed_at, "recent": len(self.recent)}
+
+
+CONNECTIVITY = ConnectivityMonitor()
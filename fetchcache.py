@@ -0,0 +1,125 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from config import HOSPITAL, FETCH_CACHE_TTLS, FETCH_CACHE_DEFAULT_TTL, FETCH_CACHE_MAX_ROWS
+from netmetrics import endpoint
+from outbox import OUTBOX
+
+# First path segment of a write URL -> the entities whose lists it changes.
+# A drug sale also bills the patient.
+WRITE_ENTITIES = {
+    "patients": ("patients",),
+    "drugs": ("drugs", "billings"),
+    "workers": ("workers",),
+    "services": ("services",),
+    "lab_tests": ("lab_tests",),
+    "diagnosis": ("diagnoses",),
+    "prescription": ("prescriptions",),
+    "appointments": ("appointments",),
+    "lab_requests": ("lab_requests",),
+    "lab_results": ("lab_results",),
+    "billings": ("billings",),
+}
+
+
+class FetchCache:
+    """Results of the `fetch_*` helpers, reused across screens for a short while.
+
+    Entries are keyed by (entity, intent, sort_term, sort_dir, term), scoped
+    to the signed-in hospital so one never sees another's rows, and live
+    for their entity's TTL. The least recently used ones are dropped
+    once the cached lists hold more than `max_rows` rows between them. A
+    write to an entity that the outbox gets applied drops every entry of
+    that entity, and a fetch that was already under way when that happened
+    does not put its result back.
+    """
+
+    def __init__(self, ttls=FETCH_CACHE_TTLS, default_ttl=FETCH_CACHE_DEFAULT_TTL, max_rows=FETCH_CACHE_MAX_ROWS):
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.max_rows = max_rows
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.rows = 0
+        self.generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """The cached rows for `key`, or None."""
+        key = _scoped(key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() >= entry[0]:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def storer(self, key):
+        """A function that caches rows for `key`, unless its entity is written to first."""
+        entity = key[0]
+        key = _scoped(key)
+        with self.lock:
+            generation = self.generations.get(entity, 0)
+
+        def store(rows):
+            if not isinstance(rows, list):
+                return
+            with self.lock:
+                if self.generations.get(entity, 0) != generation:
+                    return
+                if key in self.entries:
+                    self._drop(key)
+                ttl = self.ttls.get(entity, self.default_ttl)
+                self.entries[key] = (time.monotonic() + ttl, rows)
+                self.rows += len(rows)
+                while self.rows > self.max_rows and len(self.entries) > 1:
+                    self._drop(next(iter(self.entries)))
+
+        return store
+
+    def _drop(self, key):
+        self.rows -= len(self.entries.pop(key)[1])
+
+    def invalidate(self, entity):
+        with self.lock:
+            self.generations[entity] = self.generations.get(entity, 0) + 1
+            for key in [k for k in self.entries if k[1] == entity]:
+                self._drop(key)
+            self.invalidations += 1
+
+    def on_write(self, method, url):
+        for entity in WRITE_ENTITIES.get(endpoint(url).split("/")[0], ()):
+            self.invalidate(entity)
+
+    def clear(self):
+        with self.lock:
+            for entity in {k[1] for k in self.entries}:
+                self.generations[entity] = self.generations.get(entity, 0) + 1
+            self.entries.clear()
+            self.rows = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "rows": self.rows,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+def _scoped(key):
+    return (HOSPITAL.id, *key)
+
+
+FETCHES = FetchCache()
+OUTBOX.subscribe(FETCHES.on_write)
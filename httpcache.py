@@ -0,0 +1,75 @@
+from collections import OrderedDict
+from threading import Lock
+
+from config import HTTP_CACHE_ENTRIES
+
+
+class CachedResponse:
+    __slots__ = ("etag", "last_modified", "data")
+
+    def __init__(self, etag, last_modified, data):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.data = data
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ConditionalCache:
+    """Parsed JSON bodies of GET responses, kept with their validators.
+
+    A response that carries an ETag or Last-Modified header is stored
+    under its URL, already decoded. The next GET of that URL sends the
+    validators back, and on 304 Not Modified the stored object is handed
+    out as is, without downloading or parsing the body again. Callers
+    share that object, so they must not mutate it. The least recently used
+    URLs are dropped past `max_entries`.
+    """
+
+    def __init__(self, max_entries=HTTP_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                self.entries.move_to_end(url)
+            return entry
+
+    def store(self, url, response, data):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self.lock:
+            if not etag and not last_modified:
+                self.entries.pop(url, None)
+                return
+            self.entries[url] = CachedResponse(etag, last_modified, data)
+            self.entries.move_to_end(url)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def miss(self):
+        with self.lock:
+            self.misses += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
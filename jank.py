@@ -0,0 +1,208 @@
+"""Opt-in main-thread stall (jank) detector.
+
+Run with NEPTUNE_JANK=1 (or =overlay to also show the last stall in the
+window's corner, or =<directory> to choose where the files go). Every
+frame longer than JANK_BUDGET is appended to jank.log with the Python
+stack of whatever held the UI thread (a list mapping, `calculate`, a
+chart being plotted), and on exit jank-report.json totals the stalls per
+function, worst first.
+"""
+import json
+import os
+import sys
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from threading import Lock, Thread, main_thread
+
+from kivy.clock import Clock
+from kivy.metrics import dp, sp
+
+from config import JANK_BUDGET, get_app_data_path
+
+ENV_VAR = "NEPTUNE_JANK"
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+STACK_DEPTH = 12
+
+
+class JankMonitor:
+    """Finds what blocks the UI thread for longer than a frame budget.
+
+    A Clock callback stamps every frame. A watchdog thread checks that
+    stamp every half budget and, while the main thread is overdue, samples
+    its Python stack. When the late frame finally arrives its duration is
+    charged to the app function seen most often in those samples, so the
+    report names the callback that stalled rather than just the late frame.
+    Stalls go to a log file as they happen; `report()` aggregates them per
+    function and is written out on `stop()`.
+    """
+
+    def __init__(self, budget=JANK_BUDGET, out_dir=None, overlay=False):
+        self.budget = budget
+        self.out_dir = out_dir or os.path.dirname(get_app_data_path("jank-report.json"))
+        self.overlay = overlay
+        self.lock = Lock()
+        self.running = False
+        self.last_tick = None
+        self.samples = []
+        self.label = None
+
+        self.frames = 0
+        self.slow_frames = 0
+        self.worst_ms = 0.0
+        self.functions = {}
+
+    def start(self):
+        if self.running:
+            return
+        self.main_id = main_thread().ident
+        self.last_tick = time.perf_counter()
+        self.running = True
+        self.event = Clock.schedule_interval(self.tick, 0)
+        Thread(target=self.watch, name="jank-watchdog", daemon=True).start()
+        if self.overlay:
+            self.show_overlay()
+        print(f"Jank monitor on: frames over {self.budget * 1000:.0f} ms are logged to {self.log_path()}")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        self.event.cancel()
+        path = os.path.join(self.out_dir, "jank-report.json")
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"Jank report written to {path}")
+
+    def tick(self, dt):
+        now = time.perf_counter()
+        with self.lock:
+            elapsed = now - self.last_tick
+            self.last_tick = now
+            samples, self.samples = self.samples, []
+        self.frames += 1
+        if elapsed > self.budget:
+            self.record(elapsed * 1000, samples)
+
+    def watch(self):
+        while self.running:
+            time.sleep(self.budget / 2)
+            with self.lock:
+                overdue = time.perf_counter() - self.last_tick > self.budget
+            if not overdue:
+                continue
+            frame = sys._current_frames().get(self.main_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            with self.lock:
+                self.samples.append(stack)
+
+    def record(self, ms, samples):
+        key, stack = attribute(samples)
+        self.slow_frames += 1
+        self.worst_ms = max(self.worst_ms, ms)
+        entry = self.functions.setdefault(key, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "stack": stack})
+        entry["count"] += 1
+        entry["total_ms"] += ms
+        if ms >= entry["max_ms"]:
+            entry["max_ms"] = ms
+            entry["stack"] = stack
+
+        try:
+            with open(self.log_path(), "a") as f:
+                f.write(f"{datetime.now().isoformat(timespec='milliseconds')} {ms:.0f} ms in {key}\n")
+                f.writelines(f"    {line}\n" for line in stack)
+        except OSError as e:
+            print(f"Could not write jank log: {e}")
+        if self.label is not None:
+            self.label.text = f"{ms:.0f} ms in {key} ({self.slow_frames}/{self.frames} slow)"
+
+    def report(self):
+        functions = sorted(self.functions.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        return {
+            "budget_ms": round(self.budget * 1000, 1),
+            "frames": self.frames,
+            "slow_frames": self.slow_frames,
+            "worst_ms": round(self.worst_ms, 1),
+            "functions": [
+                {
+                    "function": key,
+                    "count": entry["count"],
+                    "total_ms": round(entry["total_ms"], 1),
+                    "max_ms": round(entry["max_ms"], 1),
+                    "stack": entry["stack"],
+                }
+                for key, entry in functions
+            ],
+        }
+
+    def log_path(self):
+        return os.path.join(self.out_dir, "jank.log")
+
+    def show_overlay(self):
+        from kivy.core.window import Window
+        from kivy.uix.label import Label
+
+        self.label = Label(
+            text="",
+            size_hint=(None, None),
+            size=(dp(420), dp(24)),
+            font_size=sp(12),
+            color=(1, 0, 0, 1),
+            halign="right",
+            valign="middle",
+        )
+        self.label.bind(size=lambda inst, val: setattr(inst, "text_size", val))
+
+        def place(*args):
+            self.label.pos = (Window.width - self.label.width - dp(8), Window.height - self.label.height - dp(8))
+
+        Window.bind(size=place)
+        place()
+        Window.add_widget(self.label)
+
+
+def attribute(samples):
+    """(function key, formatted stack) for the app code most often on top of `samples`."""
+    if not samples:
+        return "(between samples)", []
+    keys = Counter()
+    first = {}
+    for stack in samples:
+        key = app_frame(stack)
+        keys[key] += 1
+        first.setdefault(key, stack)
+    key = keys.most_common(1)[0][0]
+    stack = first[key][-STACK_DEPTH:]
+    return key, [f"{relative(fs.filename)}:{fs.lineno} in {fs.name}" for fs in stack]
+
+
+def app_frame(stack):
+    # Innermost frame in the app's own code; library frames (Kivy, requests,
+    # matplotlib) are charged to the app function that called into them.
+    for fs in reversed(stack):
+        path = os.path.abspath(fs.filename)
+        if path.startswith(APP_ROOT) and path != os.path.abspath(__file__):
+            return f"{relative(path)}:{fs.name}"
+    fs = stack[-1]
+    return f"{relative(fs.filename)}:{fs.name}"
+
+
+def relative(path):
+    path = os.path.abspath(path)
+    return os.path.relpath(path, APP_ROOT) if path.startswith(APP_ROOT) else path
+
+
+def from_env(environ=None):
+    """A monitor configured by NEPTUNE_JANK (1/log, overlay, or a log directory), or None."""
+    value = (environ if environ is not None else os.environ).get(ENV_VAR, "")
+    if value.lower() in ("", "0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes", "log"):
+        return JankMonitor()
+    if value.lower() == "overlay":
+        return JankMonitor(overlay=True)
+    os.makedirs(value, exist_ok=True)
+    return JankMonitor(out_dir=value)
@@ -0,0 +1,158 @@
+import time
+from threading import Event, Lock, Thread
+
+from config import SERVER_URL, KEEPALIVE_IDLE
+from network import HTTP
+
+# Seconds between pings while the server cannot be reached; the last value
+# repeats until one gets through.
+BACKOFF_DELAYS = (5, 15, 30, 60, 120)
+PING_TIMEOUT = (5, 20)
+# Weight of the newest round trip in the smoothed RTT.
+RTT_WEIGHT = 0.3
+
+
+class ServerLink:
+    """What the app currently knows about reaching the server.
+
+    Every HTTP call to the server reports into it, so screens and services
+    read `online` and `rtt_ms` here instead of sending probes of their own.
+    `online` is None until the first request has finished.
+    """
+
+    def __init__(self, base_url=SERVER_URL):
+        self.base_url = base_url
+        self.lock = Lock()
+        self.online = None
+        self.rtt_ms = None
+        self.last_rtt_ms = None
+        self.last_ok = None
+        self.last_error = None
+        self.failures = 0
+        self.listeners = []
+
+    def observe(self, url, seconds, status=None, error=None):
+        if not url.startswith(self.base_url):
+            return
+        # Any HTTP status means the server answered; only transport
+        # errors (refused, timed out, DNS) mean the link is down.
+        reachable = error is None
+        with self.lock:
+            was = self.online
+            self.online = reachable
+            if reachable:
+                ms = seconds * 1000
+                self.last_rtt_ms = ms
+                self.rtt_ms = ms if self.rtt_ms is None else (1 - RTT_WEIGHT) * self.rtt_ms + RTT_WEIGHT * ms
+                self.last_ok = time.time()
+                self.failures = 0
+            else:
+                self.last_error = error
+                self.failures += 1
+            listeners = list(self.listeners) if was != reachable else ()
+        for listener in listeners:
+            listener(reachable)
+
+    def subscribe(self, listener):
+        """Call `listener(online)` from the reporting thread whenever reachability flips."""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def state(self):
+        with self.lock:
+            return {
+                "online": self.online,
+                "rtt_ms": None if self.rtt_ms is None else round(self.rtt_ms, 1),
+                "last_rtt_ms": None if self.last_rtt_ms is None else round(self.last_rtt_ms, 1),
+                "last_ok": self.last_ok,
+                "last_error": self.last_error,
+                "failures": self.failures,
+            }
+
+
+class Keepalive:
+    """Keeps the hosted backend from going to sleep, and no more.
+
+    The host idles a service out after a stretch without traffic. A ping
+    (a HEAD of the server root, which touches no data) is sent only once the
+    app itself has sent nothing for `idle` seconds, so an app in use never
+    pings. While the server is unreachable, pings back off instead.
+    """
+
+    def __init__(self, link, http=HTTP, url=SERVER_URL, idle=KEEPALIVE_IDLE):
+        self.link = link
+        self.http = http
+        self.url = url
+        self.idle = idle
+        self.wake = Event()
+        self.thread = None
+        self.running = False
+        self.retry_at = 0
+        self.probe_requested = False
+        self.pings = 0
+        self.link.subscribe(self.on_link_change)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = Thread(target=self.run, name="keepalive", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.wake.set()
+
+    def on_link_change(self, online):
+        # Real traffic got through while pings were backing off: go back
+        # to the idle schedule straight away.
+        if online:
+            self.wake.set()
+
+    def probe(self):
+        """Ping as soon as possible (unless backing off) to refresh the link state."""
+        if self.running and not self.probe_requested:
+            self.probe_requested = True
+            self.wake.set()
+
+    def next_delay(self):
+        now = time.monotonic()
+        if self.probe_requested and not self.link.failures:
+            return 0
+        if self.link.failures:
+            return self.retry_at - now
+        return self.idle - (now - self.http.last_activity)
+
+    def run(self):
+        while self.running:
+            delay = self.next_delay()
+            if delay > 0:
+                self.wake.wait(delay)
+                self.wake.clear()
+                continue
+            self.ping()
+
+    def ping(self):
+        self.probe_requested = False
+        self.pings += 1
+        try:
+            self.http.head(self.url, timeout=PING_TIMEOUT)
+        except Exception:
+            # Already reported to the link by the client.
+            pass
+        failures = self.link.failures
+        if failures:
+            self.retry_at = time.monotonic() + BACKOFF_DELAYS[min(failures - 1, len(BACKOFF_DELAYS) - 1)]
+
+    def stats(self):
+        return {"pings": self.pings, **self.link.state()}
+
+
+LINK = ServerLink()
+HTTP.observers.append(LINK.observe)
+KEEPALIVE = Keepalive(LINK)
@@ -1,46 +1,116 @@
-from kivymd.app import MDApp
-from kivy.uix.screenmanager import ScreenManager, FadeTransition
-from screens.admin import AdminScreen
-from screens.pos import POSScreen
-from screens.reception import ReceptionScreen
-from screens.pharmacy import PharmacyScreen
-from screens.lab import LabScreen
-from screens.doctor import DoctorScreen
-from screens.analysis import AnalysisScreen
-from screens.home import HomeScreen
-import requests
-import time
-from threading import Thread
+from startup import TRACER
+TRACER.configure()
+
+with TRACER.span("main imports"):
+    import importlib
+    import os
+
+    from kivymd.app import MDApp
+    from kivy.clock import Clock
+    from kivy.lang import Builder
+    from kivy.uix.screenmanager import ScreenManager, FadeTransition
+    from config import PREWARM_SCREENS, PREWARM_DELAY
+    import jank
+    from outbox import OUTBOX
+    from keepalive import KEEPALIVE
+    from connectivity import CONNECTIVITY, OFFLINE
+
+TRACER.instrument(Builder, "load_file", lambda filename, **kw: f"kv {os.path.basename(filename)}")
+
+# Screen name -> "module:Class". Nothing is imported (and no kv file is
+# loaded) until a screen is first needed.
+SCREENS = {
+    "home": "screens.home:HomeScreen",
+    "admin": "screens.admin:AdminScreen",
+    "reception": "screens.reception:ReceptionScreen",
+    "doctor": "screens.doctor:DoctorScreen",
+    "lab": "screens.lab:LabScreen",
+    "pharmacy": "screens.pharmacy:PharmacyScreen",
+    "pos": "screens.pos:POSScreen",
+    "analysis": "screens.analysis:AnalysisScreen",
+}
+
+
+class LazyScreenManager(ScreenManager):
+    """ScreenManager whose screens are imported and built on first use."""
+
+    def __init__(self, factories, **kwargs):
+        super().__init__(**kwargs)
+        self.factories = dict(factories)
+
+    def is_built(self, name):
+        return super().has_screen(name)
+
+    def has_screen(self, name):
+        return name in self.factories or self.is_built(name)
+
+    def get_screen(self, name):
+        if not self.is_built(name) and name in self.factories:
+            self.build_screen(name)
+        return super().get_screen(name)
+
+    def build_screen(self, name):
+        with TRACER.span(f"screen {name}"):
+            module_name, class_name = self.factories[name].split(":")
+            screen_class = getattr(importlib.import_module(module_name), class_name)
+            with TRACER.span(f"construct {class_name}"):
+                screen = screen_class(name=name)
+            self.add_widget(screen)
+        return screen
+
+    def prewarm(self, delay=PREWARM_DELAY):
+        """Build the remaining screens one per frame, starting after `delay` seconds."""
+        pending = [name for name in self.factories if not self.is_built(name)]
+
+        def step(dt):
+            while pending:
+                name = pending.pop(0)
+                if not self.is_built(name):
+                    self.build_screen(name)
+                    break
+            if pending:
+                Clock.schedule_once(step, 0)
+
+        Clock.schedule_once(step, delay)
+
 
 class NeptuneHMS(MDApp):
 
     def build(self):
-        self.theme_cls.primary_palette = 'Blue'
-        self.sm = ScreenManager()
-        self.sm.add_widget(HomeScreen(name='home'))
-        self.sm.add_widget(AdminScreen(name='admin'))
-        self.sm.add_widget(POSScreen(name='pos'))
-        self.sm.add_widget(ReceptionScreen(name='reception'))
-        self.sm.add_widget(PharmacyScreen(name='pharmacy'))
-        self.sm.add_widget(LabScreen(name='lab'))
-        self.sm.add_widget(DoctorScreen(name='doctor'))
-        self.sm.add_widget(AnalysisScreen(name="analysis"))
-        self.sm.transition = FadeTransition()
-        self.sm.current = 'home'
+        self.jank = jank.from_env()
+        with TRACER.span("build"):
+            self.theme_cls.primary_palette = 'Blue'
+            self.sm = LazyScreenManager(SCREENS)
+            self.sm.transition = FadeTransition()
+            self.sm.current = 'home'
         return self.sm
 
-def pinger():
-    url = "https://neptunev2.onrender.com/hospitals/hospitals-fetch/?sort_term=all&sort_dir=desc"
-    while True:
-        try:
-            response = requests.get(url, timeout=10)
-            print(f"Pinged: {url}: {response.status_code}")
-        except Exception as e:
-            print(f"Ping failed: {e}")
-        time.sleep(30)
+    def on_start(self):
+        TRACER.mark("on_start")
+        if TRACER.enabled:
+            from kivy.core.window import Window
+
+            def first_frame(*args):
+                Window.unbind(on_flip=first_frame)
+                TRACER.finish("first frame")
+
+            Window.bind(on_flip=first_frame)
+        if PREWARM_SCREENS:
+            self.sm.prewarm()
+        if self.jank:
+            self.jank.start()
+
+    def on_stop(self):
+        if self.jank:
+            self.jank.stop()
 
 
 if __name__ == "__main__":
-    Thread(target=pinger, daemon=True).start()
+    KEEPALIVE.start()
+    # Replay writes left queued by a previous session, and again whenever
+    # the server comes back after being unreachable.
+    OUTBOX.kick()
+    CONNECTIVITY.subscribe(lambda state, previous: OUTBOX.kick() if previous == OFFLINE else None)
     app = NeptuneHMS()
+    TRACER.start("App.run")
     app.run()
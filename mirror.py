@@ -0,0 +1,233 @@
+import hashlib
+import json
+import sqlite3
+import time
+from threading import Lock
+
+from config import HOSPITAL, get_app_data_path
+
+# id: primary key field, name/date: fields behind the "name" and "date" sort
+# terms, search: fields indexed for full text search. Dotted names reach into
+# nested objects, e.g. diagnosis["patient"]["patient_name"].
+ENTITIES = {
+    "patients": {"id": "patient_id", "name": "patient_name", "date": "date_added",
+                 "search": ["patient_name", "patient_email", "patient_phone", "patient_id_no"]},
+    "drugs": {"id": "drug_id", "name": "drug_name", "date": "date_added",
+              "search": ["drug_name", "drug_category"]},
+    "workers": {"id": "worker_id", "name": "worker_name", "date": "date_added",
+                "search": ["worker_name", "worker_email", "worker_phone", "worker_role"]},
+    "services": {"id": "service_id", "name": "service_name", "date": "date_added",
+                 "search": ["service_name", "service_desc"]},
+    "lab_tests": {"id": "test_id", "name": "test_name", "date": "date_added",
+                  "search": ["test_name", "test_desc"]},
+    "diagnoses": {"id": "diagnosis_id", "name": "patient.patient_name", "date": "date_added",
+                  "search": ["patient.patient_name", "symptoms", "suggested_diagnosis"]},
+    "prescriptions": {"id": "prescription_id", "name": "patient_name", "date": "date_added",
+                      "search": ["patient_name"]},
+    "appointments": {"id": "appointment_id", "name": "patient.patient_name", "date": "date_requested",
+                     "search": ["patient.patient_name", "appointment_desc"]},
+    "lab_requests": {"id": "request_id", "name": "patient.patient_name", "date": "date_added",
+                     "search": ["patient.patient_name", "test.test_name", "test.test_desc"]},
+    "lab_results": {"id": "result_id", "name": "patient.patient_name", "date": "date_added",
+                    "search": ["patient.patient_name", "observations", "conclusion"]},
+    "billings": {"id": "billing_id", "name": "patient.patient_name", "date": "created_at",
+                 "search": ["patient.patient_name", "item", "source"]},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    hospital TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    id TEXT NOT NULL,
+    body TEXT NOT NULL,
+    search_text TEXT NOT NULL,
+    PRIMARY KEY (hospital, entity, id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(
+    search_text,
+    content='records',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    hospital TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    cursor TEXT,
+    synced_at REAL,
+    PRIMARY KEY (hospital, entity)
+);
+CREATE TRIGGER IF NOT EXISTS records_ai AFTER INSERT ON records BEGIN
+    INSERT INTO records_fts(rowid, search_text) VALUES (new.rowid, new.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS records_ad AFTER DELETE ON records BEGIN
+    INSERT INTO records_fts(records_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text);
+END;
+CREATE TRIGGER IF NOT EXISTS records_au AFTER UPDATE ON records BEGIN
+    INSERT INTO records_fts(records_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text);
+    INSERT INTO records_fts(rowid, search_text) VALUES (new.rowid, new.search_text);
+END;
+"""
+
+# A plain upsert: INSERT OR REPLACE would delete the old row without firing
+# records_ad and leave its terms in records_fts under a rowid that later
+# belongs to another row.
+UPSERT = """
+INSERT INTO records VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(hospital, entity, id) DO UPDATE SET body = excluded.body, search_text = excluded.search_text
+"""
+
+
+def field(row, dotted):
+    value = row
+    for part in dotted.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _match_query(term):
+    # Every word must match as a prefix: "jo ke" -> "jo"* AND "ke"*
+    words = [w.replace('"', '""') for w in term.split()]
+    return " ".join(f'"{w}"*' for w in words if w)
+
+
+class LocalMirror:
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # Bumped on every change to an entity's rows, so callers can tell
+        # whether a sync changed anything.
+        self.versions = {}
+
+    def hospital(self):
+        return str(HOSPITAL.id) if HOSPITAL else ""
+
+    def record_id(self, entity, row):
+        key = ENTITIES[entity]["id"]
+        value = row.get(key)
+        if value is None:
+            return hashlib.sha1(json.dumps(row, sort_keys=True, default=str).encode()).hexdigest()
+        return str(value)
+
+    def _record(self, hospital, entity, row):
+        fields = ENTITIES[entity]["search"]
+        search_text = " ".join(str(v) for v in (field(row, f) for f in fields) if v)
+        return (hospital, entity, self.record_id(entity, row), json.dumps(row, default=str), search_text)
+
+    def replace_all(self, entity, rows):
+        """Make the mirror of `entity` exactly `rows` (a full server listing)."""
+        hospital = self.hospital()
+        records = [self._record(hospital, entity, row) for row in rows if isinstance(row, dict)]
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM records WHERE hospital = ? AND entity = ?", (hospital, entity))
+            self.conn.executemany(UPSERT, records)
+            self._bump(entity)
+
+    def upsert(self, entity, rows):
+        hospital = self.hospital()
+        records = [self._record(hospital, entity, row) for row in rows if isinstance(row, dict)]
+        with self.lock, self.conn:
+            self.conn.executemany(UPSERT, records)
+            if records:
+                self._bump(entity)
+
+    def delete(self, entity, ids):
+        hospital = self.hospital()
+        with self.lock, self.conn:
+            cursor = self.conn.executemany(
+                "DELETE FROM records WHERE hospital = ? AND entity = ? AND id = ?",
+                [(hospital, entity, str(i)) for i in ids],
+            )
+            if cursor.rowcount:
+                self._bump(entity)
+
+    def _bump(self, entity):
+        # Callers hold self.lock.
+        self.versions[entity] = self.versions.get(entity, 0) + 1
+
+    def version(self, entity):
+        with self.lock:
+            return self.versions.get(entity, 0)
+
+    def has(self, entity):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM records WHERE hospital = ? AND entity = ? LIMIT 1",
+                (self.hospital(), entity),
+            ).fetchone()
+        return row is not None
+
+    def all(self, entity, sort_term="all", sort_dir="desc"):
+        spec = ENTITIES[entity]
+        direction = "ASC" if sort_dir == "asc" else "DESC"
+        if sort_term in ("name", "date"):
+            order = f"lower(json_extract(body, '$.{spec[sort_term]}')) {direction}"
+        else:
+            order = f"CAST(id AS INTEGER) {direction}, id {direction}"
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT body FROM records WHERE hospital = ? AND entity = ? ORDER BY {order}",
+                (self.hospital(), entity),
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def ids(self, entity):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT id FROM records WHERE hospital = ? AND entity = ?",
+                (self.hospital(), entity),
+            ).fetchall()
+        return {row_id for (row_id,) in rows}
+
+    def get(self, entity, ids):
+        """Mirrored rows of `entity` keyed by their (string) id; unknown ids are left out."""
+        ids = list({str(i) for i in ids})
+        if not ids:
+            return {}
+        marks = ", ".join("?" * len(ids))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT id, body FROM records WHERE hospital = ? AND entity = ? AND id IN ({marks})",
+                (self.hospital(), entity, *ids),
+            ).fetchall()
+        return {row_id: json.loads(body) for row_id, body in rows}
+
+    def cursor(self, entity):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT cursor FROM sync_state WHERE hospital = ? AND entity = ?",
+                (self.hospital(), entity),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, entity, cursor):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (self.hospital(), entity, cursor, time.time()),
+            )
+
+    def search(self, entity, term, limit=500):
+        query = _match_query(term)
+        if not query:
+            return []
+        with self.lock:
+            rows = self.conn.execute(
+                """
+                SELECT r.body FROM records_fts f
+                JOIN records r ON r.rowid = f.rowid
+                WHERE records_fts MATCH ? AND r.hospital = ? AND r.entity = ?
+                ORDER BY f.rank
+                LIMIT ?
+                """,
+                (query, self.hospital(), entity, limit),
+            ).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+
+MIRROR = LocalMirror(get_app_data_path("neptune_mirror.db"))
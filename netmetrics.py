@@ -0,0 +1,138 @@
+import json
+import re
+import time
+from collections import Counter, deque
+from threading import Lock
+from urllib.parse import urlsplit
+
+# Upper bounds (ms) of the latency histogram buckets; the last is open-ended.
+LATENCY_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+# Recent samples kept per endpoint for percentiles.
+SAMPLE_SIZE = 500
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8}-[0-9a-f-]{27,})$", re.I)
+
+
+def endpoint(url):
+    """`https://host/patients/patients-fetch/?...` -> `patients/patients-fetch`."""
+    parts = [p for p in urlsplit(url).path.split("/") if p]
+    return "/".join("{id}" if _ID_SEGMENT.match(p) else p for p in parts) or "/"
+
+
+def percentile(ordered, q):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.statuses = Counter()
+        self.exceptions = Counter()
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency = deque(maxlen=SAMPLE_SIZE)
+        self.server = deque(maxlen=SAMPLE_SIZE)
+        self.last_at = None
+
+    def add(self, ms, status, bytes_out, bytes_in, server_ms, error):
+        self.count += 1
+        self.bytes_out += bytes_out
+        self.bytes_in += bytes_in
+        self.latency.append(ms)
+        if server_ms is not None:
+            self.server.append(server_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        if error is not None:
+            self.exceptions[error] += 1
+            self.statuses["error"] += 1
+        else:
+            self.statuses[str(status)] += 1
+        if error is not None or status >= 500:
+            self.errors += 1
+        self.last_at = time.time()
+
+    def summary(self):
+        latency = sorted(self.latency)
+        server = sorted(self.server)
+        return {
+            "count": self.count,
+            "error_rate": round(self.errors / self.count, 4) if self.count else 0.0,
+            "retries": self.retries,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "statuses": dict(self.statuses),
+            "exceptions": dict(self.exceptions),
+            # latency is the whole call as the app sees it; server_ms is time
+            # to the response headers, so a large gap between the two points
+            # at the link rather than the backend.
+            "latency_ms": {f"p{q}": _round(percentile(latency, q)) for q in (50, 90, 99)},
+            "server_ms": {f"p{q}": _round(percentile(server, q)) for q in (50, 90, 99)},
+            "max_ms": _round(latency[-1]) if latency else None,
+            "histogram": {
+                ("inf" if bound == float("inf") else f"<={bound}"): n
+                for bound, n in zip(LATENCY_BUCKETS, self.buckets)
+            },
+            "last_at": self.last_at,
+        }
+
+
+class NetworkMetrics:
+    """Per-endpoint timing, sizes, status codes and retries for every HTTP call.
+
+    Endpoints are keyed by their URL path with the host, query string and
+    numeric ids dropped, so `patients-fetch` for every hospital and page
+    lands in one row.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.endpoints = {}
+        self.started_at = time.time()
+
+    def stats(self, url):
+        key = endpoint(url)
+        entry = self.endpoints.get(key)
+        if entry is None:
+            entry = self.endpoints[key] = EndpointStats()
+        return entry
+
+    def record(self, method, url, seconds, status=None, bytes_out=0, bytes_in=0, server_seconds=None, error=None):
+        server_ms = None if server_seconds is None else server_seconds * 1000
+        with self.lock:
+            self.stats(url).add(seconds * 1000, status, bytes_out, bytes_in, server_ms, error)
+
+    def retry(self, url):
+        with self.lock:
+            self.stats(url).retries += 1
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = {}
+            self.started_at = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            endpoints = {key: entry.summary() for key, entry in self.endpoints.items()}
+        return {
+            "since": self.started_at,
+            "exported_at": time.time(),
+            "endpoints": dict(sorted(endpoints.items(), key=lambda item: item[1]["count"], reverse=True)),
+        }
+
+    def export(self, path):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
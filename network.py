@@ -0,0 +1,156 @@
+import requests
+from requests.adapters import HTTPAdapter
+import time
+from threading import Lock
+
+from httpcache import ConditionalCache
+from netmetrics import NetworkMetrics
+
+# (connect, read) seconds. Render cold starts can take a while to answer,
+# so the read timeout is generous while the connect timeout stays short.
+DEFAULT_TIMEOUT = (5, 30)
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 8
+
+
+class HttpClient:
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+        # One adapter per scheme keeps up to `pool_maxsize` live sockets per
+        # host; pool_block makes extra callers wait for a free connection
+        # instead of opening throwaway ones.
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.lock = Lock()
+        self.inflight = {}
+        self.coalesced = 0
+        self.metrics = NetworkMetrics()
+        self.cache = ConditionalCache()
+        # observer(url, seconds, status, error) runs after every request;
+        # seconds is the time to the response headers.
+        self.observers = []
+        self.last_activity = time.monotonic()
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        self.last_activity = time.monotonic()
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            self.metrics.record(method, url, seconds,
+                                bytes_out=_body_size(kwargs.get("data")), error=type(e).__name__)
+            self.notify(url, seconds, None, type(e).__name__)
+            raise
+        # Reading the body here keeps download time in the measurement;
+        # requests caches it, so callers' .json()/.content do not read again.
+        bytes_in = len(response.content)
+        self.metrics.record(
+            method, url, time.perf_counter() - start,
+            status=response.status_code,
+            bytes_out=_body_size(response.request.body),
+            bytes_in=bytes_in,
+            server_seconds=response.elapsed.total_seconds(),
+        )
+        self.notify(url, response.elapsed.total_seconds(), response.status_code, None)
+        return response
+
+    def notify(self, url, seconds, status, error):
+        for observer in self.observers:
+            try:
+                observer(url, seconds, status, error)
+            except Exception as e:
+                print(f"HTTP observer failed: {e}")
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def get_json(self, url, on_result, **kwargs):
+        """GET `url` and pass its parsed JSON body (or None on failure) to `on_result`.
+
+        Identical GETs issued while one is already on the wire do not open a
+        second request: their callbacks join the in-flight call and all of
+        them receive the same parsed object once it lands. That object is
+        shared, so callers must treat it as read-only (see `fetch_json`).
+        """
+        with self.lock:
+            waiters = self.inflight.get(url)
+            if waiters is not None:
+                waiters.append(on_result)
+                self.coalesced += 1
+                return
+            self.inflight[url] = [on_result]
+
+        data = self.fetch_json(url, **kwargs)
+
+        with self.lock:
+            waiters = self.inflight.pop(url)
+        for waiter in waiters:
+            waiter(data)
+
+    def fetch_json(self, url, **kwargs):
+        """GET `url` and return its parsed JSON body, or None on failure.
+
+        URLs fetched before are requested conditionally; when the server
+        answers 304 the object parsed last time is returned instead. The
+        result is therefore shared with every later fetch of the URL (and
+        with the fetch cache): read it, or copy it before changing anything.
+        """
+        cached = self.cache.get(url)
+        if cached is not None:
+            kwargs["headers"] = {**cached.validators(), **(kwargs.get("headers") or {})}
+        try:
+            response = self.get(url, **kwargs)
+            if response.status_code == 304 and cached is not None:
+                self.cache.hit()
+                return cached.data
+            if response.status_code == 200:
+                data = response.json()
+                self.cache.miss()
+                self.cache.store(url, response, data)
+                return data
+        except Exception as e:
+            print(f"Request to {url} failed: {e}")
+        return None
+
+    def close(self):
+        self.session.close()
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+HTTP = HttpClient()
@@ -0,0 +1,279 @@
+import json
+import sqlite3
+import time
+import uuid
+from threading import Lock, Timer
+
+from requests.exceptions import ReadTimeout
+
+from config import get_app_data_path
+from network import HTTP
+from tasks import POOL
+
+# Seconds to wait before retrying after the server could not be reached;
+# the last value repeats until a send gets through.
+RETRY_DELAYS = (2, 5, 15, 30, 60)
+BATCH_SIZE = 50
+# Times the server may answer a write with a retryable error (5xx, 429,
+# read timeout) before it is given up and rejected, so one bad write cannot
+# hold back the queue forever. Failing to reach the server at all is not
+# counted: writes made offline wait as long as it takes.
+MAX_SERVER_FAILURES = len(RETRY_DELAYS) * 4
+# Writes that could be applied twice if replayed. The backend is not known to
+# honour Idempotency-Key, so one of these that times out after reaching the
+# server is not sent again; it is set aside as unconfirmed to be checked by
+# hand.
+UNSAFE_TO_REPLAY = ("POST", "PUT", "PATCH")
+UNCONFIRMED = "No answer in time; the server may have applied it"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    body TEXT,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    server_failures INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS outbox_rejected (
+    seq INTEGER PRIMARY KEY,
+    key TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    body TEXT,
+    created_at REAL NOT NULL,
+    status INTEGER,
+    response TEXT,
+    rejected_at REAL NOT NULL
+);
+"""
+
+
+def is_permanent(status):
+    # The server understood the request and refused it; sending it again
+    # would not help. Timeouts and rate limits are worth another try.
+    return 400 <= status < 500 and status not in (408, 425, 429)
+
+
+class Outbox:
+    """Durable, ordered queue for every add/edit/delete/sale request.
+
+    `enqueue` writes the request to SQLite and returns at once, so screens
+    never wait on the network. A background flush replays queued requests
+    oldest first, each with its own Idempotency-Key header for servers that
+    deduplicate replays by it. A write the server may have applied without
+    answering is not replayed unless it is safe to repeat. When the
+    server cannot be reached the flush stops (keeping the order intact) and
+    retries with backoff; once it gets through, the whole backlog drains in
+    one pass over the pooled connection.
+    """
+
+    def __init__(self, path, http=HTTP):
+        self.http = http
+        self.lock = Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(SCHEMA)
+
+        self.callbacks = {}
+        self.listeners = []
+        self.flushing = False
+        self.retry_timer = None
+        self.failures = 0
+
+        self.sent = 0
+        self.rejected = 0
+        self.unconfirmed = 0
+        self.retries = 0
+
+    def enqueue(self, method, url, json=None, on_result=None, on_response=None, key=None):
+        """Queue a request; `on_result(ok)` runs once it is applied or rejected.
+
+        `on_response(status, payload)` runs at the same point with the
+        server's decoded reply (status None if it never answered; then
+        payload is None, or `{"detail": UNCONFIRMED, "unconfirmed": True}`
+        for a write that may have been applied), for
+        callers that need more than ok/failed. `key` overrides the generated
+        Idempotency-Key, for requests that belong together.
+        """
+        key = key or uuid.uuid4().hex
+        body = None if json is None else _dumps(json)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO outbox (key, method, url, body, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, method, url, body, time.time()),
+            )
+            if on_result or on_response:
+                self.callbacks[key] = (on_result, on_response)
+        self.kick()
+        return key
+
+    def subscribe(self, listener):
+        """Call `listener(method, url)` after any queued write is applied."""
+        self.listeners.append(listener)
+
+    def kick(self):
+        """Start a flush unless one is already running or a retry is pending."""
+        with self.lock:
+            if self.flushing:
+                return
+            self.flushing = True
+            if self.retry_timer:
+                self.retry_timer.cancel()
+                self.retry_timer = None
+        POOL.submit(self.flush)
+
+    def flush(self):
+        released = False
+        try:
+            released = self.drain()
+        finally:
+            # drain() clears `flushing` itself on every normal exit; if it
+            # raised, clear it here or no flush would ever start again.
+            if not released:
+                with self.lock:
+                    self.flushing = False
+
+    def drain(self):
+        while True:
+            with self.lock:
+                batch = self.conn.execute(
+                    "SELECT seq, key, method, url, body, created_at, attempts, server_failures FROM outbox ORDER BY seq LIMIT ?",
+                    (BATCH_SIZE,),
+                ).fetchall()
+                if not batch:
+                    # Cleared under the lock so an enqueue racing with the
+                    # end of a flush always starts a new one.
+                    self.flushing = False
+                    self.failures = 0
+                    return True
+            for item in batch:
+                if not self.send(*item):
+                    self.schedule_retry()
+                    return True
+
+    def send(self, seq, key, method, url, body, created_at, attempts=0, server_failures=0):
+        status, error, response, reached, timed_out = None, None, None, False, False
+        if attempts:
+            self.http.metrics.retry(url)
+        try:
+            response = self.http.request(
+                method, url,
+                data=body,
+                headers={"Idempotency-Key": key, **({"Content-Type": "application/json"} if body else {})},
+            )
+            status = response.status_code
+            reached = True
+        except ReadTimeout as e:
+            # The server got the request but did not answer in time.
+            error = str(e)
+            reached = timed_out = True
+        except Exception as e:
+            error = str(e)
+
+        if status is not None and 200 <= status < 300:
+            with self.lock, self.conn:
+                self.conn.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+                callbacks = self.callbacks.pop(key, None)
+            self.sent += 1
+            self.failures = 0
+            for listener in self.listeners:
+                try:
+                    listener(method, url)
+                except Exception as e:
+                    print(f"Outbox listener failed: {e}")
+            _notify(callbacks, True, response)
+            return True
+
+        if status is not None and is_permanent(status):
+            self.reject(seq, key, method, url, body, created_at, status, response.text, response)
+            return True
+
+        if timed_out and method in UNSAFE_TO_REPLAY:
+            self.unconfirmed += 1
+            self.reject(seq, key, method, url, body, created_at, None, f"{UNCONFIRMED}: {error}", None,
+                        payload={"detail": UNCONFIRMED, "unconfirmed": True})
+            return True
+
+        if reached and server_failures + 1 >= MAX_SERVER_FAILURES:
+            self.reject(seq, key, method, url, body, created_at, status,
+                        response.text if response is not None else error, response)
+            return True
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE outbox SET attempts = attempts + 1, server_failures = server_failures + ?, last_error = ? WHERE seq = ?",
+                (1 if reached else 0, error or f"HTTP {status}", seq),
+            )
+        return False
+
+    def reject(self, seq, key, method, url, body, created_at, status, text, response, payload=None):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM outbox WHERE seq = ?", (seq,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO outbox_rejected VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (seq, key, method, url, body, created_at, status, (text or "")[:2000], time.time()),
+            )
+            callbacks = self.callbacks.pop(key, None)
+        self.rejected += 1
+        print(f"Outbox: {method} {url} rejected with {status or text}")
+        _notify(callbacks, False, response, payload)
+
+    def schedule_retry(self):
+        with self.lock:
+            delay = RETRY_DELAYS[min(self.failures, len(RETRY_DELAYS) - 1)]
+            self.failures += 1
+            self.retries += 1
+            self.flushing = False
+            self.retry_timer = Timer(delay, self.kick)
+            self.retry_timer.daemon = True
+            self.retry_timer.start()
+
+    def pending(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def stats(self):
+        return {
+            "pending": self.pending(),
+            "sent": self.sent,
+            "rejected": self.rejected,
+            "unconfirmed": self.unconfirmed,
+            "retries": self.retries,
+            "consecutive_failures": self.failures,
+        }
+
+
+def _dumps(data):
+    return json.dumps(data, default=str)
+
+
+def _notify(callbacks, ok, response, payload=None):
+    if not callbacks:
+        return
+    on_result, on_response = callbacks
+    # A failing callback must not stop the flush that called it.
+    if on_result:
+        try:
+            on_result(ok)
+        except Exception as e:
+            print(f"Outbox callback failed: {e}")
+    if on_response:
+        status = None
+        if response is not None:
+            status = response.status_code
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = None
+        try:
+            on_response(status, payload)
+        except Exception as e:
+            print(f"Outbox callback failed: {e}")
+
+
+OUTBOX = Outbox(get_app_data_path("neptune_outbox.db"))
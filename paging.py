@@ -0,0 +1,115 @@
+from collections.abc import Mapping
+from functools import partial
+
+from config import PAGE_SIZE
+
+# Load the next page once the list is scrolled past this point; scroll_y
+# runs from 1 at the top to 0 at the bottom.
+LOAD_MORE_AT = 0.15
+
+# Keys RecycleView layouts read from every data item to size and place its
+# view. Row mappers never set them, so they are answered without mapping.
+LAYOUT_KEYS = frozenset({
+    "viewclass", "pos_hint", "size", "size_hint", "size_hint_min", "size_hint_max",
+    "width", "height", "size_hint_x", "size_hint_y",
+})
+
+
+class LazyRow(Mapping):
+    """One RecycleView data item that maps its row on first real access."""
+
+    __slots__ = ("rows", "index")
+
+    def __init__(self, rows, index):
+        self.rows = rows
+        self.index = index
+
+    def get(self, key, default=None):
+        if key in LAYOUT_KEYS:
+            return default
+        return self.rows.mapped(self.index).get(key, default)
+
+    def items(self):
+        return self.rows.mapped(self.index).items()
+
+    def __getitem__(self, key):
+        return self.rows.mapped(self.index)[key]
+
+    def __iter__(self):
+        return iter(self.rows.mapped(self.index))
+
+    def __len__(self):
+        return len(self.rows.mapped(self.index))
+
+    # Kivy compares old and new data lists on assignment; compare by
+    # identity so that never maps rows.
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+
+class LazyRows:
+    """Rows whose view data is built only when the RecycleView shows them.
+
+    `mapper(row)` runs once per displayed row and its dict is cached. If
+    `on_select` is given, each mapped dict gets `select_key` bound to it
+    with the row's own data, so mappers need no per-row closures.
+    """
+
+    def __init__(self, rows, mapper, on_select=None, select_key="show_profile"):
+        self.rows = rows
+        self.mapper = mapper
+        self.on_select = on_select
+        self.select_key = select_key
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def items(self, start, stop):
+        return [LazyRow(self, i) for i in range(start, min(stop, len(self.rows)))]
+
+    def mapped(self, index):
+        data = self.cache.get(index)
+        if data is None:
+            row = self.rows[index]
+            data = self.mapper(row)
+            if self.on_select is not None:
+                data[self.select_key] = partial(self.on_select, row)
+            self.cache[index] = data
+        return data
+
+
+class PagedList:
+    """Feeds a RecycleView its rows one page at a time.
+
+    `show(rows, mapper)` hands the view only the first page, as lazy items
+    that are mapped when their row comes into view. Each time the list is
+    scrolled near its end the next page is appended.
+    """
+
+    def __init__(self, rec_view, page_size=PAGE_SIZE, load_more_at=LOAD_MORE_AT):
+        self.rec_view = rec_view
+        self.page_size = page_size
+        self.load_more_at = load_more_at
+        self.rows = LazyRows([], None)
+        self.shown = 0
+        rec_view.bind(scroll_y=self.on_scroll)
+
+    def show(self, rows, mapper, on_select=None):
+        self.rows = LazyRows(rows, mapper, on_select)
+        self.shown = 0
+        self.rec_view.data = self.next_page()
+        self.rec_view.scroll_y = 1
+
+    def next_page(self):
+        chunk = self.rows.items(self.shown, self.shown + self.page_size)
+        self.shown += len(chunk)
+        return chunk
+
+    def more(self):
+        if self.shown < len(self.rows):
+            self.rec_view.data.extend(self.next_page())
+
+    def on_scroll(self, view, scroll_y):
+        if scroll_y <= self.load_more_at:
+            self.more()
@@ -70,10 +70,13 @@ from screens.lab_requests import RequestsInfo
 from screens.lab_results import ResultsInfo
 from screens.hospital import start_hospital_editing, start_hospital_password_change, start_hospital_deletion
 
-from config import STORE, SERVER_URL, resource_path
+from config import STORE, SERVER_URL, resource_path, HOSPITAL, get_app_data_path
+from search import SearchDebouncer
+from sorting import SORT_OPTIONS, ListResults
+from paging import PagedList
 from datetime import datetime, timezone, timedelta
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
 
 
 Builder.load_file(resource_path("screens/admin.kv"))
@@ -83,22 +86,38 @@ class AdminScreen(MDScreen):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.current_search_callback = None
+        self.searcher = SearchDebouncer()
+        self.results = ListResults()
+        self.pages = PagedList(self.ids.rec_view)
+        # One bound handler per row type; rows get it with their own data on display.
+        self.row_handlers = {
+            "PatientsRow": self.display_patients,
+            "WorkersRow": self.display_workers,
+            "DrugsRow": self.display_drugs,
+            "DiagnosisRow": self.display_diagnosis,
+            "PrescriptionsRow": self.display_prescriptions,
+            "AppointmentsRow": self.display_appointments,
+            "ServicesRow": self.display_services,
+            "TestsRow": self.display_tests,
+            "RequestsRow": self.display_requests,
+            "ResultsRow": self.display_results,
+            "BillingsRow": self.display_billings,
+        }
         self.ids.search_field.bind(text=self._on_search_field_text)
         self.store = STORE
         self.image_path = resource_path("assets")
 
     def _on_search_field_text(self, instance, value):
         if self.current_search_callback:
-            self.current_search_callback(value)
+            self.searcher.push(value, self.current_search_callback)
         
     # Making a universal admin display section...
     def display_items(self, prev_class, items, flag, mapper):
         prev = self.ids.rec_view
         self.ids.rec_box.default_size = (None, dp(80))
         prev.viewclass = prev_class
-
-        data = [mapper(i) for i in items]
-        prev.data = data
+        self.results.keep(prev_class, items)
+        self.pages.show(items, mapper, self.row_handlers.get(prev_class))
     
     # Handle mapping, showing and viewing of patients...
     def patients_mapper(self, pat: dict | None):
@@ -107,7 +126,6 @@ class AdminScreen(MDScreen):
             'patient_name': (pat.get("patient_name") or "Unknown").strip(),
             'patient_email': (pat.get("patient_email") or "example@gmail.com").lower(),
             'patient_phone': pat.get("patient_phone") or "0712345678",
-            'show_profile': lambda pat_data=pat: self.display_patients(pat_data)
         }
 
 
@@ -128,7 +146,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("PatientsRow", patients, "patient", self.patients_mapper)
         
-        fetch_patients("all", "all", "desc", callback=on_patients_fetched)
+        fetch_patients("all", "all", "desc", callback=self.searcher.guard(on_patients_fetched, self.dismiss_spinner), warm=True)
 
     
     def search_patients(self, *args):
@@ -148,7 +166,7 @@ class AdminScreen(MDScreen):
             intent="search",
             search_by="name" or "email" or "phone",
             search_term=term,
-            callback=on_patients_fetched
+            callback=self.searcher.guard(on_patients_fetched)
         )
         
     def show_pat_sort_dropdown(self, caller):
@@ -209,14 +227,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("Patients not found")
                 return
             self.display_items("PatientsRow", patients, "patient", self.patients_mapper)
-        if val == "Name (A to Z)":
-            fetch_patients(sort_term="name", sort_dir="asc", callback=on_patients_fetched)
-        elif val == "Name (Z to A)":
-            fetch_patients(sort_term="name", sort_dir="desc", callback=on_patients_fetched)
-        elif val == "Date (New to Old)":
-            fetch_patients(sort_term="date", sort_dir="desc", callback=on_patients_fetched)
-        elif val == "Date (Old to New)":
-            fetch_patients(sort_term="date", sort_dir="asc", callback=on_patients_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("PatientsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_patients_fetched)(rows)
+            return
+        fetch_patients(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_patients_fetched))
     
     def display_patients(self, pat_data: dict):
         self.preview_display(
@@ -260,7 +276,6 @@ class AdminScreen(MDScreen):
             'worker_name': (wrk.get("worker_name") or "Unknown").strip(),
             'worker_email': (wrk.get("worker_email") or "example@gmail.com").lower(),
             'worker_phone': wrk.get("worker_phone") or "0712345678",
-            'show_profile': lambda wrk_data=wrk: self.display_workers(wrk_data)
         }
 
 
@@ -280,7 +295,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("WorkersRow", workers, "worker", self.workers_mapper)
         
-        fetch_workers("all", "all", "desc", callback=on_workers_fetched)
+        fetch_workers("all", "all", "desc", callback=self.searcher.guard(on_workers_fetched, self.dismiss_spinner), warm=True)
 
     
     def search_workers(self, *args):
@@ -300,7 +315,7 @@ class AdminScreen(MDScreen):
             intent="search",
             search_by="name" or "email" or "phone",
             search_term=term,
-            callback=on_workers_fetched
+            callback=self.searcher.guard(on_workers_fetched)
         )
         
     def show_wrk_sort_dropdown(self, caller):
@@ -361,14 +376,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("Workers not found")
                 return
             self.display_items("WorkersRow", workers, "worker", self.workers_mapper)
-        if val == "Name (A to Z)":
-            fetch_workers(sort_term="name", sort_dir="asc", callback=on_workers_fetched)
-        elif val == "Name (Z to A)":
-            fetch_workers(intent="all", sort_term="name", sort_dir="desc", callback=on_workers_fetched)
-        elif val == "Date (New to Old)":
-            fetch_workers(intent="all", sort_term="date", sort_dir="desc", callback=on_workers_fetched)
-        elif val == "Date (Old to New)":
-            fetch_workers(sort_term="date", sort_dir="asc", callback=on_workers_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("WorkersRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_workers_fetched)(rows)
+            return
+        fetch_workers(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_workers_fetched))
     
     def display_workers(self, wrk_data: dict):
         self.preview_display(
@@ -412,7 +425,6 @@ class AdminScreen(MDScreen):
             'drug_name': (drug.get('drug_name') or "Unknown").strip(),
             'drug_category': (drug.get('drug_category') or "Unknown").strip(),
             'drug_quantity': f"{drug.get('drug_quantity', 0)} available",
-            'show_profile': lambda drug_data=drug: self.display_drugs(drug_data)
         }
 
     def show_drugs(self):
@@ -431,7 +443,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("DrugsRow", drugs, "worker", self.drugs_mapper)
         
-        fetch_drugs("all", "all", "desc", callback=on_drugs_fetched)
+        fetch_drugs("all", "all", "desc", callback=self.searcher.guard(on_drugs_fetched, self.dismiss_spinner), warm=True)
 
     
     def search_drugs(self, *args):
@@ -450,7 +462,7 @@ class AdminScreen(MDScreen):
         fetch_drugs(
             intent="search",
             search_term=term,
-            callback=on_drugs_fetched
+            callback=self.searcher.guard(on_drugs_fetched)
         )
         
     def show_drug_sort_dropdown(self, caller):
@@ -511,14 +523,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("Drugs not found")
                 return
             self.display_items("DrugsRow", drugs, "drug", self.drugs_mapper)
-        if val == "Name (A to Z)":
-            fetch_drugs(sort_term="name", sort_dir="asc", callback=on_drugs_fetched)
-        elif val == "Name (Z to A)":
-            fetch_drugs(intent="all", sort_term="name", sort_dir="desc", callback=on_drugs_fetched)
-        elif val == "Date (New to Old)":
-            fetch_drugs(intent="all", sort_term="date", sort_dir="desc", callback=on_drugs_fetched)
-        elif val == "Date (Old to New)":
-            fetch_drugs(sort_term="date", sort_dir="asc", callback=on_drugs_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("DrugsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_drugs_fetched)(rows)
+            return
+        fetch_drugs(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_drugs_fetched))
     
     def display_drugs(self, drug_data: dict):
         self.preview_display(
@@ -565,7 +575,6 @@ class AdminScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'symptoms': (diag.get("symptoms") or "Unknown").strip(),
             'diagnosis': str(diag.get("suggested_diagnosis") or "Unknown").strip(),
-            'show_profile': lambda diag_data=diag: self.display_diagnosis(diag_data)
         }
 
     def show_diagnosis(self):
@@ -584,7 +593,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("DiagnosisRow", diags, "diag", self.diagnosis_mapper)
         
-        DiagnosisInfo().fetch_diagnoses("all", "all", "desc", callback=on_diags_fetched)
+        DiagnosisInfo().fetch_diagnoses("all", "all", "desc", callback=self.searcher.guard(on_diags_fetched, self.dismiss_spinner))
 
     
     def search_diagnosis(self, *args):
@@ -603,7 +612,7 @@ class AdminScreen(MDScreen):
         DiagnosisInfo().fetch_diagnoses(
             intent="search",
             search_term=term,
-            callback=on_diags_fetched
+            callback=self.searcher.guard(on_diags_fetched)
         )
         
     def show_diags_sort_dropdown(self, caller):
@@ -664,14 +673,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("Diagnosis not found")
                 return
             self.display_items("DiagnosisRow", diags, "drug", self.diagnosis_mapper)
-        if val == "Name (A to Z)":
-            DiagnosisInfo().fetch_diagnoses(sort_term="name", sort_dir="asc", callback=on_diags_fetched)
-        elif val == "Name (Z to A)":
-            DiagnosisInfo().fetch_diagnoses(intent="all", sort_term="name", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (New to Old)":
-            DiagnosisInfo().fetch_diagnoses(intent="all", sort_term="date", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (Old to New)":
-            DiagnosisInfo().fetch_diagnoses(sort_term="date", sort_dir="asc", callback=on_diags_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("DiagnosisRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_diags_fetched)(rows)
+            return
+        DiagnosisInfo().fetch_diagnoses(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_diags_fetched))
     
     def display_diagnosis(self, diag_data: dict):
         self.preview_display(
@@ -717,7 +724,6 @@ class AdminScreen(MDScreen):
         return {
             'patient_name': (presc.get('patient_name') or "Unknown").strip(),
             'items_count': f"{len(entries)} Items",
-            'show_profile': lambda presc_data=presc: self.display_prescriptions(presc_data)
         }
 
         
@@ -737,7 +743,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("PrescriptionsRow", prescs, "diag", self.prescriptions_mapper)
         
-        PrescriptionsInfo().fetch_prescription("all", "all", "desc", callback=on_prescs_fetched)
+        PrescriptionsInfo().fetch_prescription("all", "all", "desc", callback=self.searcher.guard(on_prescs_fetched, self.dismiss_spinner))
 
     
     def search_prescriptions(self, *args):
@@ -756,7 +762,7 @@ class AdminScreen(MDScreen):
         PrescriptionsInfo().fetch_prescription(
             intent="search",
             search_term=term,
-            callback=on_prescs_fetched
+            callback=self.searcher.guard(on_prescs_fetched)
         )
         
     def show_prescs_sort_dropdown(self, caller):
@@ -817,14 +823,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("prescription not found")
                 return
             self.display_items("PrescriptionsRow", diags, "drug", self.prescriptions_mapper)
-        if val == "Name (A to Z)":
-            PrescriptionsInfo().fetch_prescription(sort_term="name", sort_dir="asc", callback=on_diags_fetched)
-        elif val == "Name (Z to A)":
-            PrescriptionsInfo().fetch_prescription(intent="all", sort_term="name", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (New to Old)":
-            PrescriptionsInfo().fetch_prescription(intent="all", sort_term="date", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (Old to New)":
-            PrescriptionsInfo().fetch_prescription(sort_term="date", sort_dir="asc", callback=on_diags_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("PrescriptionsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_diags_fetched)(rows)
+            return
+        PrescriptionsInfo().fetch_prescription(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_diags_fetched))
     
     def display_prescriptions(self, presc_data: dict):
         self.preview_display(
@@ -865,7 +869,6 @@ class AdminScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'app_desc': (app.get("appointment_desc") or "Unknown").strip(),
             'app_date': str(app.get("date_requested") or "YY-MM-DD"),
-            'show_profile': lambda app_data=app: self.display_appointments(app_data)
         }
 
 
@@ -885,7 +888,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("AppointmentsRow", apps, "diag", self.appointments_mapper)
         
-        AppointmentsInfo().fetch_apps("all", "all", "desc", callback=on_apps_fetched)
+        AppointmentsInfo().fetch_apps("all", "all", "desc", callback=self.searcher.guard(on_apps_fetched, self.dismiss_spinner))
 
     
     def search_appointments(self, *args):
@@ -904,7 +907,7 @@ class AdminScreen(MDScreen):
         AppointmentsInfo().fetch_apps(
             intent="search",
             search_term=term,
-            callback=on_apps_fetched
+            callback=self.searcher.guard(on_apps_fetched)
         )
         
     def show_apps_sort_dropdown(self, caller):
@@ -965,14 +968,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("Appointments not found")
                 return
             self.display_items("AppointmentsRow", apps, "drug", self.appointments_mapper)
-        if val == "Name (A to Z)":
-            AppointmentsInfo().fetch_apps(sort_term="name", sort_dir="asc", callback=on_apps_fetched)
-        elif val == "Name (Z to A)":
-            AppointmentsInfo().fetch_apps(intent="all", sort_term="name", sort_dir="desc", callback=on_apps_fetched)
-        elif val == "Date (New to Old)":
-            AppointmentsInfo().fetch_apps(intent="all", sort_term="date", sort_dir="desc", callback=on_apps_fetched)
-        elif val == "Date (Old to New)":
-            AppointmentsInfo().fetch_apps(sort_term="date", sort_dir="asc", callback=on_apps_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("AppointmentsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_apps_fetched)(rows)
+            return
+        AppointmentsInfo().fetch_apps(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_apps_fetched))
     
     def display_appointments(self, app_data: dict):
         self.preview_display(
@@ -1018,7 +1019,6 @@ class AdminScreen(MDScreen):
             'service_name': (service.get("service_name") or "Unknown").strip(),
             'service_desc': (service.get("service_desc") or "Unknown").strip(),
             'service_price': f"Ksh. {service.get('service_price', 0)}",
-            'show_profile': lambda service_data=service: self.display_services(service_data)
         }
 
     def show_services(self):
@@ -1037,7 +1037,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("ServicesRow", drugs, "service", self.services_mapper)
         
-        fetch_services("all", "all", "desc", callback=on_services_fetched)
+        fetch_services("all", "all", "desc", callback=self.searcher.guard(on_services_fetched, self.dismiss_spinner), warm=True)
 
     
     def search_services(self, *args):
@@ -1056,7 +1056,7 @@ class AdminScreen(MDScreen):
         fetch_services(
             intent="search",
             search_term=term,
-            callback=on_services_fetched
+            callback=self.searcher.guard(on_services_fetched)
         )
         
     def show_service_sort_dropdown(self, caller):
@@ -1117,14 +1117,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("Services not found")
                 return
             self.display_items("ServicesRow", services, "service", self.services_mapper)
-        if val == "Name (A to Z)":
-            fetch_services(sort_term="name", sort_dir="asc", callback=on_services_fetched)
-        elif val == "Name (Z to A)":
-            fetch_services(intent="all", sort_term="name", sort_dir="desc", callback=on_services_fetched)
-        elif val == "Date (New to Old)":
-            fetch_services(intent="all", sort_term="date", sort_dir="desc", callback=on_services_fetched)
-        elif val == "Date (Old to New)":
-            fetch_services(sort_term="date", sort_dir="asc", callback=on_services_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("ServicesRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_services_fetched)(rows)
+            return
+        fetch_services(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_services_fetched))
     
     def display_services(self, service_data: dict):
         self.preview_display(
@@ -1170,7 +1168,6 @@ class AdminScreen(MDScreen):
             'test_name': (test.get("test_name") or "Unknown").strip(),
             'test_desc': (test.get("test_desc") or "Unknown").strip(),
             'test_price': f"Ksh. {test.get('test_price', 0)}",
-            'show_profile': lambda test_data=test: self.display_tests(test_data)
         }
 
 
@@ -1190,7 +1187,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("TestsRow", drugs, "test", self.tests_mapper)
         
-        fetch_tests("all", "all", "desc", callback=on_tests_fetched)
+        fetch_tests("all", "all", "desc", callback=self.searcher.guard(on_tests_fetched, self.dismiss_spinner))
 
     
     def search_tests(self, *args):
@@ -1209,7 +1206,7 @@ class AdminScreen(MDScreen):
         fetch_tests(
             intent="search",
             search_term=term,
-            callback=on_tests_fetched
+            callback=self.searcher.guard(on_tests_fetched)
         )
         
     def show_test_sort_dropdown(self, caller):
@@ -1270,14 +1267,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("tests not found")
                 return
             self.display_items("TestsRow", tests, "test", self.tests_mapper)
-        if val == "Name (A to Z)":
-            fetch_tests(sort_term="name", sort_dir="asc", callback=on_tests_fetched)
-        elif val == "Name (Z to A)":
-            fetch_tests(intent="all", sort_term="name", sort_dir="desc", callback=on_tests_fetched)
-        elif val == "Date (New to Old)":
-            fetch_tests(intent="all", sort_term="date", sort_dir="desc", callback=on_tests_fetched)
-        elif val == "Date (Old to New)":
-            fetch_tests(sort_term="date", sort_dir="asc", callback=on_tests_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("TestsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_tests_fetched)(rows)
+            return
+        fetch_tests(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_tests_fetched))
     
     def display_tests(self, test_data: dict):
         self.preview_display(
@@ -1325,7 +1320,6 @@ class AdminScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'test': (test.get("test_name") or "Unknown").strip(),
             'desc': (test.get("test_desc") or "Unknown").strip(),
-            'show_profile': lambda request_data=request: self.display_requests(request_data)
         }
 
 
@@ -1345,7 +1339,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("RequestsRow", drugs, "request", self.requests_mapper)
         
-        RequestsInfo().fetch_requests("all", "all", "desc", callback=on_requests_fetched)
+        RequestsInfo().fetch_requests("all", "all", "desc", callback=self.searcher.guard(on_requests_fetched, self.dismiss_spinner))
 
     
     def search_requests(self, *args):
@@ -1364,7 +1358,7 @@ class AdminScreen(MDScreen):
         RequestsInfo().fetch_requests(
             intent="search",
             search_term=term,
-            callback=on_requests_fetched
+            callback=self.searcher.guard(on_requests_fetched)
         )
         
     def show_request_sort_dropdown(self, caller):
@@ -1425,14 +1419,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("requests not found")
                 return
             self.display_items("RequestsRow", requests, "request", self.requests_mapper)
-        if val == "Name (A to Z)":
-            RequestsInfo().fetch_requests(sort_term="name", sort_dir="asc", callback=on_requests_fetched)
-        elif val == "Name (Z to A)":
-            RequestsInfo().fetch_requests(intent="all", sort_term="name", sort_dir="desc", callback=on_requests_fetched)
-        elif val == "Date (New to Old)":
-            RequestsInfo().fetch_requests(intent="all", sort_term="date", sort_dir="desc", callback=on_requests_fetched)
-        elif val == "Date (Old to New)":
-            RequestsInfo().fetch_requests(sort_term="date", sort_dir="asc", callback=on_requests_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("RequestsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_requests_fetched)(rows)
+            return
+        RequestsInfo().fetch_requests(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_requests_fetched))
     
     def display_requests(self, req_data: dict):
         self.preview_display(
@@ -1473,7 +1465,6 @@ class AdminScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'observations': (result.get("observations") or "Unknown").strip(),
             'conclusions': str(result.get("conclusion") or "Unknown").strip(),
-            'show_profile': lambda result_data=result: self.display_results(result_data)
         }
 
 
@@ -1493,7 +1484,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("ResultsRow", drugs, "result", self.results_mapper)
         
-        ResultsInfo().fetch_results("all", "all", "desc", callback=on_results_fetched)
+        ResultsInfo().fetch_results("all", "all", "desc", callback=self.searcher.guard(on_results_fetched, self.dismiss_spinner))
 
     
     def search_results(self, *args):
@@ -1513,7 +1504,7 @@ class AdminScreen(MDScreen):
         ResultsInfo().fetch_results(
             intent="search",
             search_term=term,
-            callback=on_results_fetched
+            callback=self.searcher.guard(on_results_fetched)
         )
         
     def show_result_sort_dropdown(self, caller):
@@ -1574,14 +1565,12 @@ class AdminScreen(MDScreen):
                 self.show_snack("results not found")
                 return
             self.display_items("ResultsRow", results, "result", self.results_mapper)
-        if val == "Name (A to Z)":
-            ResultsInfo().fetch_results(sort_term="name", sort_dir="asc", callback=on_results_fetched)
-        elif val == "Name (Z to A)":
-            ResultsInfo().fetch_results(intent="all", sort_term="name", sort_dir="desc", callback=on_results_fetched)
-        elif val == "Date (New to Old)":
-            ResultsInfo().fetch_results(intent="all", sort_term="date", sort_dir="desc", callback=on_results_fetched)
-        elif val == "Date (Old to New)":
-            ResultsInfo().fetch_results(sort_term="date", sort_dir="asc", callback=on_results_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("ResultsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_results_fetched)(rows)
+            return
+        ResultsInfo().fetch_results(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_results_fetched))
     
     def display_results(self, res_data: dict):
         self.preview_display(
@@ -1627,7 +1616,6 @@ class AdminScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "OTC").strip(),
             'item_and_source': f"{(bill.get('item') or 'item').lower()} | {(bill.get('source') or 'source')}",
             'total': f"{bill.get('total') or '0'}",
-            'show_profile': lambda bill_data=bill: self.display_billings(bill_data)
         }
 
     
@@ -1647,7 +1635,7 @@ class AdminScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("BillingsRow", billings, "billings", self.billings_mapper)
         
-        billings.fetch_billings("all", "", callback=on_billings_fetched)
+        billings.fetch_billings("all", "", callback=self.searcher.guard(on_billings_fetched, self.dismiss_spinner), warm=True)
     
     def search_billings(self, *args):
         term = self.ids.search_field.text.strip()
@@ -1662,7 +1650,7 @@ class AdminScreen(MDScreen):
                 return
             self.display_items("BillingsRow", billings, "billings", self.billings_mapper)
 
-        billings.fetch_billings(filter="search", search_term=term, callback=on_billings_fetched)
+        billings.fetch_billings(filter="search", search_term=term, callback=self.searcher.guard(on_billings_fetched))
     
     def display_billings(self, bill_data: dict):
         self.preview_display(
@@ -1694,28 +1682,28 @@ class AdminScreen(MDScreen):
                 icon="bank",
             ),
             MDTextFieldHintText(text = "Hospital Name"),
-            text = self.store.get("hospital")['name']
+            text = HOSPITAL.name
         )
         self.hosp_edit_email = MDTextField(
             MDTextFieldLeadingIcon(
                 icon="gmail",
             ),
             MDTextFieldHintText(text = "Hospital Email"),
-            text = self.store.get("hospital")['email']
+            text = HOSPITAL.email
         )
         self.hosp_edit_phone = MDTextField(
             MDTextFieldLeadingIcon(
                 icon="phone",
             ),
             MDTextFieldHintText(text = "Hospital Phone"),
-            text = self.store.get("hospital")['phone']
+            text = HOSPITAL.phone
         )
         self.hosp_diag_edit = MDTextField(
             MDTextFieldLeadingIcon(
                 icon="currency-usd",
             ),
             MDTextFieldHintText(text = "Diagnosis Fee"),
-            text = str(self.store.get("hospital")['diag_fee']),
+            text = str(HOSPITAL.diag_fee),
             input_filter = "float"
         )
         
@@ -2035,11 +2023,10 @@ class AdminScreen(MDScreen):
         self.plan_dialog.dismiss()
 
     def update_countdown(self, dt):
-        if not self.store.exists("hospital"):
+        if HOSPITAL.expiry is None:
             return
 
-        expiry_str = self.store.get("hospital")['expiry_date']
-        expiry = datetime.fromisoformat(expiry_str)  
+        expiry = HOSPITAL.expiry
 
         KENYA_TZ = timezone(timedelta(hours=3))
         expiry = expiry.replace(tzinfo=KENYA_TZ)
@@ -2138,18 +2125,91 @@ class AdminScreen(MDScreen):
         )
         self.help_dialog.open()
     
+    def diagnostics_form(self):
+        snapshot = HTTP.metrics.snapshot()
+        grid = MDGridLayout(cols=1, adaptive_height=True, spacing=dp(8), padding=dp(5))
+        for name, stats in snapshot["endpoints"].items():
+            grid.add_widget(self.make_endpoint_label(name, stats))
+        if not snapshot["endpoints"]:
+            grid.add_widget(self.make_endpoint_label("No requests recorded yet.", None))
+
+        scroll = MDScrollView(size_hint_y=None, height=dp(400))
+        scroll.add_widget(grid)
+
+        self.diagnostics_dialog = MDDialog(
+            MDDialogIcon(icon="lan", theme_icon_color="Custom", icon_color="blue"),
+            MDDialogHeadlineText(text="Network Diagnostics", theme_text_color="Custom", text_color="blue"),
+            MDDialogSupportingText(
+                text="Total is the whole call; server is time to the first response byte. A wide gap points at the connection, not the backend.",
+                theme_text_color="Custom",
+                text_color="blue"
+            ),
+            MDDialogContentContainer(scroll, orientation="vertical"),
+            MDDialogButtonContainer(
+                Widget(),
+                MDIconButton(
+                    icon="download",
+                    theme_icon_color="Custom",
+                    icon_color="white",
+                    theme_bg_color="Custom",
+                    md_bg_color="blue",
+                    on_release=lambda *a: self.export_diagnostics()
+                ),
+                MDIconButton(
+                    icon="close",
+                    theme_icon_color="Custom",
+                    icon_color="white",
+                    theme_bg_color="Custom",
+                    md_bg_color="red",
+                    on_release=lambda *a: self.diagnostics_dialog.dismiss()
+                ),
+                spacing=dp(10),
+                padding=dp(10)
+            ),
+            auto_dismiss=False
+        )
+        self.diagnostics_dialog.open()
+
+    def make_endpoint_label(self, name, stats):
+        text = f"[b]{name}[/b]"
+        if stats is not None:
+            latency, server = stats["latency_ms"], stats["server_ms"]
+            statuses = ", ".join(f"{code}: {n}" for code, n in sorted(stats["statuses"].items()))
+            text += (
+                f"\n{stats['count']} calls, {stats['error_rate']:.0%} errors, {stats['retries']} retries ({statuses})"
+                f"\ntotal p50 {latency['p50']} / p90 {latency['p90']} / p99 {latency['p99']} ms"
+                f"\nserver p50 {server['p50']} / p90 {server['p90']} ms"
+                f"\n{stats['bytes_in'] / 1024:.1f} KB in, {stats['bytes_out'] / 1024:.1f} KB out"
+            )
+        return MDLabel(
+            text=text,
+            markup=True,
+            theme_text_color="Custom",
+            text_color="navy",
+            adaptive_height=True
+        )
+
+    def export_diagnostics(self):
+        try:
+            path = HTTP.metrics.export(get_app_data_path("network-metrics.json"))
+        except OSError as e:
+            print(f"Could not export network metrics: {e}")
+            self.show_snack("Could not export network metrics")
+            return
+        self.show_snack(f"Network metrics saved to {path}")
+
     def renew_plan(self):
         key = self.renew_plan_field.text.strip()
         if not key:
             self.show_snack("Activation key empty!")
             return
-        Thread(target=self.start_plan_renewal, args=(key,), daemon=True).start()
+        POOL.submit(self.start_plan_renewal, key)
 
 
     def start_plan_renewal(self, key):
         try:
-            url = f"{SERVER_URL}hospitals/renew-activation/?hospital_id={self.store.get('hospital')['hsp_id']}&activation_key={key}"
-            response = requests.put(url, timeout=3).json()
+            url = f"{SERVER_URL}hospitals/renew-activation/?hospital_id={HOSPITAL.id}&activation_key={key}"
+            response = HTTP.put(url, timeout=3).json()
 
             if response.get("message") == "renewed":
                 self.plan_dialog.dismiss()
@@ -2162,7 +2222,7 @@ class AdminScreen(MDScreen):
 
 
     def update_plan(self):
-        Thread(target=self.start_plan_update, daemon=True).start()
+        POOL.submit(self.start_plan_update)
 
 
     def start_plan_update(self):
@@ -2170,8 +2230,8 @@ class AdminScreen(MDScreen):
             if not self.store.exists("hospital"):
                 return
 
-            url = f"{SERVER_URL}hospitals/hospitals-specific/?hospital_id={self.store.get('hospital')['hsp_id']}"
-            response = requests.get(url)
+            url = f"{SERVER_URL}hospitals/hospitals-specific/?hospital_id={HOSPITAL.id}"
+            response = HTTP.get(url)
 
             if response.status_code != 200:
                 self.show_snack("Failed to update plan")
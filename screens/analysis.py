@@ -1,6 +1,5 @@
 from kivy.lang import Builder
-from kivy.clock import mainthread, Clock
-from kivy_garden.matplotlib import FigureCanvasKivyAgg
+from kivy.clock import mainthread
 from kivy.metrics import dp, sp
 
 
@@ -15,13 +14,12 @@ from screens.drugs import fetch_drugs
 from screens.billings import fetch_billings
 from config import resource_path, SERVER_URL, STORE
 from utils import PDFDownloader
+from tasks import LoadBatch
+from charts import CHARTS
+from analytics import PatientAnalytics, DrugAnalytics, BillingAnalytics
 
 from datetime import datetime, timedelta
-import matplotlib
-matplotlib.use('module://kivy_garden.matplotlib.backend_kivy')
-import matplotlib.pyplot as plt
 import webbrowser
-from threading import Thread
 
 
 Builder.load_file(resource_path("screens/analysis.kv"))
@@ -40,18 +38,76 @@ class AnalysisScreen(MDScreen):
         self.safe_drugs = []
         self.available_drugs = []
 
+        self.patient_stats = PatientAnalytics([])
+        self.drug_stats = DrugAnalytics([])
+        self.billing_stats = BillingAnalytics([])
+
         self.store = STORE
+        self.loader = None
+        self.load_timings = {}
 
         self.pdf_downloader = PDFDownloader()
     
-    def fetch_patients_data(self):
-        fetch_patients("all", "all", "desc", callback=self.on_patients_fetched)
+    def load_dashboard(self, on_done=None):
+        # All three datasets are requested at once; each panel renders as soon
+        # as its own data lands and the final pass runs after the last one.
+        if self.loader:
+            self.loader.cancel()
+        self.loader = LoadBatch(
+            ["patients", "drugs", "billings"],
+            on_item=self.on_dataset_loaded,
+            on_complete=lambda results, timings: self.on_dashboard_loaded(results, on_done),
+        )
+        self.load_timings = self.loader.timings
+        self.fetch_patients_data(self.loader.deliver("patients"))
+        self.fetch_drugs_data(self.loader.deliver("drugs"))
+        self.fetch_billings_data(self.loader.deliver("billings"))
+
+    def on_dataset_loaded(self, name, data):
+        handlers = {
+            "patients": self.on_patients_fetched,
+            "drugs": self.on_drugs_fetched,
+            "billings": self.on_billings_fetched,
+        }
+        handlers[name](data)
+
+    def on_dashboard_loaded(self, results, on_done=None):
+        # Final pass once all three are in: datasets that came back empty are
+        # cleared rather than left over from the previous load, then every KPI
+        # label is refreshed from the same snapshot.
+        if not results.get("patients"):
+            self.patients = []
+            self.patient_stats = PatientAnalytics([])
+        if not results.get("drugs"):
+            self.drugs = []
+            self.drug_stats = DrugAnalytics([])
+        if not results.get("billings"):
+            self.billings = []
+            self.billing_stats = BillingAnalytics([])
+
+        self.analyse_all_patients()
+        self.analyse_new_patients()
+        self.analyse_age_patients()
+        self.analyse_gender_patients()
+        self.analyse_all_drugs()
+        self.analyse_new_drugs()
+        self.analyse_expired_drugs()
+        self.analyse_safe_drugs()
+        self.analyse_available_drugs()
+        self.analyse_depleted_drugs()
+        self.analyse_sellable_drugs()
+        self.compare_monthly_sales()
+        if on_done:
+            on_done()
+
+    def fetch_patients_data(self, callback=None):
+        fetch_patients("all", "all", "desc", callback=callback or self.on_patients_fetched, warm=True)
     
-    def fetch_drugs_data(self):
-        fetch_drugs("all", "all", "desc", callback=self.on_drugs_fetched)
+    def fetch_drugs_data(self, callback=None):
+        fetch_drugs("all", "all", "desc", callback=callback or self.on_drugs_fetched, warm=True)
     
-    def fetch_billings_data(self):
-        fetch_billings("all", None, callback=self.on_billings_fetched)
+    def fetch_billings_data(self, callback=None):
+        fetch_billings("all", None, callback=callback or self.on_billings_fetched, warm=True)
     
     def on_billings_fetched(self, billings):
         if not billings:
@@ -66,8 +122,6 @@ class AnalysisScreen(MDScreen):
             return
         self.patients = patients
         self.start_patient_analysis()
-
-        Thread(target=self.fetch_drugs_data, daemon=True).start()
     
     def on_drugs_fetched(self, drugs):
         if not drugs:
@@ -75,167 +129,47 @@ class AnalysisScreen(MDScreen):
             return
         self.drugs = drugs
         self.start_drug_analysis()
-
-        Thread(target=self.fetch_billings_data, daemon=True).start()
     
     def start_patient_analysis(self):
         if not self.patients:
             self.show_snack("No patients to analyse")
             return
+        self.patient_stats = PatientAnalytics(self.patients)
         self.analyse_all_patients()
         self.analyse_new_patients()
         self.analyse_age_patients()
         self.analyse_gender_patients()
-        Clock.schedule_once(self.plot_weekly_patients, 1)
-        Clock.schedule_once(self.plot_monthly_patients, 1)
+        self.plot_weekly_patients()
+        self.plot_monthly_patients()
     
     def analyse_all_patients(self):
-        total = len(self.patients)
-        self.ids.total_patients_label.text = self.human_readable(total)
+        self.ids.total_patients_label.text = self.human_readable(self.patient_stats.counts["total"])
     
     def analyse_new_patients(self):
-        today = datetime.today().date()
-        thirty_days_ago = today - timedelta(days=30)
-
-        new_pats = [
-            pat for pat in self.patients
-            if thirty_days_ago <= datetime.strptime(pat['date_added'], "%Y-%m-%d").date() <= today
-        ]
-
-        self.ids.new_patients_label.text = self.human_readable(len(new_pats))
+        self.ids.new_patients_label.text = self.human_readable(self.patient_stats.counts["new"])
     
     def analyse_gender_patients(self):
-        male_pats = [pat for pat in self.patients if pat['patient_gender'].lower() == "male"]
-        female_pats = [pat for pat in self.patients if pat['patient_gender'].lower() == "female"]
-
-        self.ids.male_patients_label.text = self.human_readable(len(male_pats))
-        self.ids.female_patients_label.text = self.human_readable(len(female_pats))
+        self.ids.male_patients_label.text = self.human_readable(self.patient_stats.counts["male"])
+        self.ids.female_patients_label.text = self.human_readable(self.patient_stats.counts["female"])
     
     def analyse_age_patients(self):
-        today = datetime.today().date()
-        adult_pats = []
-        child_pats = []
-
-        for pat in self.patients:
-            dob = datetime.strptime(pat["patient_dob"], "%Y-%m-%d").date()
-            age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-            
-            if age >= 18:
-                adult_pats.append(pat)
-            else:
-                child_pats.append(pat)
-
-        self.ids.adult_patients_label.text = self.human_readable(len(adult_pats))
-        self.ids.child_patients_label.text = self.human_readable(len(child_pats))
+        self.ids.adult_patients_label.text = self.human_readable(self.patient_stats.counts["adults"])
+        self.ids.child_patients_label.text = self.human_readable(self.patient_stats.counts["children"])
     
-    def plot_weekly_patients(self, dt):
-        today = datetime.today().date()
-        last_7_days = [(today - timedelta(days=i)) for i in range(6, -1, -1)]  
-
-        counts = [
-            sum(
-                1 for pat in self.patients
-                if datetime.strptime(pat["date_added"], "%Y-%m-%d").date() == day
-            )
-            for day in last_7_days
-        ]
-
-        fig, ax = plt.subplots(figsize=(7,4), dpi=100)
-        bars = ax.bar(
-            [day.strftime("%a") for day in last_7_days],
-            counts,
-            color="#4A90E2",    
-            edgecolor="#2B5DAB",
-            linewidth=1,
-            alpha=0.9
-        )
-
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(
-                bar.get_x() + bar.get_width()/2,
-                height + 0.01,
-                str(height),
-                ha='center',
-                va='bottom',
-                fontsize=10,
-                color="#2B5DAB",
-                fontweight='bold'
-            )
-
-        ax.set_title("Patients Added in Last 7 Days", fontsize=14, fontweight='bold', color="#4A90E2")
-        ax.set_xlabel("Day", fontsize=12, color="#4A90E2")
-        ax.set_ylabel("Number of Patients", fontsize=12, color="#4A90E2")
-        ax.tick_params(colors="#4A90E2")
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color("#4A90E2")
-        ax.spines['bottom'].set_color("#4A90E2")
-        ax.yaxis.grid(True, linestyle='--', alpha=0.4)
-
-        fig.tight_layout()
-
-        Clock.schedule_once(lambda dt: self._update_weekly_patients(fig))
-
-    def _update_weekly_patients(self, fig):
-        self.ids.weekly_patients.clear_widgets()
-        self.ids.weekly_patients.add_widget(FigureCanvasKivyAgg(fig))
-
-    def plot_monthly_patients(self, dt):
-        today = datetime.today().date()
-        first_day = today.replace(day=1)
-
-        month_days = []
-        current_day = first_day
-        while current_day <= today:
-            month_days.append(current_day)
-            current_day += timedelta(days=1)
-
-        counts = [
-            sum(
-                1 for pat in self.patients
-                if datetime.strptime(pat["date_added"], "%Y-%m-%d").date() == day
-            )
-            for day in month_days
-        ]
-
-        fig, ax = plt.subplots(figsize=(10,4), dpi=100)
-        ax.plot(
-            [day.day for day in month_days], 
-            counts,
-            marker='o',
-            linestyle='-',
-            color="#4A90E2",
-            linewidth=2,
-            markersize=6,
-            alpha=0.9
-        )
-
-        for x, y in zip([day.day for day in month_days], counts):
-            if y > 0:
-                ax.text(x, y + 0.01, str(y), ha='center', va='bottom', fontsize=9, color="#2B5DAB")
-
-        ax.set_title("Patients Added This Month", fontsize=14, fontweight='bold', color="#4A90E2")
-        ax.set_xlabel("Day of Month", fontsize=12, color="#4A90E2")
-        ax.set_ylabel("Number of Patients", fontsize=12, color="#4A90E2")
-        ax.tick_params(colors="#4A90E2")
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color("#4A90E2")
-        ax.spines['bottom'].set_color("#4A90E2")
-        ax.yaxis.grid(True, linestyle='--', alpha=0.4)
-
-        self.ids.monthly_patients.clear_widgets()
-
-        Clock.schedule_once(lambda dt: self._update_monthly_patients(fig))
-
-    def _update_monthly_patients(self, fig):
-        self.ids.monthly_patients.clear_widgets()
-        self.ids.monthly_patients.add_widget(FigureCanvasKivyAgg(fig))
+    def plot_weekly_patients(self, dt=None):
+        day_labels = [day.strftime("%a") for day in self.patient_stats.weekly_days]
+        counts = self.patient_stats.weekly_counts
+        CHARTS.render("weekly_patients", draw_weekly_patients, (day_labels, counts), self.ids.weekly_patients, (7, 4), 100)
+
+    def plot_monthly_patients(self, dt=None):
+        days = [day.day for day in self.patient_stats.month_days]
+        counts = self.patient_stats.monthly_counts
+        CHARTS.render("monthly_patients", draw_monthly_patients, (days, counts), self.ids.monthly_patients, (10, 4), 100)
     
     def start_drug_analysis(self):
         if not self.drugs:
             return
+        self.drug_stats = DrugAnalytics(self.drugs)
         self.analyse_all_drugs()
         self.analyse_new_drugs()
         self.analyse_expired_drugs()
@@ -243,165 +177,53 @@ class AnalysisScreen(MDScreen):
         self.analyse_available_drugs()
         self.analyse_depleted_drugs()
         self.analyse_sellable_drugs()
-        Clock.schedule_once(self.plot_drug_charts, 1)
+        self.plot_drug_charts()
     
     def analyse_all_drugs(self):
-        all_drugs = len(self.drugs)
-        self.ids.total_drugs_label.text = self.human_readable(all_drugs)
+        self.ids.total_drugs_label.text = self.human_readable(self.drug_stats.counts["total"])
     
     def analyse_new_drugs(self):
-        today = datetime.today().date()
-        thirty_days_ago = today - timedelta(days=30)
-
-        new_drugs = [
-            drug for drug in self.drugs
-            if thirty_days_ago <= datetime.strptime(drug['date_added'], "%Y-%m-%d").date() <= today
-        ]
-
-        self.ids.new_drugs_label.text = self.human_readable(len(new_drugs))
+        self.ids.new_drugs_label.text = self.human_readable(self.drug_stats.counts["new"])
     
     def analyse_expired_drugs(self):
-        today = datetime.today().date()
-        expired_drugs = [drug for drug in self.drugs if datetime.strptime(drug["drug_expiry"], "%Y-%m-%d").date() <= today]
-        
-        self.expired_drugs = expired_drugs
-
-        self.ids.expired_drugs_label.text = self.human_readable(len(expired_drugs))
+        self.expired_drugs = self.drug_stats.select("expired")
+        self.ids.expired_drugs_label.text = self.human_readable(len(self.expired_drugs))
     
     def analyse_safe_drugs(self):
-        today = datetime.today().date()
-        safe_drugs = [drug for drug in self.drugs if datetime.strptime(drug["drug_expiry"], "%Y-%m-%d").date() > today]
-        
-        self.safe_drugs = safe_drugs
-
-        self.ids.safe_drugs_label.text = self.human_readable(len(safe_drugs))
+        self.safe_drugs = self.drug_stats.select("safe")
+        self.ids.safe_drugs_label.text = self.human_readable(len(self.safe_drugs))
 
     def analyse_available_drugs(self):
-        available_drugs = [drug for drug in self.drugs if drug["drug_quantity"] > 0]
-
-        self.available_drugs = available_drugs
-
-        self.ids.available_drugs_label.text = self.human_readable(len(available_drugs))
+        self.available_drugs = self.drug_stats.select("available")
+        self.ids.available_drugs_label.text = self.human_readable(len(self.available_drugs))
     
     def analyse_depleted_drugs(self):
-        depleted_drugs = [drug for drug in self.drugs if drug["drug_quantity"] <= 0]
-
-        self.depleted_drugs = depleted_drugs
-
-        self.ids.depleted_drugs_label.text = self.human_readable(len(depleted_drugs))
+        self.depleted_drugs = self.drug_stats.select("depleted")
+        self.ids.depleted_drugs_label.text = self.human_readable(len(self.depleted_drugs))
     
     def analyse_sellable_drugs(self):
-        today = datetime.today().date()
-        expired_drugs = [drug for drug in self.drugs if datetime.strptime(drug["drug_expiry"], "%Y-%m-%d").date() <= today]
-
-        sellable_drugs  = [
-            drug 
-            for drug in self.drugs
-            if drug['drug_quantity'] > 0 and 
-            drug not in expired_drugs
-        ]
-
-        self.sellable_drugs = sellable_drugs
-
-        self.ids.sellable_drugs_label.text = self.human_readable(len(sellable_drugs))
+        self.sellable_drugs = self.drug_stats.select("sellable")
+        self.ids.sellable_drugs_label.text = self.human_readable(len(self.sellable_drugs))
     
-    def plot_drug_charts(self, dt):
-        pie_labels = ["Expired", "Safe", "Sellable"]
+    def plot_drug_charts(self, dt=None):
         pie_sizes = [len(self.expired_drugs), len(self.safe_drugs), len(self.sellable_drugs)]
-        if sum(pie_sizes) == 0: 
-            pie_sizes = [1,0,0]
-        pie_colors = ["#E74C3C", "#2ECC71", "#3498DB"] 
-        explode = (0.05, 0.05, 0.05)  
-
-        fig1, ax1 = plt.subplots(figsize=(6,6), dpi=120)
-        wedges, texts, autotexts = ax1.pie(
-            pie_sizes,
-            labels=pie_labels,
-            autopct='%1.1f%%',
-            startangle=90,
-            colors=pie_colors,
-            explode=explode,
-            shadow=False,  
-            wedgeprops={'edgecolor':'white'}
-        )
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontsize(11)
-            autotext.set_fontweight('bold')
-        ax1.set_title("Drug Status Distribution", fontsize=16, fontweight='bold', color="#34495E")
-        ax1.axis('equal')
-        fig1.tight_layout()
-
-        donut_labels = ["Available", "Depleted", "Sellable"]
         donut_sizes = [len(self.available_drugs), len(self.depleted_drugs), len(self.sellable_drugs)]
-        if sum(donut_sizes) == 0:
-            donut_sizes = [1,0,0]
-        donut_colors = ["#1ABC9C", "#F39C12", "#3498DB"]
-        explode_donut = (0.05, 0.05, 0.05)
-
-        fig2, ax2 = plt.subplots(figsize=(6,6), dpi=120)
-        wedges2, texts2, autotexts2 = ax2.pie(
-            donut_sizes,
-            labels=donut_labels,
-            autopct='%1.1f%%',
-            startangle=90,
-            colors=donut_colors,
-            explode=explode_donut,
-            shadow=False,
-            wedgeprops={'edgecolor':'white', 'width':0.4}  
-        )
-        for autotext in autotexts2:
-            autotext.set_color('magenta')
-            autotext.set_fontsize(11)
-            autotext.set_fontweight('bold')
-        ax2.set_title("Drug Availability", fontsize=16, fontweight='bold', color="#34495E")
-        ax2.axis('equal')
-        fig2.tight_layout()
-
-        Clock.schedule_once(lambda dt: self._update_drug_charts(fig1, fig2))
-
-    def _update_drug_charts(self, fig1, fig2):
-        self.ids.drug_pie_chart.clear_widgets()
-        self.ids.drug_pie_chart.add_widget(FigureCanvasKivyAgg(fig1))
-
-        self.ids.drug_donut_chart.clear_widgets()
-        self.ids.drug_donut_chart.add_widget(FigureCanvasKivyAgg(fig2))
+        CHARTS.render("drug_pie", draw_drug_pie, (pie_sizes,), self.ids.drug_pie_chart, (6, 6), 120)
+        CHARTS.render("drug_donut", draw_drug_donut, (donut_sizes,), self.ids.drug_donut_chart, (6, 6), 120)
 
 
     def start_billings_analysis(self):
         if not self.billings:
             self.show_snack("No billings to analyse")
             return
+        self.billing_stats = BillingAnalytics(self.billings)
         self.compare_monthly_sales()
-        Clock.schedule_once(self.plot_monthly_revenue_waterfall, 1)
+        self.plot_monthly_revenue_waterfall()
     
 
     def compare_monthly_sales(self):
-        today = datetime.today()
-        current_month = today.month
-        current_year = today.year
-
-
-        if current_month == 1: 
-            last_month = 12
-            last_month_year = current_year - 1
-        else:
-            last_month = current_month - 1
-            last_month_year = current_year
-
-
-        this_month_total = sum(
-            bill['total'] for bill in self.billings
-            if datetime.strptime(bill['created_at'], "%Y-%m-%d").year == current_year
-            and datetime.strptime(bill['created_at'], "%Y-%m-%d").month == current_month
-        )
-
-        last_month_total = sum(
-            bill['total'] for bill in self.billings
-            if datetime.strptime(bill['created_at'], "%Y-%m-%d").year == last_month_year
-            and datetime.strptime(bill['created_at'], "%Y-%m-%d").month == last_month
-        )
-
+        this_month_total = self.billing_stats.this_month_total
+        last_month_total = self.billing_stats.last_month_total
 
         if last_month_total == 0:
             percentage_diff = None  
@@ -411,76 +233,10 @@ class AnalysisScreen(MDScreen):
         self.ids.last_month_revenue.text = f"Ksh. {self.human_readable(last_month_total)}"
         self.ids.this_month_revenue.text = f"Ksh. {self.human_readable(this_month_total)}"
     
-    def plot_monthly_revenue_waterfall(self, dt):
-        today = datetime.today().date()
-        first_day = today.replace(day=1)
-        last_day = today
-
-        month_days = []
-        current_day = first_day
-        while current_day <= last_day:
-            month_days.append(current_day)
-            current_day += timedelta(days=1)
-
-        daily_revenue = [
-            sum(
-                bill['total']
-                for bill in self.billings
-                if datetime.strptime(bill['created_at'], "%Y-%m-%d").date() == day
-            )
-            for day in month_days
-        ]
-
-        cumulative = [0]
-        for rev in daily_revenue:
-            cumulative.append(cumulative[-1] + rev)
-        starts = cumulative[:-1]
-
-        fig, ax = plt.subplots(figsize=(12, 5), dpi=100)
-
-        for i, day in enumerate(month_days):
-            bar_color = "#4A90E2" if daily_revenue[i] >= 0 else "#E74C3C"
-            bar = ax.bar(
-                day.day,
-                daily_revenue[i],
-                bottom=starts[i],
-                color=bar_color,
-                edgecolor="#2B5DAB",
-                linewidth=1,
-                alpha=0.85
-            )
-
-            height = daily_revenue[i]
-            if height != 0:
-                ax.text(
-                    day.day,
-                    starts[i] + height/2,
-                    f"{height:.0f}",
-                    ha='center',
-                    va='center',
-                    fontsize=10,
-                    fontweight='bold',
-                    color='white'
-                )
-
-        ax.set_title("Daily Revenue (This Month)", fontsize=16, fontweight='bold', color="#34495E")
-        ax.set_xlabel("Day of Month", fontsize=12, color="#34495E")
-        ax.set_ylabel("Revenue", fontsize=12, color="#34495E")
-        ax.tick_params(colors="#34495E")
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['left'].set_color("#34495E")
-        ax.spines['bottom'].set_color("#34495E")
-        ax.yaxis.grid(True, linestyle='--', alpha=0.4)
-        ax.set_xticks([day.day for day in month_days])
-        ax.set_xticklabels([str(day.day) for day in month_days], rotation=45)
-        fig.tight_layout()
-
-        Clock.schedule_once(lambda dt: self._update_monthly_waterfall(fig))
-
-    def _update_monthly_waterfall(self, fig):
-        self.ids.monthly_revenue_waterfall.clear_widgets()
-        self.ids.monthly_revenue_waterfall.add_widget(FigureCanvasKivyAgg(fig))
+    def plot_monthly_revenue_waterfall(self, dt=None):
+        days = [day.day for day in self.billing_stats.month_days]
+        daily_revenue = self.billing_stats.daily_revenue
+        CHARTS.render("revenue_waterfall", draw_revenue_waterfall, (days, daily_revenue), self.ids.monthly_revenue_waterfall, (12, 5), 100)
 
 
     def human_readable(self, num: int) -> str:
@@ -516,13 +272,7 @@ class AnalysisScreen(MDScreen):
             )
 
         elif filter == "new":
-            today = datetime.today().date()
-            thirty_days_ago = today - timedelta(days=30)
-
-            patients = [
-                pat for pat in self.patients
-                if thirty_days_ago <= datetime.strptime(pat['date_added'], "%Y-%m-%d").date() <= today
-            ]
+            patients = self.patient_stats.select("new")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("patients", "new")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="patients", filter="new",
@@ -530,18 +280,7 @@ class AnalysisScreen(MDScreen):
             )
 
         elif filter == "adults":
-            today = datetime.today().date()
-            adult_pats = []
-
-            for pat in self.patients:
-                dob = datetime.strptime(pat["patient_dob"], "%Y-%m-%d").date()
-                age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-                
-                if age >= 18:
-                    adult_pats.append(pat)
-            
-            patients = adult_pats
-
+            patients = self.patient_stats.select("adults")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("patients", "adults")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="patients", filter="adults",
@@ -549,24 +288,14 @@ class AnalysisScreen(MDScreen):
             )
         
         elif filter == "children":
-            today = datetime.today().date()
-            child_pats = []
-
-            for pat in self.patients:
-                dob = datetime.strptime(pat["patient_dob"], "%Y-%m-%d").date()
-                age = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-                
-                if age < 18:
-                    child_pats.append(pat)
-            
-            patients = child_pats
+            patients = self.patient_stats.select("children")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("patients", "children")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="patients", filter="children",
                 format="csv"
             )
         elif filter == "male":
-            patients = [pat for pat in self.patients if pat['patient_gender'].lower() == "male"]
+            patients = self.patient_stats.select("male")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("patients", "male")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="patients", filter="male",
@@ -574,7 +303,7 @@ class AnalysisScreen(MDScreen):
             )
         
         elif filter == "female":
-            patients = [pat for pat in self.patients if pat['patient_gender'].lower() == "female"]
+            patients = self.patient_stats.select("female")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("patients", "female")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="patients", filter="female",
@@ -601,21 +330,14 @@ class AnalysisScreen(MDScreen):
                 format="csv"
             )
         elif filter == "new":
-            today = datetime.today().date()
-            thirty_days_ago = today - timedelta(days=30)
-
-            drugs = [
-                drug for drug in self.drugs
-                if thirty_days_ago <= datetime.strptime(drug['date_added'], "%Y-%m-%d").date() <= today
-            ]
+            drugs = self.drug_stats.select("new")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("drugs", "new")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="drugs", filter="new",
                 format="csv"
             )
         elif filter == "expired":
-            today = datetime.today().date()
-            drugs = [drug for drug in self.drugs if datetime.strptime(drug["drug_expiry"], "%Y-%m-%d").date() <= today]
+            drugs = self.drug_stats.select("expired")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("drugs", "expired")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="drugs", filter="expired",
@@ -623,8 +345,7 @@ class AnalysisScreen(MDScreen):
             )
         
         elif filter == "safe":
-            today = datetime.today().date()
-            drugs = [drug for drug in self.drugs if datetime.strptime(drug["drug_expiry"], "%Y-%m-%d").date() > today]
+            drugs = self.drug_stats.select("safe")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("drugs", "safe")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="drugs", filter="safe",
@@ -632,7 +353,7 @@ class AnalysisScreen(MDScreen):
             )
 
         elif filter == "available":
-            drugs = [drug for drug in self.drugs if drug["drug_quantity"] > 0]
+            drugs = self.drug_stats.select("available")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("drugs", "available")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="drugs", filter="available",
@@ -640,7 +361,7 @@ class AnalysisScreen(MDScreen):
             )
         
         elif filter == "depleted":
-            drugs = [drug for drug in self.drugs if drug["drug_quantity"] <= 0]
+            drugs = self.drug_stats.select("depleted")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("drugs", "depleted")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="drugs", filter="depleted",
@@ -648,15 +369,7 @@ class AnalysisScreen(MDScreen):
             )
         
         elif filter == "sellable":
-            today = datetime.today().date()
-            expired_drugs = [drug for drug in self.drugs if datetime.strptime(drug["drug_expiry"], "%Y-%m-%d").date() <= today]
-
-            drugs  = [
-                drug 
-                for drug in self.drugs
-                if drug['drug_quantity'] > 0 and 
-                drug not in expired_drugs
-            ]
+            drugs = self.drug_stats.select("sellable")
             self.ids.pdf_downloader.on_release = lambda *a: self.pdf_downloader.download_document("drugs", "sellable")
             self.ids.csv_downloader.on_release = lambda *a: self.pdf_downloader.download_document(
                 source="drugs", filter="sellable",
@@ -685,17 +398,8 @@ class AnalysisScreen(MDScreen):
 
     def refresh_content(self):
         self.show_snack("Starting refreshing...")
-        self.fetch_billings_data()
-        self.fetch_drugs_data()
-        self.fetch_patients_data()
-        self.initialize_analysis()
-        self.show_snack("Done refreshing.")
+        self.load_dashboard(on_done=lambda: self.show_snack("Done refreshing."))
 
-    def initialize_analysis(self):
-        self.start_patient_analysis()
-        self.start_drug_analysis()
-        self.start_billings_analysis()
-    
     def show_filter_dropdown(self, caller):
         drop_down_items = [
             {
@@ -885,4 +589,173 @@ class AnalysisScreen(MDScreen):
     
 
     def on_enter(self):
-        Thread(target=self.fetch_patients_data, daemon=True).start()
\ No newline at end of file
+        self.load_dashboard()
+
+
+# Chart drawing runs on pool workers (see charts.CHARTS): each function gets a
+# fresh Figure and only the plain series it plots.
+def draw_weekly_patients(fig, day_labels, counts):
+    ax = fig.subplots()
+    bars = ax.bar(
+        day_labels,
+        counts,
+        color="#4A90E2",    
+        edgecolor="#2B5DAB",
+        linewidth=1,
+        alpha=0.9
+    )
+
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(
+            bar.get_x() + bar.get_width()/2,
+            height + 0.01,
+            str(height),
+            ha='center',
+            va='bottom',
+            fontsize=10,
+            color="#2B5DAB",
+            fontweight='bold'
+        )
+
+    ax.set_title("Patients Added in Last 7 Days", fontsize=14, fontweight='bold', color="#4A90E2")
+    ax.set_xlabel("Day", fontsize=12, color="#4A90E2")
+    ax.set_ylabel("Number of Patients", fontsize=12, color="#4A90E2")
+    ax.tick_params(colors="#4A90E2")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color("#4A90E2")
+    ax.spines['bottom'].set_color("#4A90E2")
+    ax.yaxis.grid(True, linestyle='--', alpha=0.4)
+
+    fig.tight_layout()
+
+
+def draw_monthly_patients(fig, days, counts):
+    ax = fig.subplots()
+    ax.plot(
+        days, 
+        counts,
+        marker='o',
+        linestyle='-',
+        color="#4A90E2",
+        linewidth=2,
+        markersize=6,
+        alpha=0.9
+    )
+
+    for x, y in zip(days, counts):
+        if y > 0:
+            ax.text(x, y + 0.01, str(y), ha='center', va='bottom', fontsize=9, color="#2B5DAB")
+
+    ax.set_title("Patients Added This Month", fontsize=14, fontweight='bold', color="#4A90E2")
+    ax.set_xlabel("Day of Month", fontsize=12, color="#4A90E2")
+    ax.set_ylabel("Number of Patients", fontsize=12, color="#4A90E2")
+    ax.tick_params(colors="#4A90E2")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color("#4A90E2")
+    ax.spines['bottom'].set_color("#4A90E2")
+    ax.yaxis.grid(True, linestyle='--', alpha=0.4)
+    fig.tight_layout()
+
+
+def draw_drug_pie(fig, pie_sizes):
+    pie_labels = ["Expired", "Safe", "Sellable"]
+    if sum(pie_sizes) == 0: 
+        pie_sizes = [1,0,0]
+    pie_colors = ["#E74C3C", "#2ECC71", "#3498DB"] 
+    explode = (0.05, 0.05, 0.05)  
+
+    ax1 = fig.subplots()
+    wedges, texts, autotexts = ax1.pie(
+        pie_sizes,
+        labels=pie_labels,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=pie_colors,
+        explode=explode,
+        shadow=False,  
+        wedgeprops={'edgecolor':'white'}
+    )
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontsize(11)
+        autotext.set_fontweight('bold')
+    ax1.set_title("Drug Status Distribution", fontsize=16, fontweight='bold', color="#34495E")
+    ax1.axis('equal')
+    fig.tight_layout()
+
+
+def draw_drug_donut(fig, donut_sizes):
+    donut_labels = ["Available", "Depleted", "Sellable"]
+    if sum(donut_sizes) == 0:
+        donut_sizes = [1,0,0]
+    donut_colors = ["#1ABC9C", "#F39C12", "#3498DB"]
+    explode_donut = (0.05, 0.05, 0.05)
+
+    ax2 = fig.subplots()
+    wedges2, texts2, autotexts2 = ax2.pie(
+        donut_sizes,
+        labels=donut_labels,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=donut_colors,
+        explode=explode_donut,
+        shadow=False,
+        wedgeprops={'edgecolor':'white', 'width':0.4}  
+    )
+    for autotext in autotexts2:
+        autotext.set_color('magenta')
+        autotext.set_fontsize(11)
+        autotext.set_fontweight('bold')
+    ax2.set_title("Drug Availability", fontsize=16, fontweight='bold', color="#34495E")
+    ax2.axis('equal')
+    fig.tight_layout()
+
+
+def draw_revenue_waterfall(fig, days, daily_revenue):
+    cumulative = [0]
+    for rev in daily_revenue:
+        cumulative.append(cumulative[-1] + rev)
+    starts = cumulative[:-1]
+
+    ax = fig.subplots()
+
+    for i, day in enumerate(days):
+        bar_color = "#4A90E2" if daily_revenue[i] >= 0 else "#E74C3C"
+        bar = ax.bar(
+            day,
+            daily_revenue[i],
+            bottom=starts[i],
+            color=bar_color,
+            edgecolor="#2B5DAB",
+            linewidth=1,
+            alpha=0.85
+        )
+
+        height = daily_revenue[i]
+        if height != 0:
+            ax.text(
+                day,
+                starts[i] + height/2,
+                f"{height:.0f}",
+                ha='center',
+                va='center',
+                fontsize=10,
+                fontweight='bold',
+                color='white'
+            )
+
+    ax.set_title("Daily Revenue (This Month)", fontsize=16, fontweight='bold', color="#34495E")
+    ax.set_xlabel("Day of Month", fontsize=12, color="#34495E")
+    ax.set_ylabel("Revenue", fontsize=12, color="#34495E")
+    ax.tick_params(colors="#34495E")
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_color("#34495E")
+    ax.spines['bottom'].set_color("#34495E")
+    ax.yaxis.grid(True, linestyle='--', alpha=0.4)
+    ax.set_xticks(days)
+    ax.set_xticklabels([str(day) for day in days], rotation=45)
+    fig.tight_layout()
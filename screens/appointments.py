@@ -21,15 +21,17 @@ from kivymd.uix.pickers import MDDockedDatePicker, MDTimePickerDialHorizontal
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
 from datetime import datetime, timedelta
-from config import SERVER_URL
+from config import SERVER_URL, HOSPITAL
 from screens.patients import fetch_patients
 from screens.services import fetch_services
 from screens.worker import fetch_workers
 from config import STORE
-from utils import has_internet
 import asyncio
 
 class AppointmentsRow(MDListItem):
@@ -211,10 +213,16 @@ class AppointmentsInfo:
 
 
     def fetch_apps(self, intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-        Thread(target=self.fetch_and_return_online_apps, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+        if intent == "search":
+            POOL.cancel("appointments-search")
+        return POOL.submit(self.fetch_and_return_online_apps, intent, sort_term, sort_dir, search_term, callback, group=f"appointments-{intent}")
 
     def fetch_and_return_online_apps(self, intent, sort_term, sort_dir, search_term, callback):
-        hospital_id = (self.store.get('hospital') or {}).get('hsp_id')
+        if intent == "search" and MIRROR.has("appointments"):
+            if callback:
+                self.run_on_main_thread(callback, MIRROR.search("appointments", search_term))
+            return
+        hospital_id = HOSPITAL.id
         if not hospital_id:
             if callback:
                 self.run_on_main_thread(callback, [])
@@ -223,18 +231,16 @@ class AppointmentsInfo:
         if intent == "search":
             url = f"{SERVER_URL}appointments/appointments-search/?hospital_id={hospital_id}&search_term={search_term}"
         elif intent == "all":
-            url = f"{SERVER_URL}appointments/appointments-fetch/?hospital_id={hospital_id}&sort_term={sort_term}&sort_dir={sort_dir}"
+            url = f"{SERVER_URL}appointments/appointments-fetch/?hospital_id={hospital_id}&sort_term=all&sort_dir=desc"
 
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-        except Exception as e:
-            print(f"Error fetching apps: {e}")
-            data = []
+        def deliver(data):
+            if callback:
+                self.run_on_main_thread(callback, [] if data is None else data)
 
-        if callback:
-            self.run_on_main_thread(callback, data)
+        if intent == "all":
+            SYNC.pull("appointments", url, lambda ok: deliver(MIRROR.all("appointments", sort_term, sort_dir)), timeout=10)
+        else:
+            HTTP.get_json(url, deliver, timeout=10)
 
 
 
@@ -381,17 +387,14 @@ class AppointmentsInfo:
         self.submit_apps_data(data)
     def submit_apps_data(self, data):
         self.show_snack("Please wait as appointment is added")
-        Thread(target=self.add_appointment, args=(data,), daemon=True).start()
+        POOL.submit(self.add_appointment, data)
 
     def add_appointment(self, data):
-        url = f"{SERVER_URL}appointments/appointments-add/?hospital_id={self.store.get('hospital')['hsp_id']}"
-        response = requests.post(url, json=data)
-        if response.status_code != 200:
-            self.add_button.disabled = False
-            self.show_snack("Failed to sync appointment")
-            return
+        url = f"{SERVER_URL}appointments/appointments-add/?hospital_id={HOSPITAL.id}"
         self.add_button.disabled = False
-        self.show_snack("Appointment synced to cloud.")
+        OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: self.show_snack(
+            "Appointment synced to cloud." if ok else "Failed to sync appointment"
+        ))
 
     def make_text_field(self, field_name, field_icon, field_text=None):
         text_field = MDTextField(
@@ -509,27 +512,23 @@ class AppointmentsInfo:
 
     def submit_app_edit_data(self, data, app_id):
         self.show_snack("Please wait as appointment is edited")
-        Thread(target=self.edit_apps, args=(data, app_id), daemon=True).start()
+        POOL.submit(self.edit_apps, data, app_id)
 
     def edit_apps(self, data, app_id):
-        url = f"{SERVER_URL}appointments/appointments-edit/?hospital_id={self.store.get('hospital')['hsp_id']}&appointment_id={app_id}"
-        response = requests.put(url, json=data)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync appointment")
-            return
-        self.show_snack("Appointment synced successfully")
+        url = f"{SERVER_URL}appointments/appointments-edit/?hospital_id={HOSPITAL.id}&appointment_id={app_id}"
+        OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: self.show_snack(
+            "Appointment synced successfully" if ok else "Failed to sync appointment"
+        ))
 
     def start_app_deletion(self, app_id):
         self.show_snack("Please wait as appointment is deleted")
-        Thread(target=self.delete_app, args=(app_id,), daemon=True).start()
+        POOL.submit(self.delete_app, app_id)
 
     def delete_app(self, app_id):
-        url = f"{SERVER_URL}appointments/appointments-delete/?hospital_id={self.store.get('hospital')['hsp_id']}&appointment_id={app_id}"
-        response = requests.delete(url)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync appointment")
-            return
-        self.show_snack("Appointment synced successfully")
+        url = f"{SERVER_URL}appointments/appointments-delete/?hospital_id={HOSPITAL.id}&appointment_id={app_id}"
+        OUTBOX.enqueue("DELETE", url, on_result=lambda ok: self.show_snack(
+            "Appointment synced successfully" if ok else "Failed to sync appointment"
+        ))
 
     def show_date_picker(self, target_field):
         day = month = year = "00"
@@ -1,4 +1,4 @@
-from threading import Thread
+from tasks import POOL
 from kivy.clock import mainthread
 from kivy.properties import StringProperty, ObjectProperty
 from kivy.uix.recycleboxlayout import RecycleBoxLayout
@@ -18,13 +18,16 @@ from kivymd.uix.textfield import MDTextField, MDTextFieldHintText
 from kivymd.uix.card import MDCard
 from kivymd.uix.button import MDIconButton
 
-import requests
+from network import HTTP
+from mirror import MIRROR
+from sync import SYNC
+from fetchcache import FETCHES
+from warmstart import WARM
 import asyncio
 
-from config import SERVER_URL
+from config import SERVER_URL, HOSPITAL
 from config import STORE
 from screens.patients import fetch_patients
-from utils import has_internet
 
 store = STORE
 
@@ -57,31 +60,50 @@ class BillingsRow(MDListItem):
         self.bind(total=lambda inst, val: setattr(self.total_label, 'text', val))
 
 
-def fetch_billings(filter: str, search_term: str = "fidel", patient_id: int = 1, callback=None):
-    Thread(target=start_online_fetching_bills, args=(filter, patient_id, search_term, callback), daemon=True).start()
+def fetch_billings(filter: str, search_term: str = "fidel", patient_id: int = 1, callback=None, warm=False):
+    if filter == "search":
+        POOL.cancel("billings-search")
+    return POOL.submit(start_online_fetching_bills, filter, patient_id, search_term, callback, warm, group=f"billings-{filter}")
 
-def start_online_fetching_bills(filter, pat_id, search_term, callback=None):
+def start_online_fetching_bills(filter, pat_id, search_term, callback=None, warm=False):
+    if filter == "search" and MIRROR.has("billings"):
+        if callback:
+            run_on_main_thread(callback, MIRROR.search("billings", search_term))
+        return
+    key = ("billings", filter, "date", "desc", search_term if filter == "search" else pat_id if filter != "all" else None)
+    cached = FETCHES.get(key)
+    if cached is not None:
+        if callback:
+            run_on_main_thread(callback, cached)
+        return
+    store = FETCHES.storer(key)
     if filter == "all":
-        url = f"{SERVER_URL}billings/billings/show-all/?hospital_id={store.get('hospital')['hsp_id']}"
+        url = f"{SERVER_URL}billings/billings/show-all/?hospital_id={HOSPITAL.id}"
     elif filter == "patient":
-        url = f"{SERVER_URL}billings/billings/show-patient/?hospital_id={store.get('hospital')['hsp_id']}&patient_id={pat_id}"
+        url = f"{SERVER_URL}billings/billings/show-patient/?hospital_id={HOSPITAL.id}&patient_id={pat_id}"
     elif filter == "patient-today":
-        url = f"{SERVER_URL}billings/billings/show-patient-today/?hospital_id={store.get('hospital')['hsp_id']}&patient_id={pat_id}"
+        url = f"{SERVER_URL}billings/billings/show-patient-today/?hospital_id={HOSPITAL.id}&patient_id={pat_id}"
     elif filter == "search":
-        url = f"{SERVER_URL}billings/billings/search/?hospital_id={store.get('hospital')['hsp_id']}&search_term={search_term}"
+        url = f"{SERVER_URL}billings/billings/search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
     else:
         return
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-        else:
-            data = []
-    except Exception:
-        data = []
+    def deliver(data, fresh=True):
+        if data is not None and fresh:
+            store(data)
+        if callback:
+            run_on_main_thread(callback, [] if data is None else data)
 
-    if callback:
-        run_on_main_thread(callback, data)
+    if filter == "all":
+        settle = WARM.serve("billings", lambda: deliver(MIRROR.all("billings", "date", "desc"), False)) if warm else None
+
+        def synced(ok):
+            if settle is None or settle(ok):
+                deliver(MIRROR.all("billings", "date", "desc"), ok)
+
+        first_page = (lambda: deliver(MIRROR.all("billings", "date", "desc"), False)) if warm else None
+        SYNC.pull("billings", url, synced, first_page)
+    else:
+        HTTP.get_json(url, deliver)
     
 def make_display_label(text, color="blue"):
     lbl = MDLabel(
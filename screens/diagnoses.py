@@ -21,12 +21,15 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
 from datetime import datetime, timedelta
 import asyncio
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 from screens.patients import fetch_patients
 
 
@@ -172,26 +175,29 @@ class DiagnosisInfo:
         return scroll
 
     def fetch_diagnoses(self, intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-        Thread(target=self.fetch_and_return_online_diagnoses, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+        if intent == "search":
+            POOL.cancel("diagnoses-search")
+        return POOL.submit(self.fetch_and_return_online_diagnoses, intent, sort_term, sort_dir, search_term, callback, group=f"diagnoses-{intent}")
 
     def fetch_and_return_online_diagnoses(self, intent, sort_term, sort_dir, search_term, callback):
+        if intent == "search" and MIRROR.has("diagnoses"):
+            if callback:
+                self.run_on_main_thread(callback, MIRROR.search("diagnoses", search_term))
+            return
         url = ""
         if intent == "search":
-            url = f"{SERVER_URL}diagnosis/diagnosis-search/?hospital_id={self.store.get('hospital')['hsp_id']}&search_term={search_term}"
+            url = f"{SERVER_URL}diagnosis/diagnosis-search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
         elif intent == "all":
-            url = f"{SERVER_URL}diagnosis/diagnosis-fetch/?hospital_id={self.store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
+            url = f"{SERVER_URL}diagnosis/diagnosis-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
 
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-            else:
-                data = []
-        except Exception:
-            data = []
+        def deliver(data):
+            if callback:
+                self.run_on_main_thread(callback, [] if data is None else data)
 
-        if callback:
-            self.run_on_main_thread(callback, data)
+        if intent == "all":
+            SYNC.pull("diagnoses", url, lambda ok: deliver(MIRROR.all("diagnoses", sort_term, sort_dir)))
+        else:
+            HTTP.get_json(url, deliver)
 
 
     @mainthread
@@ -284,17 +290,14 @@ class DiagnosisInfo:
         self.submit_diagnosis_data(data)
     def submit_diagnosis_data(self, data):
         self.show_snack("Please wait as diagnosis is added")
-        Thread(target=self.add_diagnosis, args=(data,), daemon=True).start()
+        POOL.submit(self.add_diagnosis, data)
 
     def add_diagnosis(self, data):
-        url = f"{SERVER_URL}diagnosis/diagnosis-add/?hospital_id={self.store.get('hospital')['hsp_id']}"
-        response = requests.post(url, json=data)
-        if response.status_code != 200:
-            self.add_button.disabled = False
-            self.show_snack("Failed to sync diagnosis")
-            return
+        url = f"{SERVER_URL}diagnosis/diagnosis-add/?hospital_id={HOSPITAL.id}"
         self.add_button.disabled = False
-        self.show_snack("Diagnosis synced successfully")
+        OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: self.show_snack(
+            "Diagnosis synced successfully" if ok else "Failed to sync diagnosis"
+        ))
 
     def make_text_field(self, field_name, field_icon, field_text=None):
         text_field = MDTextField(
@@ -392,27 +395,23 @@ class DiagnosisInfo:
 
     def submit_diagnosis_edit_data(self, data, diag_id):
         self.show_snack("Please wait as diagnosis is edited")
-        Thread(target=self.edit_diagnosis, args=(data, diag_id), daemon=True).start()
+        POOL.submit(self.edit_diagnosis, data, diag_id)
 
     def edit_diagnosis(self, data, diag_id):
-        url = f"{SERVER_URL}diagnosis/diagnosis-edit/?hospital_id={self.store.get('hospital')['hsp_id']}&diagnosis_id={diag_id}"
-        response = requests.put(url, json=data)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync diagnosis")
-            return
-        self.show_snack("Diagnosis synced successfully")
+        url = f"{SERVER_URL}diagnosis/diagnosis-edit/?hospital_id={HOSPITAL.id}&diagnosis_id={diag_id}"
+        OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: self.show_snack(
+            "Diagnosis synced successfully" if ok else "Failed to sync diagnosis"
+        ))
 
     def start_diagnosis_deletion(self, diag_id):
         self.show_snack("Please wait as dignosis is deleted")
-        Thread(target=self.delete_diagnosis, args=(diag_id,), daemon=True).start()
+        POOL.submit(self.delete_diagnosis, diag_id)
 
     def delete_diagnosis(self, diag_id):
-        url = f"{SERVER_URL}diagnosis/diagnosis-delete/?hospital_id={self.store.get('hospital')['hsp_id']}&diagnosis_id={diag_id}"
-        response = requests.delete(url)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync diagnosis")
-            return
-        self.show_snack("Diagnosis synced successfully")
+        url = f"{SERVER_URL}diagnosis/diagnosis-delete/?hospital_id={HOSPITAL.id}&diagnosis_id={diag_id}"
+        OUTBOX.enqueue("DELETE", url, on_result=lambda ok: self.show_snack(
+            "Diagnosis synced successfully" if ok else "Failed to sync diagnosis"
+        ))
         
     @mainthread
     def make_patients_container(self):
@@ -14,6 +14,9 @@ from screens.diagnoses import DiagnosisInfo
 from screens.lab_requests import RequestsInfo
 from screens.lab_results import ResultsInfo
 from config import resource_path
+from search import SearchDebouncer
+from sorting import SORT_OPTIONS, ListResults
+from paging import PagedList
 
 Builder.load_file(resource_path("screens/doctor.kv"))
 
@@ -21,19 +24,29 @@ Builder.load_file(resource_path("screens/doctor.kv"))
 class DoctorScreen(MDScreen):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.current_search_callback = None
+        self.searcher = SearchDebouncer()
+        self.results = ListResults()
+        self.pages = PagedList(self.ids.rec_view)
+        # One bound handler per row type; rows get it with their own data on display.
+        self.row_handlers = {
+            "DiagnosisRow": self.display_diagnosis,
+            "PrescriptionsRow": self.display_prescriptions,
+            "RequestsRow": self.display_requests,
+            "ResultsRow": self.display_results,
+        }
         self.ids.search_field.bind(text=self._on_search_field_text)
 
     def _on_search_field_text(self, instance, value):
         if self.current_search_callback:
-            self.current_search_callback(value)
+            self.searcher.push(value, self.current_search_callback)
     
     def display_items(self, prev_class, items, flag, mapper):
         prev = self.ids.rec_view
         self.ids.rec_box.default_size = (None, dp(80))
         prev.viewclass = prev_class
-
-        data = [mapper(i) for i in items]
-        prev.data = data
+        self.results.keep(prev_class, items)
+        self.pages.show(items, mapper, self.row_handlers.get(prev_class))
     
     
     
@@ -46,7 +59,6 @@ class DoctorScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'symptoms': (diag.get("symptoms") or "Unknown").strip(),
             'diagnosis': str(diag.get("suggested_diagnosis") or "Unknown").strip(),
-            'show_profile': lambda diag_data=diag: self.display_diagnosis(diag_data)
         }
 
 
@@ -63,7 +75,7 @@ class DoctorScreen(MDScreen):
                 return
             self.display_items("DiagnosisRow", diags, "diag", self.diagnosis_mapper)
         
-        DiagnosisInfo().fetch_diagnoses("all", "all", "desc", callback=on_diags_fetched)
+        DiagnosisInfo().fetch_diagnoses("all", "all", "desc", callback=self.searcher.guard(on_diags_fetched))
 
     
     def search_diagnosis(self, *args):
@@ -82,7 +94,7 @@ class DoctorScreen(MDScreen):
         DiagnosisInfo().fetch_diagnoses(
             intent="search",
             search_term=term,
-            callback=on_diags_fetched
+            callback=self.searcher.guard(on_diags_fetched)
         )
         
     def show_diags_sort_dropdown(self, caller):
@@ -143,14 +155,12 @@ class DoctorScreen(MDScreen):
                 self.show_snack("Diagnosis not found")
                 return
             self.display_items("DiagnosisRow", diags, "drug", self.diagnosis_mapper)
-        if val == "Name (A to Z)":
-            DiagnosisInfo().fetch_diagnoses(sort_term="name", sort_dir="asc", callback=on_diags_fetched)
-        elif val == "Name (Z to A)":
-            DiagnosisInfo().fetch_diagnoses(intent="all", sort_term="name", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (New to Old)":
-            DiagnosisInfo().fetch_diagnoses(intent="all", sort_term="date", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (Old to New)":
-            DiagnosisInfo().fetch_diagnoses(sort_term="date", sort_dir="asc", callback=on_diags_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("DiagnosisRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_diags_fetched)(rows)
+            return
+        DiagnosisInfo().fetch_diagnoses(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_diags_fetched))
     
     def display_diagnosis(self, diag_data: dict):
         self.preview_display(
@@ -196,7 +206,6 @@ class DoctorScreen(MDScreen):
         return {
             'patient_name': (presc.get("patient_name") or "Unknown").strip(),
             'items_count': f"{len(entries)} Items",
-            'show_profile': lambda presc_data=presc: self.display_prescriptions(presc_data)
         }
 
         
@@ -213,7 +222,7 @@ class DoctorScreen(MDScreen):
                 return
             self.display_items("PrescriptionsRow", prescs, "diag", self.prescriptions_mapper)
         
-        PrescriptionsInfo().fetch_prescription("all", "all", "desc", callback=on_prescs_fetched)
+        PrescriptionsInfo().fetch_prescription("all", "all", "desc", callback=self.searcher.guard(on_prescs_fetched))
 
     
     def search_prescriptions(self, *args):
@@ -232,7 +241,7 @@ class DoctorScreen(MDScreen):
         PrescriptionsInfo().fetch_prescription(
             intent="search",
             search_term=term,
-            callback=on_prescs_fetched
+            callback=self.searcher.guard(on_prescs_fetched)
         )
         
     def show_prescs_sort_dropdown(self, caller):
@@ -293,14 +302,12 @@ class DoctorScreen(MDScreen):
                 self.show_snack("prescription not found")
                 return
             self.display_items("PrescriptionsRow", diags, "drug", self.prescriptions_mapper)
-        if val == "Name (A to Z)":
-            PrescriptionsInfo().fetch_prescription(sort_term="name", sort_dir="asc", callback=on_diags_fetched)
-        elif val == "Name (Z to A)":
-            PrescriptionsInfo().fetch_prescription(intent="all", sort_term="name", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (New to Old)":
-            PrescriptionsInfo().fetch_prescription(intent="all", sort_term="date", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (Old to New)":
-            PrescriptionsInfo().fetch_prescription(sort_term="date", sort_dir="asc", callback=on_diags_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("PrescriptionsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_diags_fetched)(rows)
+            return
+        PrescriptionsInfo().fetch_prescription(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_diags_fetched))
     
     def display_prescriptions(self, presc_data: dict):
         self.preview_display(
@@ -342,7 +349,6 @@ class DoctorScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'test': (test.get("test_name") or "Unknown").strip(),
             'desc': (test.get("test_desc") or "Unknown").strip(),
-            'show_profile': lambda request_data=request: self.display_requests(request_data)
         }
 
 
@@ -359,7 +365,7 @@ class DoctorScreen(MDScreen):
                 return
             self.display_items("RequestsRow", drugs, "request", self.requests_mapper)
         
-        RequestsInfo().fetch_requests("all", "all", "desc", callback=on_requests_fetched)
+        RequestsInfo().fetch_requests("all", "all", "desc", callback=self.searcher.guard(on_requests_fetched))
 
     
     def search_requests(self, *args):
@@ -378,7 +384,7 @@ class DoctorScreen(MDScreen):
         RequestsInfo().fetch_requests(
             intent="search",
             search_term=term,
-            callback=on_requests_fetched
+            callback=self.searcher.guard(on_requests_fetched)
         )
         
     def show_request_sort_dropdown(self, caller):
@@ -439,14 +445,12 @@ class DoctorScreen(MDScreen):
                 self.show_snack("requests not found")
                 return
             self.display_items("RequestsRow", requests, "request", self.requests_mapper)
-        if val == "Name (A to Z)":
-            RequestsInfo().fetch_requests(sort_term="name", sort_dir="asc", callback=on_requests_fetched)
-        elif val == "Name (Z to A)":
-            RequestsInfo().fetch_requests(intent="all", sort_term="name", sort_dir="desc", callback=on_requests_fetched)
-        elif val == "Date (New to Old)":
-            RequestsInfo().fetch_requests(intent="all", sort_term="date", sort_dir="desc", callback=on_requests_fetched)
-        elif val == "Date (Old to New)":
-            RequestsInfo().fetch_requests(sort_term="date", sort_dir="asc", callback=on_requests_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("RequestsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_requests_fetched)(rows)
+            return
+        RequestsInfo().fetch_requests(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_requests_fetched))
     
     def display_requests(self, req_data: dict):
         self.preview_display(
@@ -487,7 +491,6 @@ class DoctorScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'observations': (result.get("observations") or "Unknown").strip(),
             'conclusions': str(result.get("conclusion") or "Unknown").strip(),
-            'show_profile': lambda result_data=result: self.display_results(result_data)
         }
 
 
@@ -504,7 +507,7 @@ class DoctorScreen(MDScreen):
                 return
             self.display_items("ResultsRow", drugs, "result", self.results_mapper)
         
-        ResultsInfo().fetch_results("all", "all", "desc", callback=on_results_fetched)
+        ResultsInfo().fetch_results("all", "all", "desc", callback=self.searcher.guard(on_results_fetched))
 
     
     def search_results(self, *args):
@@ -523,7 +526,7 @@ class DoctorScreen(MDScreen):
         ResultsInfo().fetch_results(
             intent="search",
             search_term=term,
-            callback=on_results_fetched
+            callback=self.searcher.guard(on_results_fetched)
         )
         
     def show_result_sort_dropdown(self, caller):
@@ -584,14 +587,12 @@ class DoctorScreen(MDScreen):
                 self.show_snack("results not found")
                 return
             self.display_items("ResultsRow", results, "result", self.results_mapper)
-        if val == "Name (A to Z)":
-            ResultsInfo().fetch_results(sort_term="name", sort_dir="asc", callback=on_results_fetched)
-        elif val == "Name (Z to A)":
-            ResultsInfo().fetch_results(intent="all", sort_term="name", sort_dir="desc", callback=on_results_fetched)
-        elif val == "Date (New to Old)":
-            ResultsInfo().fetch_results(intent="all", sort_term="date", sort_dir="desc", callback=on_results_fetched)
-        elif val == "Date (Old to New)":
-            ResultsInfo().fetch_results(sort_term="date", sort_dir="asc", callback=on_results_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("ResultsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_results_fetched)(rows)
+            return
+        ResultsInfo().fetch_results(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_results_fetched))
     
     def display_results(self, res_data: dict):
         self.preview_display(
@@ -18,12 +18,19 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
+from fetchcache import FETCHES
+from warmstart import WARM
 from datetime import datetime, timedelta
 import asyncio
+import uuid
+from threading import Lock
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 
 class DrugsRow(MDListItem):
     drug_name = StringProperty("")
@@ -175,27 +182,46 @@ def display_drugs_info(drug_data: dict):
 
     return scroll
 
-def fetch_drugs(intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-    Thread(target=fetch_and_return_online_drugs, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+def fetch_drugs(intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None, warm=False):
+    if intent == "search":
+        POOL.cancel("drugs-search")
+    return POOL.submit(fetch_and_return_online_drugs, intent, sort_term, sort_dir, search_term, callback, warm, group=f"drugs-{intent}")
 
-def fetch_and_return_online_drugs(intent, sort_term, sort_dir, search_term, callback):
+def fetch_and_return_online_drugs(intent, sort_term, sort_dir, search_term, callback, warm=False):
+    if intent == "search" and MIRROR.has("drugs"):
+        if callback:
+            run_on_main_thread(callback, MIRROR.search("drugs", search_term))
+        return
+    key = ("drugs", intent, sort_term, sort_dir, search_term if intent == "search" else None)
+    cached = FETCHES.get(key)
+    if cached is not None:
+        if callback:
+            run_on_main_thread(callback, cached)
+        return
+    store = FETCHES.storer(key)
     url = ""
     if intent == "search":
-        url = f"{SERVER_URL}drugs/drugs-search/?hospital_id={store.get('hospital')['hsp_id']}&search_term={search_term}"
+        url = f"{SERVER_URL}drugs/drugs-search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
     elif intent == "all":
-        url = f"{SERVER_URL}drugs/drugs-fetch/?hospital_id={store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
+        url = f"{SERVER_URL}drugs/drugs-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-        else:
-            data = []
-    except Exception:
-        data = []
+    def deliver(data, fresh=True):
+        if data is not None and fresh:
+            store(data)
+        if callback:
+            run_on_main_thread(callback, [] if data is None else data)
+
+    if intent == "all":
+        settle = WARM.serve("drugs", lambda: deliver(MIRROR.all("drugs", sort_term, sort_dir), False)) if warm else None
+
+        def synced(ok):
+            if settle is None or settle(ok):
+                deliver(MIRROR.all("drugs", sort_term, sort_dir), ok)
 
-    if callback:
-        run_on_main_thread(callback, data)
+        first_page = (lambda: deliver(MIRROR.all("drugs", sort_term, sort_dir), False)) if warm else None
+        SYNC.pull("drugs", url, synced, first_page)
+    else:
+        HTTP.get_json(url, deliver)
 
 @mainthread
 def run_on_main_thread(callback, data):
@@ -298,17 +324,14 @@ def drugs_add_form():
         submit_drug_data(data, add_btn)
 def submit_drug_data(data, add_btn):
     show_snack("Please wait as drug is added")
-    Thread(target=add_drug, args=(data, add_btn), daemon=True).start()
+    POOL.submit(add_drug, data, add_btn)
 
 def add_drug(data, add_btn):
-    url = f"{SERVER_URL}drugs/drugs-add/?hospital_id={store.get('hospital')['hsp_id']}"
-    response = requests.post(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync drug")
-        add_btn.disabled = False
-        return
+    url = f"{SERVER_URL}drugs/drugs-add/?hospital_id={HOSPITAL.id}"
     add_btn.disabled = False
-    show_snack("Drug synced successfully")
+    OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: show_snack(
+        "Drug synced successfully" if ok else "Failed to sync drug"
+    ))
 
 def make_text_field(field_name, field_icon, field_text=None):
     text_field = MDTextField(
@@ -425,39 +448,95 @@ def confirm_deletion_form(drug_id):
 
 def submit_drug_edit_data(data, drug_id):
     show_snack("Please wait as worker is edited")
-    Thread(target=edit_drug, args=(data, drug_id), daemon=True).start()
+    POOL.submit(edit_drug, data, drug_id)
 
 def edit_drug(data, drug_id):
-    url = f"{SERVER_URL}drugs/drugs-edit/?hospital_id={store.get('hospital')['hsp_id']}&drug_id={drug_id}"
-    response = requests.put(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync drug")
-        return
-    show_snack("Drug synced successfully")
+    url = f"{SERVER_URL}drugs/drugs-edit/?hospital_id={HOSPITAL.id}&drug_id={drug_id}"
+    OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: show_snack(
+        "Drug synced successfully" if ok else "Failed to sync drug"
+    ))
 
 def start_drug_deletion(drug_id):
     show_snack("Please wait as worker is deleted")
-    Thread(target=delete_drug, args=(drug_id,), daemon=True).start()
+    POOL.submit(delete_drug, drug_id)
 
 def delete_drug(drug_id):
-    url = f"{SERVER_URL}drugs/drugs-delete/?hospital_id={store.get('hospital')['hsp_id']}&drug_id={drug_id}"
-    response = requests.delete(url)
-    if response.status_code != 200:
-        show_snack("Failed to sync drug")
-        return
-    show_snack("Drug synced successfully")
-
-def start_drug_sale(drug_data: dict):
-    show_snack("Starting drug selling process...")
-    Thread(target=sale_drug, args=(drug_data,), daemon=True).start()
-
-def sale_drug(drug_data: dict):
-    url = f"{SERVER_URL}drugs/drugs/drug-sale?hospital_id={store.get('hospital')['hsp_id']}&drug_id={drug_data.get('drug_id')}&drug_qty={drug_data.get('qty')}"
-    response = requests.put(url)
-    if response.status_code != 200:
-        show_snack("Failed to sync drug")
-        return
-    show_snack("Drugs synced successfully")
+    url = f"{SERVER_URL}drugs/drugs-delete/?hospital_id={HOSPITAL.id}&drug_id={drug_id}"
+    OUTBOX.enqueue("DELETE", url, on_result=lambda ok: show_snack(
+        "Drug synced successfully" if ok else "Failed to sync drug"
+    ))
+
+def check_cart_stock(cart: list):
+    """Check each cart line against the freshest stock we know of.
+
+    Lines for the same drug are checked against their combined quantity.
+    Returns one {"drug_id", "item", "qty", "ok", "detail"} per line, in cart order.
+    """
+    known = MIRROR.get("drugs", [line.get("drug_id") for line in cart])
+    wanted = {}
+    for line in cart:
+        wanted[line.get("drug_id")] = wanted.get(line.get("drug_id"), 0) + line.get("qty", 0)
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    results = []
+    for line in cart:
+        drug = known.get(str(line.get("drug_id"))) or line.get("drug") or {}
+        stock = drug.get("drug_quantity")
+        expiry = drug.get("drug_expiry")
+        result = {"drug_id": line.get("drug_id"), "item": line.get("item"), "qty": line.get("qty"), "ok": False, "detail": ""}
+        if line.get("qty", 0) <= 0:
+            result["detail"] = "Quantity must be greater than 0"
+        elif expiry and expiry[:10] < today:
+            result["detail"] = "Expired"
+        elif stock is not None and stock < wanted[line.get("drug_id")]:
+            result["detail"] = f"Only {stock} left"
+        else:
+            result["ok"] = True
+        results.append(result)
+    return results
+
+def start_cart_sale(cart: list, on_done=None):
+    """Sell a cart, one `drug-sale` request per line.
+
+    Stock is checked locally first; if any line fails nothing is sent and
+    `on_done(lines)` gets the per-line results straight away. Otherwise the
+    lines are queued back to back under one batch key (`<batch>-<n>`), so a
+    replayed checkout is not sold twice, and `on_done` gets every line's
+    result once the last one is applied or rejected. The backend sells
+    line by line, so a line it refuses does not undo the others; the
+    results say which ones went through. A line that timed out and may
+    have been sold anyway comes back failed with `unconfirmed` set.
+    Returns whether the sale was queued.
+    """
+    lines = check_cart_stock(cart)
+    if not all(line["ok"] for line in lines):
+        if on_done:
+            on_done(lines)
+        return False
+
+    batch = uuid.uuid4().hex
+    pending = [len(lines)]
+    lock = Lock()
+
+    def answered(line):
+        def on_response(status, payload):
+            payload = payload if isinstance(payload, dict) else {}
+            line["ok"] = status is not None and 200 <= status < 300
+            line["unconfirmed"] = bool(payload.get("unconfirmed"))
+            if not line["ok"]:
+                line["detail"] = payload.get("detail") or (f"HTTP {status}" if status else "Server unreachable")
+            with lock:
+                pending[0] -= 1
+                finished = pending[0] == 0
+            if finished and on_done:
+                run_on_main_thread(on_done, lines)
+        return on_response
+
+    for n, line in enumerate(lines):
+        url = (f"{SERVER_URL}drugs/drugs/drug-sale?hospital_id={HOSPITAL.id}"
+               f"&drug_id={line['drug_id']}&drug_qty={line['qty']}")
+        OUTBOX.enqueue("PUT", url, on_response=answered(line), key=f"{batch}-{n}")
+    return True
 
 def show_date_picker(target_field):
     day = month = year = "00"
@@ -22,9 +22,9 @@ from kivymd.uix.divider import MDDivider
 
 from screens.worker import fetch_workers, start_worker_signin
 from screens.hospital import start_hospital_signin, start_hospital_creation
-import requests
-from threading import Thread
-from config import SERVER_URL, resource_path, STORE
+from network import HTTP
+from tasks import POOL
+from config import SERVER_URL, resource_path, STORE, HOSPITAL
 from datetime import datetime
 from utils import run_async
 
@@ -362,9 +362,9 @@ class HomeScreen(MDScreen):
             Clock.schedule_once(self.hospital_signin_form, 2)
             return
         
-        self.ids.hospital_email.text = self.store.get("hospital")['email']
-        self.ids.hospital_phone.text = self.store.get("hospital")['phone']
-        self.ids.hospital_name.text = self.store.get('hospital')['name']
+        self.ids.hospital_email.text = HOSPITAL.email
+        self.ids.hospital_phone.text = HOSPITAL.phone
+        self.ids.hospital_name.text = HOSPITAL.name
     
     def confirm_logout_form(self):
         self.confirm_logout_dialog = MDDialog(
@@ -585,14 +585,14 @@ class HomeScreen(MDScreen):
         if not key:
             self.show_snack("Activation key empty!")
             return
-        Thread(target=self.start_plan_renewal, args=(key,), daemon=True).start()
+        POOL.submit(self.start_plan_renewal, key)
 
 
     def start_plan_renewal(self, key):
         self.show_spinner("Please wait as we renew your plan...")
         try:
-            url = f"{SERVER_URL}hospitals/renew-activation/?hospital_id={self.store.get('hospital')['hsp_id']}&activation_key={key}"
-            response = requests.put(url, timeout=3).json()
+            url = f"{SERVER_URL}hospitals/renew-activation/?hospital_id={HOSPITAL.id}&activation_key={key}"
+            response = HTTP.put(url, timeout=3).json()
 
             if response.get("message") == "renewed":
                 self.subscription_dialog.dismiss()
@@ -608,7 +608,7 @@ class HomeScreen(MDScreen):
 
 
     def update_plan(self):
-        Thread(target=self.start_plan_update, daemon=True).start()
+        POOL.submit(self.start_plan_update)
 
 
     def start_plan_update(self):
@@ -616,8 +616,8 @@ class HomeScreen(MDScreen):
             if not self.store.exists("hospital"):
                 return
 
-            url = f"{SERVER_URL}hospitals/hospitals-specific/?hospital_id={self.store.get('hospital')['hsp_id']}"
-            response = requests.get(url)
+            url = f"{SERVER_URL}hospitals/hospitals-specific/?hospital_id={HOSPITAL.id}"
+            response = HTTP.get(url)
 
             if response.status_code != 200:
                 self.show_snack("Failed to update plan")
@@ -644,13 +644,10 @@ class HomeScreen(MDScreen):
 
     
     def check_expiry(self):
-        if not self.store.exists("hospital"):
+        if HOSPITAL.expiry is None:
             return
 
-        exp_str = self.store.get("hospital")['expiry_date']
-        exp = datetime.fromisoformat(exp_str)
-
-        if exp < datetime.now():
+        if HOSPITAL.expiry < datetime.now():
             self.show_snack("Your plan expired!")
             Clock.schedule_once(self.subscription_form, 3)
 
@@ -1,22 +1,21 @@
 from kivy.clock import Clock, mainthread
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-import requests
+from network import HTTP
 import asyncio
 
-from config import SERVER_URL, STORE
-from threading import Thread
-from utils import has_internet
+from config import SERVER_URL, STORE, HOSPITAL
+from tasks import POOL
 
 store = STORE
 
 def start_hospital_signin(hosp_data: dict, callback=None):
     show_snack("Logging in...")
-    Thread(target=signin_thread, args=(hosp_data, callback), daemon=True).start()
+    POOL.submit(signin_thread, hosp_data, callback)
 
 def signin_thread(hsp_data, callback):
     url = f"{SERVER_URL}hospitals/hospitals-signin/"
-    response = requests.post(url, json=hsp_data)
+    response = HTTP.post(url, json=hsp_data)
     if response.status_code != 200:
         show_snack("Login Failed")
         return
@@ -28,11 +27,11 @@ def signin_thread(hsp_data, callback):
 
 def start_hospital_creation(hosp_data: dict, callback=None):
     show_snack("Adding your hospital...")
-    Thread(target=create_thread, args=(hosp_data, callback), daemon=True).start()
+    POOL.submit(create_thread, hosp_data, callback)
 
 def create_thread(hsp_data, callback):
     url = f"{SERVER_URL}hospitals/hospitals-add/"
-    response = requests.post(url, json=hsp_data)
+    response = HTTP.post(url, json=hsp_data)
     if response.status_code != 200:
         show_snack("Failed to add your hospital")
         return
@@ -43,11 +42,11 @@ def create_thread(hsp_data, callback):
 
 def start_hospital_editing(hosp_data: dict, callback=None):
     show_snack("Editing your hospital...")
-    Thread(target=edit_thread, args=(hosp_data, callback), daemon=True).start()
+    POOL.submit(edit_thread, hosp_data, callback)
 
 def edit_thread(hsp_data, callback):
-    url = f"{SERVER_URL}hospitals/hospitals-edit/?hospital_id={store.get("hospital")['hsp_id']}"
-    response = requests.put(url, json=hsp_data)
+    url = f"{SERVER_URL}hospitals/hospitals-edit/?hospital_id={HOSPITAL.id}"
+    response = HTTP.put(url, json=hsp_data)
     if response.status_code != 200:
         show_snack("Failed to edit your hospital")
         return
@@ -58,11 +57,11 @@ def edit_thread(hsp_data, callback):
 
 def start_hospital_password_change(hosp_data: dict, callback = None):
     show_snack("Changing your hospital password...")
-    Thread(target=pwd_change_thread, args=(hosp_data, callback), daemon=True).start()
+    POOL.submit(pwd_change_thread, hosp_data, callback)
 
 def pwd_change_thread(hsp_data, callback):
-    url = f"{SERVER_URL}hospitals/hospitals-change-password/?hospital_id={store.get("hospital")['hsp_id']}"
-    response = requests.put(url, json=hsp_data)
+    url = f"{SERVER_URL}hospitals/hospitals-change-password/?hospital_id={HOSPITAL.id}"
+    response = HTTP.put(url, json=hsp_data)
     if response.status_code != 200:
         show_snack("Failed to change your hospital password")
         return
@@ -72,11 +71,11 @@ def pwd_change_thread(hsp_data, callback):
 
 def start_hospital_deletion(callback = None):
     show_snack("Removing your hospital account...")
-    Thread(target=delete_hsp_thread, args=(callback,), daemon=True).start()
+    POOL.submit(delete_hsp_thread, callback)
 
 def delete_hsp_thread(callback):
-    url = f"{SERVER_URL}hospitals/hospitals-delete/?hospital_id={store.get("hospital")['hsp_id']}"
-    response = requests.delete(url)
+    url = f"{SERVER_URL}hospitals/hospitals-delete/?hospital_id={HOSPITAL.id}"
+    response = HTTP.delete(url)
     if response.status_code != 200:
         show_snack("Failed to delete your hospital account")
         return
@@ -19,6 +19,9 @@ from screens.lab_tests import (
     confirm_deletion_form
 )
 from config import resource_path
+from search import SearchDebouncer
+from sorting import SORT_OPTIONS, ListResults
+from paging import PagedList
 
 Builder.load_file(resource_path("screens/lab.kv"))
 
@@ -26,19 +29,28 @@ Builder.load_file(resource_path("screens/lab.kv"))
 class LabScreen(MDScreen):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.current_search_callback = None
+        self.searcher = SearchDebouncer()
+        self.results = ListResults()
+        self.pages = PagedList(self.ids.rec_view)
+        # One bound handler per row type; rows get it with their own data on display.
+        self.row_handlers = {
+            "TestsRow": self.display_tests,
+            "RequestsRow": self.display_requests,
+            "ResultsRow": self.display_results,
+        }
         self.ids.search_field.bind(text=self._on_search_field_text)
 
     def _on_search_field_text(self, instance, value):
         if self.current_search_callback:
-            self.current_search_callback(value)
+            self.searcher.push(value, self.current_search_callback)
     
     def display_items(self, prev_class, items, flag, mapper):
         prev = self.ids.rec_view
         self.ids.rec_box.default_size = (None, dp(80))
         prev.viewclass = prev_class
-
-        data = [mapper(i) for i in items]
-        prev.data = data
+        self.results.keep(prev_class, items)
+        self.pages.show(items, mapper, self.row_handlers.get(prev_class))
     
     
     # Making tests mapper
@@ -49,7 +61,6 @@ class LabScreen(MDScreen):
             'test_name': (test.get("test_name") or "Unknown").strip(),
             'test_desc': (test.get("test_desc") or "Unknown").strip(),
             'test_price': f"Ksh. {test.get('test_price', 0)}",
-            'show_profile': lambda test_data=test: self.display_tests(test_data)
         }
 
 
@@ -66,7 +77,7 @@ class LabScreen(MDScreen):
                 return
             self.display_items("TestsRow", drugs, "test", self.tests_mapper)
         
-        fetch_tests("all", "all", "desc", callback=on_tests_fetched)
+        fetch_tests("all", "all", "desc", callback=self.searcher.guard(on_tests_fetched))
 
     
     def search_tests(self, *args):
@@ -85,7 +96,7 @@ class LabScreen(MDScreen):
         fetch_tests(
             intent="search",
             search_term=term,
-            callback=on_tests_fetched
+            callback=self.searcher.guard(on_tests_fetched)
         )
         
     def show_test_sort_dropdown(self, caller):
@@ -146,14 +157,12 @@ class LabScreen(MDScreen):
                 self.show_snack("tests not found")
                 return
             self.display_items("TestsRow", tests, "test", self.tests_mapper)
-        if val == "Name (A to Z)":
-            fetch_tests(sort_term="name", sort_dir="asc", callback=on_tests_fetched)
-        elif val == "Name (Z to A)":
-            fetch_tests(intent="all", sort_term="name", sort_dir="desc", callback=on_tests_fetched)
-        elif val == "Date (New to Old)":
-            fetch_tests(intent="all", sort_term="date", sort_dir="desc", callback=on_tests_fetched)
-        elif val == "Date (Old to New)":
-            fetch_tests(sort_term="date", sort_dir="asc", callback=on_tests_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("TestsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_tests_fetched)(rows)
+            return
+        fetch_tests(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_tests_fetched))
     
     def display_tests(self, test_data: dict):
         self.preview_display(
@@ -202,7 +211,6 @@ class LabScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'test': (test.get("test_name") or "Unknown").strip(),
             'desc': (test.get("test_desc") or "Unknown").strip(),
-            'show_profile': lambda request_data=request: self.display_requests(request_data)
         }
 
 
@@ -219,7 +227,7 @@ class LabScreen(MDScreen):
                 return
             self.display_items("RequestsRow", drugs, "request", self.requests_mapper)
         
-        RequestsInfo().fetch_requests("all", "all", "desc", callback=on_requests_fetched)
+        RequestsInfo().fetch_requests("all", "all", "desc", callback=self.searcher.guard(on_requests_fetched))
 
     
     def search_requests(self, *args):
@@ -238,7 +246,7 @@ class LabScreen(MDScreen):
         RequestsInfo().fetch_requests(
             intent="search",
             search_term=term,
-            callback=on_requests_fetched
+            callback=self.searcher.guard(on_requests_fetched)
         )
         
     def show_request_sort_dropdown(self, caller):
@@ -299,14 +307,12 @@ class LabScreen(MDScreen):
                 self.show_snack("requests not found")
                 return
             self.display_items("RequestsRow", requests, "request", self.requests_mapper)
-        if val == "Name (A to Z)":
-            RequestsInfo().fetch_requests(sort_term="name", sort_dir="asc", callback=on_requests_fetched)
-        elif val == "Name (Z to A)":
-            RequestsInfo().fetch_requests(intent="all", sort_term="name", sort_dir="desc", callback=on_requests_fetched)
-        elif val == "Date (New to Old)":
-            RequestsInfo().fetch_requests(intent="all", sort_term="date", sort_dir="desc", callback=on_requests_fetched)
-        elif val == "Date (Old to New)":
-            RequestsInfo().fetch_requests(sort_term="date", sort_dir="asc", callback=on_requests_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("RequestsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_requests_fetched)(rows)
+            return
+        RequestsInfo().fetch_requests(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_requests_fetched))
     
     def display_requests(self, req_data: dict):
         self.preview_display(
@@ -338,7 +344,6 @@ class LabScreen(MDScreen):
             'patient_name': result.get("patient", "unknown")['patient_name'] or "Unknown",
             'observations': result.get("observations", "unknown") or "unknown",
             'conclusions': f"{result.get("conclusion", "unknown")}" or "unknown",
-            'show_profile': lambda result_data = result: self.display_results(result_data)
         }
 
     def show_results(self):
@@ -354,7 +359,7 @@ class LabScreen(MDScreen):
                 return
             self.display_items("ResultsRow", drugs, "result", self.results_mapper)
         
-        ResultsInfo().fetch_results("all", "all", "desc", callback=on_results_fetched)
+        ResultsInfo().fetch_results("all", "all", "desc", callback=self.searcher.guard(on_results_fetched))
 
     
     def search_results(self, *args):
@@ -373,7 +378,7 @@ class LabScreen(MDScreen):
         ResultsInfo().fetch_results(
             intent="search",
             search_term=term,
-            callback=on_results_fetched
+            callback=self.searcher.guard(on_results_fetched)
         )
         
     def show_result_sort_dropdown(self, caller):
@@ -434,14 +439,12 @@ class LabScreen(MDScreen):
                 self.show_snack("results not found")
                 return
             self.display_items("ResultsRow", results, "result", self.results_mapper)
-        if val == "Name (A to Z)":
-            ResultsInfo().fetch_results(sort_term="name", sort_dir="asc", callback=on_results_fetched)
-        elif val == "Name (Z to A)":
-            ResultsInfo().fetch_results(intent="all", sort_term="name", sort_dir="desc", callback=on_results_fetched)
-        elif val == "Date (New to Old)":
-            ResultsInfo().fetch_results(intent="all", sort_term="date", sort_dir="desc", callback=on_results_fetched)
-        elif val == "Date (Old to New)":
-            ResultsInfo().fetch_results(sort_term="date", sort_dir="asc", callback=on_results_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("ResultsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_results_fetched)(rows)
+            return
+        ResultsInfo().fetch_results(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_results_fetched))
     
     def display_results(self, res_data: dict):
         self.preview_display(
@@ -21,11 +21,14 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
 import asyncio
 from datetime import datetime, timedelta
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 from screens.patients import fetch_patients
 from screens.lab_tests import fetch_tests
 
@@ -174,26 +177,29 @@ class RequestsInfo:
         return scroll
 
     def fetch_requests(self, intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-        Thread(target=self.fetch_and_return_online_requests, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+        if intent == "search":
+            POOL.cancel("lab_requests-search")
+        return POOL.submit(self.fetch_and_return_online_requests, intent, sort_term, sort_dir, search_term, callback, group=f"lab_requests-{intent}")
 
     def fetch_and_return_online_requests(self, intent, sort_term, sort_dir, search_term, callback):
+        if intent == "search" and MIRROR.has("lab_requests"):
+            if callback:
+                self.run_on_main_thread(callback, MIRROR.search("lab_requests", search_term))
+            return
         url = ""
         if intent == "search":
-            url = f"{SERVER_URL}lab_requests/lab_requests-search/?hospital_id={self.store.get('hospital')['hsp_id']}&search_term={search_term}"
+            url = f"{SERVER_URL}lab_requests/lab_requests-search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
         elif intent == "all":
-            url = f"{SERVER_URL}lab_requests/lab_requests-fetch/?hospital_id={self.store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
+            url = f"{SERVER_URL}lab_requests/lab_requests-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
 
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-            else:
-                data = []
-        except Exception:
-            data = []
+        def deliver(data):
+            if callback:
+                self.run_on_main_thread(callback, [] if data is None else data)
 
-        if callback:
-            self.run_on_main_thread(callback, data)
+        if intent == "all":
+            SYNC.pull("lab_requests", url, lambda ok: deliver(MIRROR.all("lab_requests", sort_term, sort_dir)))
+        else:
+            HTTP.get_json(url, deliver)
 
     @mainthread
     def run_on_main_thread(self, callback, data):
@@ -278,17 +284,14 @@ class RequestsInfo:
         self.submit_request_data(data)
     def submit_request_data(self, data):
         self.show_snack("Please wait as request is added")
-        Thread(target=self.add_request, args=(data,), daemon=True).start()
+        POOL.submit(self.add_request, data)
 
     def add_request(self, data):
-        url = f"{SERVER_URL}lab_requests/lab_requests-add/?hospital_id={self.store.get('hospital')['hsp_id']}"
-        response = requests.post(url, json=data)
-        if response.status_code != 200:
-            self.add_button.disabled = False
-            self.show_snack("Failed to sync request")
-            return
+        url = f"{SERVER_URL}lab_requests/lab_requests-add/?hospital_id={HOSPITAL.id}"
         self.add_button.disabled = False
-        self.show_snack("Request synced successfully")
+        OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: self.show_snack(
+            "Request synced successfully" if ok else "Failed to sync request"
+        ))
 
     def confirm_deletion_form(self, req_id):
         confirm_delete_dialog = MDDialog(
@@ -329,15 +332,13 @@ class RequestsInfo:
 
     def start_request_deletion(self, req_id):
         self.show_snack("Please wait as request is deleted")
-        Thread(target=self.delete_request, args=(req_id,), daemon=True).start()
+        POOL.submit(self.delete_request, req_id)
 
     def delete_request(self, req_id):
-        url = f"{SERVER_URL}lab_requests/lab_requests-delete/?hospital_id={self.store.get('hospital')['hsp_id']}&lab_request_id={req_id}"
-        response = requests.delete(url)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync request")
-            return
-        self.show_snack("Request synced successfully")
+        url = f"{SERVER_URL}lab_requests/lab_requests-delete/?hospital_id={HOSPITAL.id}&lab_request_id={req_id}"
+        OUTBOX.enqueue("DELETE", url, on_result=lambda ok: self.show_snack(
+            "Request synced successfully" if ok else "Failed to sync request"
+        ))
         
     @mainthread
     def make_patients_container(self):
@@ -21,12 +21,15 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
 from datetime import datetime, timedelta
 import asyncio
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 
 from screens.patients import fetch_patients
 
@@ -144,26 +147,29 @@ class ResultsInfo:
 
 
     def fetch_results(self, intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-        Thread(target=self.fetch_and_return_online_results, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+        if intent == "search":
+            POOL.cancel("lab_results-search")
+        return POOL.submit(self.fetch_and_return_online_results, intent, sort_term, sort_dir, search_term, callback, group=f"lab_results-{intent}")
 
     def fetch_and_return_online_results(self, intent, sort_term, sort_dir, search_term, callback):
+        if intent == "search" and MIRROR.has("lab_results"):
+            if callback:
+                self.run_on_main_thread(callback, MIRROR.search("lab_results", search_term))
+            return
         url = ""
         if intent == "search":
-            url = f"{SERVER_URL}lab_results/lab_results-search/?hospital_id={self.store.get('hospital')['hsp_id']}&search_term={search_term}"
+            url = f"{SERVER_URL}lab_results/lab_results-search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
         elif intent == "all":
-            url = f"{SERVER_URL}lab_results/lab_results-fetch/?hospital_id={self.store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
+            url = f"{SERVER_URL}lab_results/lab_results-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
 
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-            else:
-                data = []
-        except Exception:
-            data = []
+        def deliver(data):
+            if callback:
+                self.run_on_main_thread(callback, [] if data is None else data)
 
-        if callback:
-            self.run_on_main_thread(callback, data)
+        if intent == "all":
+            SYNC.pull("lab_results", url, lambda ok: deliver(MIRROR.all("lab_results", sort_term, sort_dir)))
+        else:
+            HTTP.get_json(url, deliver)
 
     @mainthread
     def run_on_main_thread(self, callback, data):
@@ -249,17 +255,14 @@ class ResultsInfo:
         self.submit_result_data(data)
     def submit_result_data(self, data):
         self.show_snack("Please wait as result is added")
-        Thread(target=self.add_result, args=(data,), daemon=True).start()
+        POOL.submit(self.add_result, data)
 
     def add_result(self, data):
-        url = f"{SERVER_URL}lab_results/lab_results-add/?hospital_id={self.store.get('hospital')['hsp_id']}"
-        response = requests.post(url, json=data)
-        if response.status_code != 200:
-            self.add_button.disabled = False
-            self.show_snack("Failed to sync result")
-            return
+        url = f"{SERVER_URL}lab_results/lab_results-add/?hospital_id={HOSPITAL.id}"
         self.add_button.disabled = False
-        self.show_snack("Result synced successfully. You can refresh the page to view them")
+        OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: self.show_snack(
+            "Result synced successfully. You can refresh the page to view them" if ok else "Failed to sync result"
+        ))
 
     def confirm_deletion_form(self, res_id):
         confirm_delete_dialog = MDDialog(
@@ -300,15 +303,13 @@ class ResultsInfo:
 
     def start_result_deletion(self, res_id):
         self.show_snack("Please wait as result is deleted")
-        Thread(target=self.delete_result, args=(res_id,), daemon=True).start()
+        POOL.submit(self.delete_result, res_id)
 
     def delete_result(self, res_id):
-        url = f"{SERVER_URL}lab_results/lab_results-delete/?hospital_id={self.store.get('hospital')['hsp_id']}&lab_result_id={res_id}"
-        response = requests.delete(url)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync result")
-            return
-        self.show_snack("Result synced successfully")
+        url = f"{SERVER_URL}lab_results/lab_results-delete/?hospital_id={HOSPITAL.id}&lab_result_id={res_id}"
+        OUTBOX.enqueue("DELETE", url, on_result=lambda ok: self.show_snack(
+            "Result synced successfully" if ok else "Failed to sync result"
+        ))
         
     @mainthread
     def make_patients_container(self):
@@ -501,16 +502,13 @@ class ResultsInfo:
     
     def submit_res_edit_data(self, data, res_id):
         self.show_snack("Please wait as result is edited")
-        Thread(target=self.edit_res, args=(data, res_id), daemon=True).start()
+        POOL.submit(self.edit_res, data, res_id)
 
     def edit_res(self, data, res_id):
-        url = f"{SERVER_URL}lab_results/lab_results-edit/?hospital_id={self.store.get('hospital')['hsp_id']}&lab_result_id={res_id}"
-        response = requests.put(url, json=data)
-        print(data)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync result")
-            return
-        self.show_snack("Result synced successfully. You can refresh the page to view them")
+        url = f"{SERVER_URL}lab_results/lab_results-edit/?hospital_id={HOSPITAL.id}&lab_result_id={res_id}"
+        OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: self.show_snack(
+            "Result synced successfully. You can refresh the page to view them" if ok else "Failed to sync result"
+        ))
 
     @mainthread
     def show_spinner(self, display_text: str | None = "Please wait as data is fetched..."):
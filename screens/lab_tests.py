@@ -18,12 +18,16 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
+from fetchcache import FETCHES
 from datetime import datetime, timedelta
 import asyncio
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 
 
 class TestsRow(MDListItem):
@@ -125,26 +129,38 @@ def display_tests_info(test_data: dict):
 
 
 def fetch_tests(intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-    Thread(target=fetch_and_return_online_tests, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+    if intent == "search":
+        POOL.cancel("lab_tests-search")
+    return POOL.submit(fetch_and_return_online_tests, intent, sort_term, sort_dir, search_term, callback, group=f"lab_tests-{intent}")
 
 def fetch_and_return_online_tests(intent, sort_term, sort_dir, search_term, callback):
+    if intent == "search" and MIRROR.has("lab_tests"):
+        if callback:
+            run_on_main_thread(callback, MIRROR.search("lab_tests", search_term))
+        return
+    key = ("lab_tests", intent, sort_term, sort_dir, search_term if intent == "search" else None)
+    cached = FETCHES.get(key)
+    if cached is not None:
+        if callback:
+            run_on_main_thread(callback, cached)
+        return
+    store = FETCHES.storer(key)
     url = ""
     if intent == "search":
-        url = f"{SERVER_URL}lab_tests/lab_tests-search/?hospital_id={store.get('hospital')['hsp_id']}&search_term={search_term}"
+        url = f"{SERVER_URL}lab_tests/lab_tests-search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
     elif intent == "all":
-        url = f"{SERVER_URL}lab_tests/lab_tests-fetch/?hospital_id={store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
+        url = f"{SERVER_URL}lab_tests/lab_tests-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-        else:
-            data = []
-    except Exception:
-        data = []
+    def deliver(data, fresh=True):
+        if data is not None and fresh:
+            store(data)
+        if callback:
+            run_on_main_thread(callback, [] if data is None else data)
 
-    if callback:
-        run_on_main_thread(callback, data)
+    if intent == "all":
+        SYNC.pull("lab_tests", url, lambda ok: deliver(MIRROR.all("lab_tests", sort_term, sort_dir), ok))
+    else:
+        HTTP.get_json(url, deliver)
 
 @mainthread
 def run_on_main_thread(callback, data):
@@ -220,17 +236,14 @@ def tests_add_form():
         submit_test_data(data, add_btn)
 def submit_test_data(data, add_btn):
     show_snack("Please wait as test is added")
-    Thread(target=add_test, args=(data, add_btn), daemon=True).start()
+    POOL.submit(add_test, data, add_btn)
 
 def add_test(data, add_btn):
-    url = f"{SERVER_URL}lab_tests/lab_tests-add/?hospital_id={store.get('hospital')['hsp_id']}"
-    response = requests.post(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync test")
-        add_btn.disabled = False
-        return
+    url = f"{SERVER_URL}lab_tests/lab_tests-add/?hospital_id={HOSPITAL.id}"
     add_btn.disabled = False
-    show_snack("Test synced successfully")
+    OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: show_snack(
+        "Test synced successfully" if ok else "Failed to sync test"
+    ))
 
 def make_text_field(field_name, field_icon, field_text=None):
     text_field = MDTextField(
@@ -328,28 +341,23 @@ def confirm_deletion_form(test_id):
 
 def submit_test_edit_data(data, test_id):
     show_snack("Please wait as test is edited")
-    Thread(target=edit_test, args=(data, test_id), daemon=True).start()
+    POOL.submit(edit_test, data, test_id)
 
 def edit_test(data, test_id):
-    url = f"{SERVER_URL}lab_tests/lab_tests-edit/?hospital_id={store.get('hospital')['hsp_id']}&lab_test_id={test_id}"
-    response = requests.put(url, json=data)
-    print(data)
-    if response.status_code != 200:
-        show_snack("Failed to sync test")
-        return
-    show_snack("Test synced successfully. You can refresh the page to view them")
+    url = f"{SERVER_URL}lab_tests/lab_tests-edit/?hospital_id={HOSPITAL.id}&lab_test_id={test_id}"
+    OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: show_snack(
+        "Test synced successfully. You can refresh the page to view them" if ok else "Failed to sync test"
+    ))
 
 def start_test_deletion(test_id):
     show_snack("Please wait as test is deleted")
-    Thread(target=delete_test, args=(test_id,), daemon=True).start()
+    POOL.submit(delete_test, test_id)
 
 def delete_test(test_id):
-    url = f"{SERVER_URL}lab_tests/lab_tests-delete/?hospital_id={store.get('hospital')['hsp_id']}&lab_test_id={test_id}"
-    response = requests.delete(url)
-    if response.status_code != 200:
-        show_snack("Failed to sync test")
-        return
-    show_snack("Test synced successfully")
+    url = f"{SERVER_URL}lab_tests/lab_tests-delete/?hospital_id={HOSPITAL.id}&lab_test_id={test_id}"
+    OUTBOX.enqueue("DELETE", url, on_result=lambda ok: show_snack(
+        "Test synced successfully" if ok else "Failed to sync test"
+    ))
 
 @mainthread
 def show_snack(text):
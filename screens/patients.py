@@ -18,12 +18,17 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
+from fetchcache import FETCHES
+from warmstart import WARM
 from datetime import datetime, timedelta
 import asyncio
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 
 class PatientsRow(MDListItem):
     patient_name = StringProperty("")
@@ -191,27 +196,46 @@ def display_patients_info(pat_data: dict):
     return scroll
 
 
-def fetch_patients(intent="all", sort_term="all", sort_dir="desc", search_term="ss", search_by="ss", callback=None):
-    Thread(target=fetch_and_return_online_patients, args=(intent, sort_term, sort_dir, search_term, search_by, callback), daemon=True).start()
+def fetch_patients(intent="all", sort_term="all", sort_dir="desc", search_term="ss", search_by="ss", callback=None, warm=False):
+    if intent == "search":
+        POOL.cancel("patients-search")
+    return POOL.submit(fetch_and_return_online_patients, intent, sort_term, sort_dir, search_term, search_by, callback, warm, group=f"patients-{intent}")
 
-def fetch_and_return_online_patients(intent, sort_term, sort_dir, search_term, search_by, callback):
+def fetch_and_return_online_patients(intent, sort_term, sort_dir, search_term, search_by, callback, warm=False):
+    if intent == "search" and MIRROR.has("patients"):
+        if callback:
+            run_on_main_thread(callback, MIRROR.search("patients", search_term))
+        return
+    key = ("patients", intent, sort_term, sort_dir, f"{search_by}:{search_term}" if intent == "search" else None)
+    cached = FETCHES.get(key)
+    if cached is not None:
+        if callback:
+            run_on_main_thread(callback, cached)
+        return
+    store = FETCHES.storer(key)
     url = ""
     if intent == "search":
-        url = f"{SERVER_URL}patients/patients-search/?hospital_id={store.get('hospital')['hsp_id']}&search_by={search_by}&search_term={search_term}"
+        url = f"{SERVER_URL}patients/patients-search/?hospital_id={HOSPITAL.id}&search_by={search_by}&search_term={search_term}"
     elif intent == "all":
-        url = f"{SERVER_URL}patients/patients-fetch/?hospital_id={store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"    
+        url = f"{SERVER_URL}patients/patients-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"    
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-        else:
-            data = []
-    except Exception:
-        data = []
+    def deliver(data, fresh=True):
+        if data is not None and fresh:
+            store(data)
+        if callback:
+            run_on_main_thread(callback, [] if data is None else data)
+
+    if intent == "all":
+        settle = WARM.serve("patients", lambda: deliver(MIRROR.all("patients", sort_term, sort_dir), False)) if warm else None
 
-    if callback:
-        run_on_main_thread(callback, data)
+        def synced(ok):
+            if settle is None or settle(ok):
+                deliver(MIRROR.all("patients", sort_term, sort_dir), ok)
+
+        first_page = (lambda: deliver(MIRROR.all("patients", sort_term, sort_dir), False)) if warm else None
+        SYNC.pull("patients", url, synced, first_page)
+    else:
+        HTTP.get_json(url, deliver)
 
 
 @mainthread
@@ -303,17 +327,14 @@ def patients_add_form():
         submit_patient_data(data, add_btn)
 def submit_patient_data(data, add_btn):
     show_snack("Please wait as patient is added")
-    Thread(target=add_patient, args=(data,add_btn), daemon=True).start()
+    POOL.submit(add_patient, data,add_btn)
 
 def add_patient(data, add_btn):
-    url = f"{SERVER_URL}patients/patients-add/?hospital_id={store.get('hospital')['hsp_id']}"
-    response = requests.post(url, json=data)
-    if response.status_code != 200:
-        add_btn.disabled = False
-        show_snack("Failed to sync patient")
-        return
+    url = f"{SERVER_URL}patients/patients-add/?hospital_id={HOSPITAL.id}"
     add_btn.disabled = False
-    show_snack("Patient synced successfully.")
+    OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: show_snack(
+        "Patient synced successfully." if ok else "Failed to sync patient"
+    ))
 
 def make_text_field(field_name, field_icon, field_text=None):
     text_field = MDTextField(
@@ -472,28 +493,24 @@ def confirm_deletion_form(pat_id):
 
 def submit_patient_edit_data(data, pat_id):
     show_snack("Please wait as patient is edited")
-    Thread(target=edit_patient, args=(data, pat_id), daemon=True).start()
+    POOL.submit(edit_patient, data, pat_id)
 
 
 def edit_patient(data, pat_id):
-    url = f"{SERVER_URL}patients/patients-edit/?hospital_id={store.get('hospital')['hsp_id']}&patient_id={pat_id}"
-    response = requests.put(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync patient")
-        return
-    show_snack("Patient synced successfully.")
+    url = f"{SERVER_URL}patients/patients-edit/?hospital_id={HOSPITAL.id}&patient_id={pat_id}"
+    OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: show_snack(
+        "Patient synced successfully." if ok else "Failed to sync patient"
+    ))
 
 def start_patient_deletion(pat_id):
     show_snack("Please wait as patient is deleted")
-    Thread(target=delete_patient, args=(pat_id,), daemon=True).start()
+    POOL.submit(delete_patient, pat_id)
 
 def delete_patient(pat_id):
-    url = f"{SERVER_URL}patients/patients-delete/?hospital_id={store.get('hospital')['hsp_id']}&patient_id={pat_id}"
-    response = requests.delete(url)
-    if response.status_code != 200:
-        show_snack("Failed to sync patient")
-        return
-    show_snack("Patient synced successfully.")
+    url = f"{SERVER_URL}patients/patients-delete/?hospital_id={HOSPITAL.id}&patient_id={pat_id}"
+    OUTBOX.enqueue("DELETE", url, on_result=lambda ok: show_snack(
+        "Patient synced successfully." if ok else "Failed to sync patient"
+    ))
 
 def show_date_picker(target_field):
     day = month = year = "00"
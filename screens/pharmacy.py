@@ -17,6 +17,9 @@ from screens.drugs import (
 )
 from screens.prescriptions import PrescriptionsInfo
 from config import resource_path
+from search import SearchDebouncer
+from sorting import SORT_OPTIONS, ListResults
+from paging import PagedList
 
 Builder.load_file(resource_path("screens/pharmacy.kv"))
 
@@ -24,19 +27,27 @@ Builder.load_file(resource_path("screens/pharmacy.kv"))
 class PharmacyScreen(MDScreen):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.current_search_callback = None
+        self.searcher = SearchDebouncer()
+        self.results = ListResults()
+        self.pages = PagedList(self.ids.rec_view)
+        # One bound handler per row type; rows get it with their own data on display.
+        self.row_handlers = {
+            "DrugsRow": self.display_drugs,
+            "PrescriptionsRow": self.display_prescriptions,
+        }
         self.ids.search_field.bind(text=self._on_search_field_text)
 
     def _on_search_field_text(self, instance, value):
         if self.current_search_callback:
-            self.current_search_callback(value)
+            self.searcher.push(value, self.current_search_callback)
     
     def display_items(self, prev_class, items, flag, mapper):
         prev = self.ids.rec_view
         self.ids.rec_box.default_size = (None, dp(80))
         prev.viewclass = prev_class
-
-        data = [mapper(i) for i in items]
-        prev.data = data
+        self.results.keep(prev_class, items)
+        self.pages.show(items, mapper, self.row_handlers.get(prev_class))
     
     
     # Making drugs mapper
@@ -47,7 +58,6 @@ class PharmacyScreen(MDScreen):
             'drug_name': (drug.get("drug_name") or "Unknown").strip(),
             'drug_category': (drug.get("drug_category") or "Unknown").strip(),
             'drug_quantity': f"{drug.get('drug_quantity', 0)} available",
-            'show_profile': lambda drug_data=drug: self.display_drugs(drug_data)
         }
 
 
@@ -63,7 +73,7 @@ class PharmacyScreen(MDScreen):
                 return
             self.display_items("DrugsRow", drugs, "worker", self.drugs_mapper)
         
-        fetch_drugs("all", "all", "desc", callback=on_drugs_fetched)
+        fetch_drugs("all", "all", "desc", callback=self.searcher.guard(on_drugs_fetched), warm=True)
 
     
     def search_drugs(self, *args):
@@ -82,7 +92,7 @@ class PharmacyScreen(MDScreen):
         fetch_drugs(
             intent="search",
             search_term=term,
-            callback=on_drugs_fetched
+            callback=self.searcher.guard(on_drugs_fetched)
         )
         
     def show_drug_sort_dropdown(self, caller):
@@ -143,14 +153,12 @@ class PharmacyScreen(MDScreen):
                 self.show_snack("Drugs not found")
                 return
             self.display_items("DrugsRow", drugs, "drug", self.drugs_mapper)
-        if val == "Name (A to Z)":
-            fetch_drugs(sort_term="name", sort_dir="asc", callback=on_drugs_fetched)
-        elif val == "Name (Z to A)":
-            fetch_drugs(intent="all", sort_term="name", sort_dir="desc", callback=on_drugs_fetched)
-        elif val == "Date (New to Old)":
-            fetch_drugs(intent="all", sort_term="date", sort_dir="desc", callback=on_drugs_fetched)
-        elif val == "Date (Old to New)":
-            fetch_drugs(sort_term="date", sort_dir="asc", callback=on_drugs_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("DrugsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_drugs_fetched)(rows)
+            return
+        fetch_drugs(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_drugs_fetched))
     
     def display_drugs(self, drug_data: dict):
         self.preview_display(
@@ -196,7 +204,6 @@ class PharmacyScreen(MDScreen):
         return {
             'patient_name': (presc.get("patient_name") or "Unknown").strip(),
             'items_count': f"{len(entries)} Items",
-            'show_profile': lambda presc_data=presc: self.display_prescriptions(presc_data)
         }
 
         
@@ -211,7 +218,7 @@ class PharmacyScreen(MDScreen):
                 return
             self.display_items("PrescriptionsRow", prescs, "diag", self.prescriptions_mapper)
         
-        PrescriptionsInfo().fetch_prescription("all", "all", "desc", callback=on_prescs_fetched)
+        PrescriptionsInfo().fetch_prescription("all", "all", "desc", callback=self.searcher.guard(on_prescs_fetched))
 
     
     def search_prescriptions(self, *args):
@@ -230,7 +237,7 @@ class PharmacyScreen(MDScreen):
         PrescriptionsInfo().fetch_prescription(
             intent="search",
             search_term=term,
-            callback=on_prescs_fetched
+            callback=self.searcher.guard(on_prescs_fetched)
         )
         
     def show_prescs_sort_dropdown(self, caller):
@@ -291,14 +298,12 @@ class PharmacyScreen(MDScreen):
                 self.show_snack("prescription not found")
                 return
             self.display_items("PrescriptionsRow", diags, "drug", self.prescriptions_mapper)
-        if val == "Name (A to Z)":
-            PrescriptionsInfo().fetch_prescription(sort_term="name", sort_dir="asc", callback=on_diags_fetched)
-        elif val == "Name (Z to A)":
-            PrescriptionsInfo().fetch_prescription(intent="all", sort_term="name", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (New to Old)":
-            PrescriptionsInfo().fetch_prescription(intent="all", sort_term="date", sort_dir="desc", callback=on_diags_fetched)
-        elif val == "Date (Old to New)":
-            PrescriptionsInfo().fetch_prescription(sort_term="date", sort_dir="asc", callback=on_diags_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("PrescriptionsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_diags_fetched)(rows)
+            return
+        PrescriptionsInfo().fetch_prescription(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_diags_fetched))
     
     def display_prescriptions(self, presc_data: dict):
         self.preview_display(
@@ -14,11 +14,14 @@ from kivymd.uix.button import MDButton, MDButtonText, MDIconButton
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.gridlayout import MDGridLayout
 from kivymd.uix.dialog import MDDialog, MDDialogContentContainer, MDDialogButtonContainer, MDDialogHeadlineText, MDDialogIcon, MDDialogSupportingText
+from kivymd.uix.textfield import MDTextField, MDTextFieldHintText
 from kivymd.uix.widget import Widget
 
-from screens.drugs import fetch_drugs, start_drug_sale
+from screens.drugs import fetch_drugs, start_cart_sale
 from datetime import datetime
+from cart import Cart
 from config import resource_path
+from search import SearchDebouncer
 
 Builder.load_file(resource_path("screens/pos.kv"))
 
@@ -48,11 +51,42 @@ class DrugItemRow(MDListItem):
         self.bind(drug_category=lambda inst, val: setattr(self.category_label, 'text', val))
         self.bind(drug_quantity=lambda inst, val: setattr(self.quantity_label, 'text', val))
 
+class CartItemRow(MDCard):
+    item = StringProperty("")
+    qty = StringProperty("")
+    net_price = StringProperty("")
+    color = StringProperty("blue")
+    on_select = ObjectProperty(None)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.size_hint_y = None
+        self.height = dp(40)
+        self.spacing = dp(10)
+        self.padding = dp(10)
+
+        self.on_release = lambda: self.on_select and self.on_select()
+
+        self.item_label = MDLabel(halign = "center", theme_text_color = "Custom", text_color = "blue")
+        self.qty_label = MDLabel(halign = "center", theme_text_color = "Custom", text_color = "blue")
+        self.price_label = MDLabel(halign = "center", theme_text_color = "Custom", text_color = "blue")
+
+        self.add_widget(self.item_label)
+        self.add_widget(self.qty_label)
+        self.add_widget(self.price_label)
+
+        self.bind(item=lambda inst, val: setattr(self.item_label, 'text', val))
+        self.bind(qty=lambda inst, val: setattr(self.qty_label, 'text', val))
+        self.bind(net_price=lambda inst, val: setattr(self.price_label, 'text', val))
+        self.bind(color=lambda inst, val: [setattr(label, 'text_color', val) for label in (self.item_label, self.qty_label, self.price_label)])
+
 class POSScreen(MDScreen):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.current_drug = {}
-        self.current_cart = []
+        self.cart = Cart(on_change=self.on_cart_change)
+        self.searcher = SearchDebouncer()
+        self.ids.search_field.bind(text=lambda instance, value: self.searcher.push(value, self.search_drugs))
         
     def drugs_mapper(self, drug: dict | None):
         drug = drug or {}
@@ -67,8 +101,6 @@ class POSScreen(MDScreen):
     
     def show_drugs(self):
         self.show_spinner("Please wait as drugs are fetched...")
-        self.ids.search_field.unbind(text=self.search_drugs)
-        self.ids.search_field.bind(text=lambda instance, value: self.search_drugs())
         
         self.ids.rec_box.clear_widgets()
         def on_drugs_fetched(drugs):
@@ -79,7 +111,7 @@ class POSScreen(MDScreen):
             self.dismiss_spinner()
             self.display_items("DrugItemRow", drugs, "worker", self.drugs_mapper)
         
-        fetch_drugs("all", "all", "desc", callback=on_drugs_fetched)
+        fetch_drugs("all", "all", "desc", callback=self.searcher.guard(on_drugs_fetched, self.dismiss_spinner), warm=True)
     
     def search_drugs(self, *args):
         term = self.ids.search_field.text.strip()
@@ -93,11 +125,10 @@ class POSScreen(MDScreen):
                 print("Drugs not found")
                 return
             self.display_items("DrugItemRow", drugs, "drug", self.drugs_mapper)
-        print("Searching drugs...")
         fetch_drugs(
             intent="search",
             search_term=term,
-            callback=on_drugs_fetched
+            callback=self.searcher.guard(on_drugs_fetched)
         )
     
     def display_items(self, prev_class, items, flag, mapper):
@@ -121,28 +152,80 @@ class POSScreen(MDScreen):
         self.ids.drug_name.text = drug_data.get("drug_name")
         self.current_drug = drug_data
     
-    def make_row_label(self, text):
-        return MDLabel(
-            text = text,
-            theme_text_color = "Custom",
-            text_color = "blue",
-            halign = "center"
-        )
+    def cart_row(self, line: dict, result: dict | None = None):
+        failed = result is not None and not result.get("ok")
+        return {
+            "item": f"{line.get('item')} ({result.get('detail')})" if failed else f"{line.get('item')}",
+            "qty": f"{line.get('qty')}",
+            "net_price": f"Ksh. {line.get('net_price')}",
+            "color": "red" if failed else "blue",
+            "on_select": lambda line_id=line["line_id"]: self.edit_cart_line(line_id),
+        }
     
-    def make_cart_card(self, cart_data: dict):
-        self.cart_row = MDCard(
-            size_hint_y = None,
-            height = dp(40),
-            spacing = dp(10),
-            padding = dp(10)
+    def on_cart_change(self, action, index, line):
+        # Patch only the affected row; the RecycleView refreshes just that slice.
+        data = self.ids.cart_view.data
+        if action == "add":
+            data.append(self.cart_row(line))
+        elif action == "edit":
+            data[index] = self.cart_row(line)
+        elif action == "remove":
+            data.pop(index)
+        else:
+            self.ids.cart_view.data = []
+        self.ids.grand_total.text = f"Ksh. {self.cart.total}"
+    
+    def show_cart_results(self, results: list):
+        data = self.ids.cart_view.data
+        for i, (line, result) in enumerate(zip(self.cart.lines, results)):
+            data[i] = self.cart_row(line, result)
+    
+    def edit_cart_line(self, line_id):
+        line = self.cart.line(line_id)
+        qty_field = MDTextField(
+            MDTextFieldHintText(text = "Quantity"),
+            text = f"{line.get('qty')}",
+            input_filter = "int",
         )
-        
-        self.cart_row.add_widget(self.make_row_label(cart_data.get("item")))
-        self.cart_row.add_widget(self.make_row_label(f"{cart_data.get('qty')}"))
-        self.cart_row.add_widget(self.make_row_label(f"Ksh. {cart_data.get('net_price')}"))
-        
-        return self.cart_row
-        
+        self.cart_dialog = MDDialog(
+            MDDialogIcon(icon = "cart", theme_icon_color = "Custom", icon_color = "blue"),
+            MDDialogHeadlineText(text = f"{line.get('item')}", theme_text_color = "Custom", text_color = "blue", bold = True),
+            MDDialogContentContainer(qty_field, orientation = "vertical", padding = dp(10)),
+            MDDialogButtonContainer(
+                Widget(),
+                MDButton(
+                    MDButtonText(text = "Remove", theme_text_color = "Custom", text_color = "red"),
+                    on_release = lambda *a: self.remove_cart_line(line_id)
+                ),
+                MDButton(
+                    MDButtonText(text = "Update", theme_text_color = "Custom", text_color = "blue"),
+                    on_release = lambda *a: self.update_cart_line(line_id, qty_field.text)
+                ),
+                spacing = dp(10),
+                padding = dp(10)
+            ),
+        )
+        self.cart_dialog.open()
+    
+    def update_cart_line(self, line_id, qty_str):
+        try:
+            qty = int(qty_str.strip())
+        except ValueError:
+            self.show_snack("Enter valid integer for quantity")
+            return
+        if qty <= 0:
+            self.remove_cart_line(line_id)
+            return
+        stock = self.cart.line(line_id)["drug"].get("drug_quantity")
+        if stock is not None and stock < qty:
+            self.show_snack("Insufficient drugs. Try a lower ammount")
+            return
+        self.cart.set_qty(line_id, qty)
+        self.cart_dialog.dismiss()
+    
+    def remove_cart_line(self, line_id):
+        self.cart.remove(line_id)
+        self.cart_dialog.dismiss()
     
     def compute_price(self):
         if not self.current_drug:
@@ -162,7 +245,8 @@ class POSScreen(MDScreen):
             self.show_snack("Quantity must be greater than 0")
             return
         
-        if self.current_drug.get("drug_quantity") < qty:
+        in_cart = self.cart.qty_of(self.current_drug.get("drug_id"))
+        if self.current_drug.get("drug_quantity") < in_cart + qty:
             self.show_snack("Insufficient drugs. Try a lower ammount")
             return
         
@@ -171,27 +255,7 @@ class POSScreen(MDScreen):
         self.ids.drug_price.text = f"Ksh. {drug_price}"
         net_price = drug_price * qty
         self.ids.net_price.text = f"{net_price}"
-        self.current_cart.append({
-            "drug_id": self.current_drug.get("drug_id"),
-            "item": self.current_drug.get("drug_name"),
-            "qty": qty,
-            "net_price": net_price
-        })
-        if not self.current_cart:
-            self.show_snack("Cart is empty")
-            return
-        
-        self.ids.cart_prev.clear_widgets()
-        for cart_data in self.current_cart:
-            self.ids.cart_prev.add_widget(self.make_cart_card(cart_data))
-        
-        self.compute_grand_total()
-    
-    def compute_grand_total(self):
-        total = 0
-        for cart_item in self.current_cart:
-            total += cart_item.get("net_price")
-        self.ids.grand_total.text = f"Ksh. {total}"
+        self.cart.add(self.current_drug, qty)
         
     
     def on_enter(self):
@@ -334,22 +398,46 @@ class POSScreen(MDScreen):
         self.calc_input.text = ""
         
     def clear_cart(self):
-        self.current_cart.clear()
-        self.ids.cart_prev.clear_widgets()
-        self.ids.grand_total.text = "Ksh. 0.0"
+        self.cart.clear()
     
     def sale_drugs(self):
-        if not self.current_cart:
+        if not self.cart:
             self.show_snack("Cart is empty")
             return
-        for drug_data in self.current_cart:
-            start_drug_sale(drug_data)
-        self.current_cart.clear()
-        self.ids.cart_prev.clear_widgets()
-        self.ids.grand_total.text = "Ksh. 0.0"
-        self.show_drugs()
+        cart = list(self.cart)
+        if not start_cart_sale(cart, on_done=lambda lines: self.on_sale_done(cart, lines)):
+            return
+        self.show_snack(f"Selling {len(cart)} items...")
+        self.clear_cart()
         self.current_drug = {}
     
+    def on_sale_done(self, cart, lines):
+        failed = [line for line in lines if not line["ok"]]
+        if not failed:
+            self.show_snack(f"Sold {len(lines)} items")
+            self.show_drugs()
+            return
+        details = "; ".join(f"{line['item']}: {line['detail']}" for line in failed)
+        if self.cart.lines == cart:
+            # Stopped by the local stock check; nothing was sent.
+            self.show_snack("Sale not completed. " + details)
+            self.show_cart_results(lines)
+            return
+        sold = len(lines) - len(failed)
+        self.show_snack((f"Sold {sold} of {len(lines)} items. " if sold else "Sale not completed. ") + details)
+        if sold:
+            self.show_drugs()
+        # Lines are sold one by one, so only the refused ones go back in the
+        # cart; the rest are already sold and billed, and checking them out
+        # again would sell them twice. Unconfirmed lines may have been sold
+        # too, so they stay out and are only reported.
+        refused = [(line, result) for line, result in zip(cart, lines) if not result["ok"] and not result.get("unconfirmed")]
+        unsold = [line for line, result in refused]
+        if not self.cart:
+            self.cart.restore(unsold)
+        if self.cart.lines == unsold:
+            self.show_cart_results([result for line, result in refused])
+    
     def show_snack(self, text):
         MDSnackbar(
             MDSnackbarText(text=text), 
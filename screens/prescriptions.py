@@ -20,13 +20,16 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
 from datetime import datetime, timedelta
 import asyncio
 from collections import defaultdict
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 from screens.patients import fetch_patients
 from screens.drugs import fetch_drugs
 
@@ -184,26 +187,29 @@ class PrescriptionsInfo:
         return scroll
 
     def fetch_prescription(self, intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-        Thread(target=self.fetch_and_return_online_prescs, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+        if intent == "search":
+            POOL.cancel("prescriptions-search")
+        return POOL.submit(self.fetch_and_return_online_prescs, intent, sort_term, sort_dir, search_term, callback, group=f"prescriptions-{intent}")
 
     def fetch_and_return_online_prescs(self, intent, sort_term, sort_dir, search_term, callback):
+        if intent == "search" and MIRROR.has("prescriptions"):
+            if callback:
+                self.run_on_main_thread(callback, MIRROR.search("prescriptions", search_term))
+            return
         url = ""
         if intent == "search":
-            url = f"{SERVER_URL}prescription/prescriptions-search/?hospital_id={self.store.get('hospital')['hsp_id']}&search_term={search_term}"
+            url = f"{SERVER_URL}prescription/prescriptions-search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
         elif intent == "all":
-            url = f"{SERVER_URL}prescription/prescriptions-fetch/?hospital_id={self.store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
-
-        try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-            else:
-                data = []
-        except Exception:
-            data = []
-
-        if callback:
-            self.run_on_main_thread(callback, data)
+            url = f"{SERVER_URL}prescription/prescriptions-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
+
+        def deliver(data):
+            if callback:
+                self.run_on_main_thread(callback, [] if data is None else data)
+
+        if intent == "all":
+            SYNC.pull("prescriptions", url, lambda ok: deliver(MIRROR.all("prescriptions", sort_term, sort_dir)))
+        else:
+            HTTP.get_json(url, deliver)
     
 
     @mainthread
@@ -307,17 +313,14 @@ class PrescriptionsInfo:
         self.submit_presc_data(data)
     def submit_presc_data(self, data):
         self.show_snack("Please wait as prescription is added")
-        Thread(target=self.add_presc, args=(data,), daemon=True).start()
+        POOL.submit(self.add_presc, data)
 
     def add_presc(self, data):
-        url = f"{SERVER_URL}prescription/prescriptions-add/?hospital_id={self.store.get('hospital')['hsp_id']}"
-        response = requests.post(url, json=data)
-        if response.status_code != 200:
-            self.add_button.disabled = False
-            self.show_snack("Failed to sync prescription")
-            return
+        url = f"{SERVER_URL}prescription/prescriptions-add/?hospital_id={HOSPITAL.id}"
         self.add_button.disabled = False
-        self.show_snack("Prescription synced successfully")
+        OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: self.show_snack(
+            "Prescription synced successfully" if ok else "Failed to sync prescription"
+        ))
 
     def confirm_deletion_form(self, presc_id):
         confirm_delete_dialog = MDDialog(
@@ -358,15 +361,13 @@ class PrescriptionsInfo:
 
     def start_presc_deletion(self, presc_id):
         self.show_snack("Please wait as prescription is deleted")
-        Thread(target=self.delete_prescription, args=(presc_id,), daemon=True).start()
+        POOL.submit(self.delete_prescription, presc_id)
 
     def delete_prescription(self, presc_id):
-        url = f"{SERVER_URL}prescription/prescriptions-delete/?hospital_id={self.store.get('hospital')['hsp_id']}&prescription_id={diag_id}"
-        response = requests.delete(url)
-        if response.status_code != 200:
-            self.show_snack("Failed to sync prescription")
-            return
-        self.show_snack("Prescription synced successfully")
+        url = f"{SERVER_URL}prescription/prescriptions-delete/?hospital_id={HOSPITAL.id}&prescription_id={diag_id}"
+        OUTBOX.enqueue("DELETE", url, on_result=lambda ok: self.show_snack(
+            "Prescription synced successfully" if ok else "Failed to sync prescription"
+        ))
         
     @mainthread
     def make_patients_container(self):
@@ -18,6 +18,9 @@ from screens.patients import (
 from screens.appointments import AppointmentsInfo
 from screens.billings import BillingsInfo
 from config import resource_path
+from search import SearchDebouncer
+from sorting import SORT_OPTIONS, ListResults
+from paging import PagedList
 
 
 Builder.load_file(resource_path("screens/reception.kv"))
@@ -25,19 +28,27 @@ Builder.load_file(resource_path("screens/reception.kv"))
 class ReceptionScreen(MDScreen):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.current_search_callback = None
+        self.searcher = SearchDebouncer()
+        self.results = ListResults()
+        self.pages = PagedList(self.ids.rec_view)
+        # One bound handler per row type; rows get it with their own data on display.
+        self.row_handlers = {
+            "PatientsRow": self.display_patients,
+            "AppointmentsRow": self.display_appointments,
+        }
         self.ids.search_field.bind(text=self._on_search_field_text)
 
     def _on_search_field_text(self, instance, value):
         if self.current_search_callback:
-            self.current_search_callback(value)
+            self.searcher.push(value, self.current_search_callback)
     
     def display_items(self, prev_class, items, flag, mapper):
         prev = self.ids.rec_view
         self.ids.rec_box.default_size = (None, dp(80))
         prev.viewclass = prev_class
-
-        data = [mapper(i) for i in items]
-        prev.data = data
+        self.results.keep(prev_class, items)
+        self.pages.show(items, mapper, self.row_handlers.get(prev_class))
     
     def patients_mapper(self, pat: dict | None):
         pat = pat or {}
@@ -46,7 +57,6 @@ class ReceptionScreen(MDScreen):
             'patient_name': (pat.get("patient_name") or "Unknown").strip(),
             'patient_email': (pat.get("patient_email") or "example@gmail.com").strip(),
             'patient_phone': (pat.get("patient_phone") or "0712345678").strip(),
-            'show_profile': lambda pat_data=pat: self.display_patients(pat_data)
         }
 
     def show_billings(self):
@@ -63,7 +73,7 @@ class ReceptionScreen(MDScreen):
                 return
             self.display_items("PatientsRow", patients, "patient", self.patients_mapper)
         
-        fetch_patients("all", "all", "desc", callback=on_patients_fetched)
+        fetch_patients("all", "all", "desc", callback=self.searcher.guard(on_patients_fetched), warm=True)
 
     
     def search_patients(self, *args):
@@ -83,7 +93,7 @@ class ReceptionScreen(MDScreen):
             intent="search",
             search_by="name" or "email" or "phone",
             search_term=term,
-            callback=on_patients_fetched
+            callback=self.searcher.guard(on_patients_fetched)
         )
         
     def show_pat_sort_dropdown(self, caller):
@@ -144,14 +154,12 @@ class ReceptionScreen(MDScreen):
                 self.show_snack("Patients not found")
                 return
             self.display_items("PatientsRow", patients, "patient", self.patients_mapper)
-        if val == "Name (A to Z)":
-            fetch_patients(sort_term="name", sort_dir="asc", callback=on_patients_fetched)
-        elif val == "Name (Z to A)":
-            fetch_patients(sort_term="name", sort_dir="desc", callback=on_patients_fetched)
-        elif val == "Date (New to Old)":
-            fetch_patients(sort_term="date", sort_dir="desc", callback=on_patients_fetched)
-        elif val == "Date (Old to New)":
-            fetch_patients(sort_term="date", sort_dir="asc", callback=on_patients_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("PatientsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_patients_fetched)(rows)
+            return
+        fetch_patients(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_patients_fetched))
     
     def display_patients(self, pat_data: dict):
         self.preview_display(
@@ -198,7 +206,6 @@ class ReceptionScreen(MDScreen):
             'patient_name': (patient.get("patient_name") or "Unknown").strip(),
             'app_desc': (app.get("appointment_desc") or "Unknown").strip(),
             'app_date': str(app.get("date_requested") or "YY-MM-DD").strip(),
-            'show_profile': lambda app_data=app: self.display_appointments(app_data)
         }
 
 
@@ -214,7 +221,7 @@ class ReceptionScreen(MDScreen):
                 return
             self.display_items("AppointmentsRow", apps, "diag", self.appointments_mapper)
         
-        AppointmentsInfo().fetch_apps("all", "all", "desc", callback=on_apps_fetched)
+        AppointmentsInfo().fetch_apps("all", "all", "desc", callback=self.searcher.guard(on_apps_fetched))
 
     
     def search_appointments(self, *args):
@@ -233,7 +240,7 @@ class ReceptionScreen(MDScreen):
         AppointmentsInfo().fetch_apps(
             intent="search",
             search_term=term,
-            callback=on_apps_fetched
+            callback=self.searcher.guard(on_apps_fetched)
         )
         
     def show_apps_sort_dropdown(self, caller):
@@ -294,14 +301,12 @@ class ReceptionScreen(MDScreen):
                 self.show_snack("Appointments not found")
                 return
             self.display_items("AppointmentsRow", apps, "drug", self.appointments_mapper)
-        if val == "Name (A to Z)":
-            AppointmentsInfo().fetch_apps(sort_term="name", sort_dir="asc", callback=on_apps_fetched)
-        elif val == "Name (Z to A)":
-            AppointmentsInfo().fetch_apps(intent="all", sort_term="name", sort_dir="desc", callback=on_apps_fetched)
-        elif val == "Date (New to Old)":
-            AppointmentsInfo().fetch_apps(intent="all", sort_term="date", sort_dir="desc", callback=on_apps_fetched)
-        elif val == "Date (Old to New)":
-            AppointmentsInfo().fetch_apps(sort_term="date", sort_dir="asc", callback=on_apps_fetched)
+        sort_term, sort_dir = SORT_OPTIONS[val]
+        rows = self.results.sorted("AppointmentsRow", sort_term, sort_dir)
+        if rows is not None:
+            self.searcher.guard(on_apps_fetched)(rows)
+            return
+        AppointmentsInfo().fetch_apps(sort_term=sort_term, sort_dir=sort_dir, callback=self.searcher.guard(on_apps_fetched))
     
     def display_appointments(self, app_data: dict):
         self.preview_display(
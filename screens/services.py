@@ -18,12 +18,17 @@ from kivymd.uix.pickers import MDDockedDatePicker
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
+from fetchcache import FETCHES
+from warmstart import WARM
 from datetime import datetime, timedelta
 import asyncio
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 
 class ServicesRow(MDListItem):
     service_name = StringProperty("")
@@ -106,27 +111,46 @@ def display_services_info(service_data: dict):
     return scroll
 
 
-def fetch_services(intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None):
-    Thread(target=fetch_and_return_online_services, args=(intent, sort_term, sort_dir, search_term, callback), daemon=True).start()
+def fetch_services(intent="all", sort_term="all", sort_dir="desc", search_term="ss", callback=None, warm=False):
+    if intent == "search":
+        POOL.cancel("services-search")
+    return POOL.submit(fetch_and_return_online_services, intent, sort_term, sort_dir, search_term, callback, warm, group=f"services-{intent}")
 
-def fetch_and_return_online_services(intent, sort_term, sort_dir, search_term, callback):
+def fetch_and_return_online_services(intent, sort_term, sort_dir, search_term, callback, warm=False):
+    if intent == "search" and MIRROR.has("services"):
+        if callback:
+            run_on_main_thread(callback, MIRROR.search("services", search_term))
+        return
+    key = ("services", intent, sort_term, sort_dir, search_term if intent == "search" else None)
+    cached = FETCHES.get(key)
+    if cached is not None:
+        if callback:
+            run_on_main_thread(callback, cached)
+        return
+    store = FETCHES.storer(key)
     url = ""
     if intent == "search":
-        url = f"{SERVER_URL}services/services-search/?hospital_id={store.get('hospital')['hsp_id']}&search_term={search_term}"
+        url = f"{SERVER_URL}services/services-search/?hospital_id={HOSPITAL.id}&search_term={search_term}"
     elif intent == "all":
-        url = f"{SERVER_URL}services/services-fetch/?hospital_id={store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
+        url = f"{SERVER_URL}services/services-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
+
+    def deliver(data, fresh=True):
+        if data is not None and fresh:
+            store(data)
+        if callback:
+            run_on_main_thread(callback, [] if data is None else data)
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-        else:
-            data = []
-    except Exception:
-        data = []
+    if intent == "all":
+        settle = WARM.serve("services", lambda: deliver(MIRROR.all("services", sort_term, sort_dir), False)) if warm else None
 
-    if callback:
-        run_on_main_thread(callback, data)
+        def synced(ok):
+            if settle is None or settle(ok):
+                deliver(MIRROR.all("services", sort_term, sort_dir), ok)
+
+        first_page = (lambda: deliver(MIRROR.all("services", sort_term, sort_dir), False)) if warm else None
+        SYNC.pull("services", url, synced, first_page)
+    else:
+        HTTP.get_json(url, deliver)
 
 @mainthread
 def run_on_main_thread(callback, data):
@@ -202,17 +226,14 @@ def services_add_form():
         submit_service_data(data, add_btn)
 def submit_service_data(data, add_btn):
     show_snack("Please wait as service is added")
-    Thread(target=add_service, args=(data, add_btn), daemon=True).start()
+    POOL.submit(add_service, data, add_btn)
 
 def add_service(data, add_btn):
-    url = f"{SERVER_URL}services/services-add/?hospital_id={store.get('hospital')['hsp_id']}"
-    response = requests.post(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync service")
-        add_btn.disabled = False
-        return
+    url = f"{SERVER_URL}services/services-add/?hospital_id={HOSPITAL.id}"
     add_btn.disabled = False
-    show_snack("Service synced successfully")
+    OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: show_snack(
+        "Service synced successfully" if ok else "Failed to sync service"
+    ))
 
 def make_text_field(field_name, field_icon, field_text=None):
     text_field = MDTextField(
@@ -310,27 +331,23 @@ def confirm_deletion_form(service_id):
 
 def submit_service_edit_data(data, service_id):
     show_snack("Please wait as service is edited")
-    Thread(target=edit_service, args=(data, service_id), daemon=True).start()
+    POOL.submit(edit_service, data, service_id)
 
 def edit_service(data, service_id):
-    url = f"{SERVER_URL}services/services-edit/?hospital_id={store.get('hospital')['hsp_id']}&service_id={service_id}"
-    response = requests.put(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync service")
-        return
-    show_snack("Service synced successfully")
+    url = f"{SERVER_URL}services/services-edit/?hospital_id={HOSPITAL.id}&service_id={service_id}"
+    OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: show_snack(
+        "Service synced successfully" if ok else "Failed to sync service"
+    ))
 
 def start_service_deletion(service_id):
     show_snack("Please wait as service is deleted")
-    Thread(target=delete_service, args=(service_id,), daemon=True).start()
+    POOL.submit(delete_service, service_id)
 
 def delete_service(service_id):
-    url = f"{SERVER_URL}services/services-delete/?hospital_id={store.get('hospital')['hsp_id']}&service_id={service_id}"
-    response = requests.delete(url)
-    if response.status_code != 200:
-        show_snack("Failed to sync service")
-        return
-    show_snack("Service synced successfully")
+    url = f"{SERVER_URL}services/services-delete/?hospital_id={HOSPITAL.id}&service_id={service_id}"
+    OUTBOX.enqueue("DELETE", url, on_result=lambda ok: show_snack(
+        "Service synced successfully" if ok else "Failed to sync service"
+    ))
         
 @mainthread
 def show_snack(text):
@@ -19,12 +19,17 @@ from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.snackbar import MDSnackbar, MDSnackbarText
 from kivymd.uix.selectioncontrol import MDCheckbox
 
-from threading import Thread
-import requests
+from tasks import POOL
+from network import HTTP
+from outbox import OUTBOX
+from mirror import MIRROR
+from sync import SYNC
+from fetchcache import FETCHES
+from warmstart import WARM
 from datetime import datetime, timedelta
 import asyncio
 
-from config import SERVER_URL, STORE
+from config import SERVER_URL, STORE, HOSPITAL
 
 class WorkersRow(MDListItem):
     worker_name = StringProperty("")
@@ -114,27 +119,46 @@ def display_workers_info(wrk_data: dict):
     return scroll
 
 
-def fetch_workers(intent="all", sort_term="all", sort_dir="desc", search_term="ss", search_by="name", callback=None):
-    Thread(target=fetch_and_return_online_workers, args=(intent, sort_term, sort_dir, search_term, search_by, callback), daemon=True).start()
+def fetch_workers(intent="all", sort_term="all", sort_dir="desc", search_term="ss", search_by="name", callback=None, warm=False):
+    if intent == "search":
+        POOL.cancel("workers-search")
+    return POOL.submit(fetch_and_return_online_workers, intent, sort_term, sort_dir, search_term, search_by, callback, warm, group=f"workers-{intent}")
 
-def fetch_and_return_online_workers(intent, sort_term, sort_dir, search_term, search_by, callback):
+def fetch_and_return_online_workers(intent, sort_term, sort_dir, search_term, search_by, callback, warm=False):
+    if intent == "search" and MIRROR.has("workers"):
+        if callback:
+            run_on_main_thread(callback, MIRROR.search("workers", search_term))
+        return
+    key = ("workers", intent, sort_term, sort_dir, f"{search_by}:{search_term}" if intent == "search" else None)
+    cached = FETCHES.get(key)
+    if cached is not None:
+        if callback:
+            run_on_main_thread(callback, cached)
+        return
+    store = FETCHES.storer(key)
     url = ""
     if intent == "search":
-        url = f"{SERVER_URL}workers/workers-search/?hospital_id={store.get('hospital')['hsp_id']}&search_by={search_by}&search_term={search_term}"
+        url = f"{SERVER_URL}workers/workers-search/?hospital_id={HOSPITAL.id}&search_by={search_by}&search_term={search_term}"
     elif intent == "all":
-        url = f"{SERVER_URL}workers/workers-fetch/?hospital_id={store.get('hospital')['hsp_id']}&sort_term={sort_term}&sort_dir={sort_dir}"
+        url = f"{SERVER_URL}workers/workers-fetch/?hospital_id={HOSPITAL.id}&sort_term=all&sort_dir=desc"
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-        else:
-            data = []
-    except Exception:
-        data = []
+    def deliver(data, fresh=True):
+        if data is not None and fresh:
+            store(data)
+        if callback:
+            run_on_main_thread(callback, [] if data is None else data)
 
-    if callback:
-        run_on_main_thread(callback, data)
+    if intent == "all":
+        settle = WARM.serve("workers", lambda: deliver(MIRROR.all("workers", sort_term, sort_dir), False)) if warm else None
+
+        def synced(ok):
+            if settle is None or settle(ok):
+                deliver(MIRROR.all("workers", sort_term, sort_dir), ok)
+
+        first_page = (lambda: deliver(MIRROR.all("workers", sort_term, sort_dir), False)) if warm else None
+        SYNC.pull("workers", url, synced, first_page)
+    else:
+        HTTP.get_json(url, deliver)
 
 @mainthread
 def run_on_main_thread(callback, data):
@@ -208,17 +232,14 @@ def workers_add_form():
         submit_worker_data(data, add_btn)
 def submit_worker_data(data, add_btn):
     show_snack("Please wait as worker is added")
-    Thread(target=add_worker, args=(data,add_btn), daemon=True).start()
+    POOL.submit(add_worker, data,add_btn)
 
 def add_worker(data, add_btn):
-    url = f"{SERVER_URL}workers/workers-add/?hospital_id={store.get('hospital')['hsp_id']}"
-    response = requests.post(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync worker")
-        add_btn.disabled = False
-        return
+    url = f"{SERVER_URL}workers/workers-add/?hospital_id={HOSPITAL.id}"
     add_btn.disabled = False
-    show_snack("Worker synced successfully")
+    OUTBOX.enqueue("POST", url, json=data, on_result=lambda ok: show_snack(
+        "Worker synced successfully" if ok else "Failed to sync worker"
+    ))
 
 def make_text_field(field_name, field_icon, field_text=None):
     text_field = MDTextField(
@@ -419,24 +440,22 @@ def confirm_deletion_form(wrk_id):
 
 def submit_worker_edit_data(data, wrk_id):
     show_snack("Please wait as worker is edited")
-    Thread(target=edit_worker, args=(data, wrk_id), daemon=True).start()
+    POOL.submit(edit_worker, data, wrk_id)
 
 def edit_worker(data, wrk_id):
-    url = f"{SERVER_URL}workers/workers-edit/?hospital_id={store.get('hospital')['hsp_id']}&worker_id={wrk_id}"
-    response = requests.put(url, json=data)
-    if response.status_code != 200:
-        show_snack("Failed to sync worker")
-        return
-    show_snack("Worker synced successfully")
+    url = f"{SERVER_URL}workers/workers-edit/?hospital_id={HOSPITAL.id}&worker_id={wrk_id}"
+    OUTBOX.enqueue("PUT", url, json=data, on_result=lambda ok: show_snack(
+        "Worker synced successfully" if ok else "Failed to sync worker"
+    ))
     
 
 def submit_worker_password_data(data, wrk_id):
     show_snack("Please wait as worker password is edited")
-    Thread(target=edit_password, args=(data, wrk_id), daemon=True).start()
+    POOL.submit(edit_password, data, wrk_id)
 
 def edit_password(data, wrk_id):
-    url = f"{SERVER_URL}workers/workers-change-password/?hospital_id={store.get('hospital')['hsp_id']}&worker_id={wrk_id}"
-    response = requests.put(url, json=data)
+    url = f"{SERVER_URL}workers/workers-change-password/?hospital_id={HOSPITAL.id}&worker_id={wrk_id}"
+    response = HTTP.put(url, json=data)
     if response.status_code != 200:
         show_snack("Failed to sync worker password")
         return
@@ -444,23 +463,21 @@ def edit_password(data, wrk_id):
 
 def start_worker_deletion(wrk_id):
     show_snack("Please wait as worker is deleted")
-    Thread(target=delete_worker, args=(wrk_id,), daemon=True).start()
+    POOL.submit(delete_worker, wrk_id)
 
 def delete_worker(wrk_id):
-    url = f"{SERVER_URL}workers/workers-delete/?hospital_id={store.get('hospital')['hsp_id']}&worker_id={wrk_id}"
-    response = requests.delete(url)
-    if response.status_code != 200:
-        show_snack("Failed to sync worker")
-        return
-    show_snack("Worker synced successfully")
+    url = f"{SERVER_URL}workers/workers-delete/?hospital_id={HOSPITAL.id}&worker_id={wrk_id}"
+    OUTBOX.enqueue("DELETE", url, on_result=lambda ok: show_snack(
+        "Worker synced successfully" if ok else "Failed to sync worker"
+    ))
 
 def start_worker_signin(worker_data: dict, callback=None):
     show_snack("Logging in...")
-    Thread(target=signin_thread, args=(worker_data, callback), daemon=True).start()
+    POOL.submit(signin_thread, worker_data, callback)
 
 def signin_thread(wrk_data, callback):
-    url = f"{SERVER_URL}workers/workers-signin/?hospital_id={store.get('hospital')['hsp_id']}"
-    response = requests.post(url, json=wrk_data)
+    url = f"{SERVER_URL}workers/workers-signin/?hospital_id={HOSPITAL.id}"
+    response = HTTP.post(url, json=wrk_data)
     if response.status_code != 200:
         show_snack("Login Failed")
         return
@@ -0,0 +1,53 @@
+from kivy.clock import Clock
+
+from config import SEARCH_DEBOUNCE
+
+
+class SearchDebouncer:
+    """Coalesces keystrokes into one search and drops out-of-order results.
+
+    `push` restarts a timer on every keystroke and only runs the search once
+    the user pauses for `delay` seconds. Callbacks wrapped with `guard` carry
+    the generation they were issued under; once a newer request is issued
+    (or the user keeps typing) older responses are silently discarded.
+    """
+
+    def __init__(self, delay=SEARCH_DEBOUNCE):
+        self.delay = delay
+        self.generation = 0
+        self.pending = None
+        self.issued = 0
+        self.dropped = 0
+
+    def push(self, term, search):
+        self.generation += 1
+        if self.pending is not None:
+            self.pending.cancel()
+        self.pending = Clock.schedule_once(lambda dt: self._fire(term, search), self.delay)
+
+    def _fire(self, term, search):
+        self.pending = None
+        self.issued += 1
+        search(term)
+
+    def cancel(self):
+        self.generation += 1
+        if self.pending is not None:
+            self.pending.cancel()
+            self.pending = None
+
+    def guard(self, callback, on_stale=None):
+        # Any newly issued request (a tab switch, a sort, the debounced
+        # search itself) supersedes both older responses and queued keystrokes.
+        self.cancel()
+        generation = self.generation
+
+        def deliver(data):
+            if generation != self.generation:
+                self.dropped += 1
+                if on_stale:
+                    on_stale()
+                return
+            callback(data)
+
+        return deliver
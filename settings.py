@@ -0,0 +1,113 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+from threading import Lock
+
+
+class SettingsStore:
+    """Key/value settings with the same get/put/exists/delete API as JsonStore.
+
+    Every entry is held in memory, so reads never touch the disk. Each write is
+    a single-row SQLite transaction instead of a rewrite of the whole file, so
+    a crash mid-write leaves either the old value or the new one.
+    """
+
+    def __init__(self, path, legacy_json=None):
+        self.lock = Lock()
+        self.listeners = []
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.data = {key: json.loads(value) for key, value in self.conn.execute("SELECT key, value FROM settings")}
+
+        if not self.data and legacy_json and os.path.exists(legacy_json):
+            self.import_json(legacy_json)
+
+    def import_json(self, path):
+        # One-off carry-over of the JsonStore file used by earlier versions.
+        try:
+            with open(path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not import {path}: {e}")
+            return
+        for key, values in entries.items():
+            self.put(key, **values)
+        # Keep it around but out of the way, or a later logout (which empties
+        # the table) would bring the old hospital back on the next start.
+        os.replace(path, path + ".migrated")
+
+    def get(self, key):
+        return self.data[key]
+
+    def exists(self, key):
+        return key in self.data
+
+    def keys(self):
+        return list(self.data)
+
+    def count(self):
+        return len(self.data)
+
+    def put(self, key, **values):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                (key, json.dumps(values, default=str)),
+            )
+            self.data[key] = values
+        self.notify(key, values)
+        return True
+
+    def delete(self, key):
+        with self.lock, self.conn:
+            if key not in self.data:
+                raise KeyError(key)
+            self.conn.execute("DELETE FROM settings WHERE key = ?", (key,))
+            del self.data[key]
+        self.notify(key, None)
+        return True
+
+    def bind(self, listener):
+        """Call `listener(key, values)` after every put, and with None after a delete."""
+        self.listeners.append(listener)
+
+    def notify(self, key, values):
+        for listener in self.listeners:
+            listener(key, values)
+
+
+class HospitalContext:
+    """The signed-in hospital, kept in memory for URL builders and timers.
+
+    Mirrors the "hospital" settings entry and refreshes itself whenever that
+    entry is written or removed.
+    """
+
+    KEY = "hospital"
+
+    def __init__(self, store):
+        self.load(store.data.get(self.KEY))
+        store.bind(self.on_store_change)
+
+    def on_store_change(self, key, values):
+        if key == self.KEY:
+            self.load(values)
+
+    def load(self, values):
+        values = values or {}
+        self.id = values.get("hsp_id")
+        self.name = values.get("name")
+        self.email = values.get("email")
+        self.phone = values.get("phone")
+        self.diag_fee = values.get("diag_fee")
+        self.expiry_date = values.get("expiry_date")
+        try:
+            self.expiry = datetime.fromisoformat(self.expiry_date) if self.expiry_date else None
+        except (TypeError, ValueError):
+            self.expiry = None
+
+    def __bool__(self):
+        return self.id is not None
@@ -0,0 +1,97 @@
+import time
+
+from config import RESULTS_TTL
+from mirror import ENTITIES, field
+
+# Sort menu entries -> (sort_term, sort_dir) as the fetch helpers take them.
+SORT_OPTIONS = {
+    "Name (A to Z)": ("name", "asc"),
+    "Name (Z to A)": ("name", "desc"),
+    "Date (New to Old)": ("date", "desc"),
+    "Date (Old to New)": ("date", "asc"),
+}
+
+# List view row class -> the entity its rows come from.
+ROW_ENTITIES = {
+    "PatientsRow": "patients",
+    "WorkersRow": "workers",
+    "DrugsRow": "drugs",
+    "DrugItemRow": "drugs",
+    "ServicesRow": "services",
+    "TestsRow": "lab_tests",
+    "DiagnosisRow": "diagnoses",
+    "PrescriptionsRow": "prescriptions",
+    "AppointmentsRow": "appointments",
+    "RequestsRow": "lab_requests",
+    "ResultsRow": "lab_results",
+    "BillingsRow": "billings",
+}
+
+
+def sort_key(entity, row, sort_term):
+    # Same order as LocalMirror.all: names case-insensitively, dates as
+    # ISO strings, "all" by numeric id. Missing values sort as empty.
+    spec = ENTITIES[entity]
+    if sort_term in ("name", "date"):
+        value = field(row, spec[sort_term])
+        return "" if value is None else str(value).lower()
+    value = row.get(spec["id"])
+    try:
+        return (int(value), "")
+    except (TypeError, ValueError):
+        return (0, "" if value is None else str(value))
+
+
+class ResultSet:
+    """The rows a list view last showed, re-sortable without a refetch.
+
+    Sort keys are computed once per sort term and kept, so switching
+    between orders is a single sort over precomputed keys.
+    """
+
+    def __init__(self, viewclass, rows, ttl=RESULTS_TTL):
+        self.viewclass = viewclass
+        self.entity = ROW_ENTITIES.get(viewclass)
+        self.rows = rows
+        self.ttl = ttl
+        self.loaded_at = time.monotonic()
+        self.keys = {}
+        self.view = rows
+
+    def fresh(self):
+        return time.monotonic() - self.loaded_at < self.ttl
+
+    def sorted(self, sort_term, sort_dir):
+        keys = self.keys.get(sort_term)
+        if keys is None:
+            keys = self.keys[sort_term] = [sort_key(self.entity, row, sort_term) for row in self.rows]
+        order = sorted(range(len(self.rows)), key=keys.__getitem__, reverse=sort_dir == "desc")
+        self.view = [self.rows[i] for i in order]
+        return self.view
+
+
+class ListResults:
+    """Tracks the result set behind a screen's list view."""
+
+    def __init__(self):
+        self.current = None
+        self.hits = 0
+        self.misses = 0
+
+    def keep(self, viewclass, rows):
+        # A re-sorted view of the current set is not a new result set.
+        if self.current is not None and rows is self.current.view:
+            return
+        if viewclass in ROW_ENTITIES and isinstance(rows, list):
+            self.current = ResultSet(viewclass, rows)
+        else:
+            self.current = None
+
+    def sorted(self, viewclass, sort_term, sort_dir):
+        """The current rows re-sorted, or None when they must be fetched again."""
+        current = self.current
+        if current is None or current.viewclass != viewclass or not current.fresh():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return current.sorted(sort_term, sort_dir)
@@ -0,0 +1,261 @@
+"""Opt-in startup tracer.
+
+Run with NEPTUNE_TRACE_STARTUP=1 (or =<directory> to choose where the
+report goes) or with the --trace-startup flag. Every phase from the
+first line of main.py to the first rendered frame is recorded as a timed
+span: module imports (each module's own execution time), kv files, the
+screens built and the app's build. The report is written as
+
+    startup-trace.json     summary plus Chrome trace events (chrome://tracing, Perfetto, speedscope)
+    startup-trace.folded   folded stacks for flamegraph.pl / speedscope
+
+This module only uses the standard library so it can be imported before
+anything it measures.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ENV_VAR = "NEPTUNE_TRACE_STARTUP"
+FLAG = "--trace-startup"
+
+
+class StartupTracer:
+    def __init__(self):
+        self.enabled = False
+        self.finished = False
+        self.origin = time.perf_counter()
+        self.out_dir = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.spans = []
+        self.marks = []
+        self.import_timer = None
+
+    def configure(self, argv=None, environ=None):
+        """Turn tracing on if asked to by the environment or command line."""
+        argv = sys.argv if argv is None else argv
+        environ = os.environ if environ is None else environ
+        value = environ.get(ENV_VAR, "")
+        if FLAG in argv:
+            # Kivy parses the command line too and rejects options it does not know.
+            argv.remove(FLAG)
+            value = value or "1"
+        self.enabled = value.lower() not in ("", "0", "false", "no")
+        if self.enabled:
+            self.out_dir = None if value.lower() in ("1", "true", "yes") else value
+            self.import_timer = ImportTimer(self)
+            sys.meta_path.insert(0, self.import_timer)
+        return self.enabled
+
+    def now(self):
+        return time.perf_counter()
+
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def start(self, name):
+        if not self.enabled or self.finished:
+            return None
+        stack = self.stack()
+        thread = threading.current_thread()
+        span = {
+            "name": name,
+            "start": self.now(),
+            "end": None,
+            "parent": stack[-1] if stack else None,
+            "tid": thread.ident,
+            "thread": thread.name,
+        }
+        stack.append(span)
+        with self.lock:
+            self.spans.append(span)
+        return span
+
+    def stop(self, span):
+        if span is None or span["end"] is not None:
+            return
+        span["end"] = self.now()
+        stack = self.stack()
+        if span in stack:
+            del stack[stack.index(span):]
+
+    @contextmanager
+    def span(self, name):
+        span = self.start(name)
+        try:
+            yield span
+        finally:
+            self.stop(span)
+
+    def mark(self, name):
+        if not self.enabled or self.finished:
+            return
+        thread = threading.current_thread()
+        with self.lock:
+            self.marks.append({"name": name, "at": self.now(), "tid": thread.ident, "thread": thread.name})
+
+    def instrument(self, owner, attr, label):
+        """Wrap `owner.attr` so each call is a span named `label(*args)`."""
+        if not self.enabled:
+            return
+        original = getattr(owner, attr)
+
+        def traced(*args, **kwargs):
+            with self.span(label(*args, **kwargs)):
+                return original(*args, **kwargs)
+
+        setattr(owner, attr, traced)
+
+    def finish(self, label="first frame"):
+        """Close the trace and write the report; later calls do nothing."""
+        if not self.enabled or self.finished:
+            return None
+        self.mark(label)
+        self.finished = True
+        end = self.now()
+        if self.import_timer in sys.meta_path:
+            sys.meta_path.remove(self.import_timer)
+        with self.lock:
+            for span in self.spans:
+                if span["end"] is None:
+                    span["end"] = end
+
+        report = self.report(end, label)
+        paths = self.write(report)
+        print(f"Startup trace: {report['total_ms']} ms to {label}, written to {', '.join(paths)}")
+        return report
+
+    def ms(self, seconds):
+        return round(seconds * 1000, 2)
+
+    def path(self, span):
+        names = []
+        while span is not None:
+            names.append(span["name"])
+            span = span["parent"]
+        return list(reversed(names))
+
+    def report(self, end, label):
+        spans = list(self.spans)
+        children = {}
+        for span in spans:
+            children.setdefault(id(span["parent"]), []).append(span)
+
+        def self_time(span):
+            inner = sum(c["end"] - c["start"] for c in children.get(id(span), ()))
+            return max(span["end"] - span["start"] - inner, 0)
+
+        imports = [s for s in spans if s["name"].startswith("import ")]
+        return {
+            "total_ms": self.ms(end - self.origin),
+            "until": label,
+            "phases": [
+                {"name": s["name"], "start_ms": self.ms(s["start"] - self.origin), "duration_ms": self.ms(s["end"] - s["start"])}
+                for s in spans if s["parent"] is None and s["tid"] == threading.main_thread().ident
+            ],
+            "slowest_imports": [
+                {"module": s["name"][7:], "self_ms": self.ms(self_time(s)), "total_ms": self.ms(s["end"] - s["start"])}
+                for s in sorted(imports, key=self_time, reverse=True)[:20]
+            ],
+            "marks": [{"name": m["name"], "at_ms": self.ms(m["at"] - self.origin), "thread": m["thread"]} for m in self.marks],
+            "traceEvents": [
+                {"name": s["name"], "ph": "X", "pid": os.getpid(), "tid": s["tid"],
+                 "ts": round((s["start"] - self.origin) * 1e6), "dur": round((s["end"] - s["start"]) * 1e6)}
+                for s in spans
+            ] + [
+                {"name": m["name"], "ph": "i", "s": "t", "pid": os.getpid(), "tid": m["tid"],
+                 "ts": round((m["at"] - self.origin) * 1e6)}
+                for m in self.marks
+            ],
+            "folded": self.folded(spans, self_time, end),
+        }
+
+    def folded(self, spans, self_time, end):
+        # One "root;child;grandchild <self microseconds>" line per stack.
+        totals = {}
+        main_tid = threading.main_thread().ident
+        covered = 0
+        for span in spans:
+            root = "startup" if span["tid"] == main_tid else f"thread {span['thread']}"
+            stack = ";".join([root] + [n.replace(";", ",") for n in self.path(span)])
+            totals[stack] = totals.get(stack, 0) + self_time(span)
+            if span["parent"] is None and span["tid"] == main_tid:
+                covered += span["end"] - span["start"]
+        totals["startup"] = max(end - self.origin - covered, 0)
+        return [f"{stack} {round(seconds * 1e6)}" for stack, seconds in totals.items() if seconds > 0]
+
+    def write(self, report):
+        out_dir = self.out_dir
+        if out_dir is None:
+            from config import get_app_data_path
+            out_dir = os.path.dirname(get_app_data_path("startup-trace.json"))
+        os.makedirs(out_dir, exist_ok=True)
+
+        folded = report.pop("folded")
+        json_path = os.path.join(out_dir, "startup-trace.json")
+        folded_path = os.path.join(out_dir, "startup-trace.folded")
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        with open(folded_path, "w") as f:
+            f.write("\n".join(folded) + "\n")
+        return [json_path, folded_path]
+
+
+class ImportTimer:
+    """meta_path hook recording each module's execution as an "import <name>" span."""
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.local = threading.local()
+
+    def find_spec(self, name, path=None, target=None):
+        if self.tracer.finished or getattr(self.local, "searching", False):
+            return None
+        self.local.searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self.local.searching = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = TimedLoader(spec.loader, self.tracer, name)
+        return spec
+
+
+class TimedLoader:
+    def __init__(self, loader, tracer, name):
+        self.loader = loader
+        self.tracer = tracer
+        self.name = name
+
+    def create_module(self, spec):
+        create = getattr(self.loader, "create_module", None)
+        return create(spec) if create else None
+
+    def exec_module(self, module):
+        # Put the real loader back first so nothing later ever sees this wrapper.
+        module.__loader__ = self.loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self.loader
+        with self.tracer.span(f"import {self.name}"):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, attr):
+        return getattr(self.loader, attr)
+
+
+TRACER = StartupTracer()
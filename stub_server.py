@@ -0,0 +1,362 @@
+"""Local stand-in for the Neptune API, for exercising the client offline.
+
+    python stub_server.py --port 8000 --rows 20000
+    NEPTUNE_SERVER_URL=http://127.0.0.1:8000/ python main.py
+
+The tests under tests/ run it in-process through `make_server` (port 0).
+
+Serves the `*-fetch` / `*-search` endpoints the app reads from, seeded with
+generated records. Every row carries a strictly increasing `updated_at`; a
+fetch with `since=<updated_at>` answers with only the rows changed after it,
+the ids deleted after it, and a new cursor.
+
+Fetch paths page when given `page_size`: the answer is the `page_size` rows
+that follow the row with id `after` (the start when omitted) in the
+requested order, with the full count in an X-Total-Count header.
+
+Every successful GET carries an ETag (a hash of its body); a GET whose
+If-None-Match names the current ETag gets 304 Not Modified and no body.
+
+Writes (`*-add`, `*-edit`, `*-delete`, drug sale) are applied to the same
+data. A write carrying an Idempotency-Key that was already seen gets the
+original response back without being applied again.
+
+Test hooks, not part of the real API:
+    POST   /_stub/<entity>        upsert a JSON row (or list of rows)
+    DELETE /_stub/<entity>/<id>   delete a row, leaving a tombstone
+    POST   /_stub/outage          {"seconds": n}: answer 503 to everything else for n seconds
+    GET    /_stub/stats           request and byte counters
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Lock
+from urllib.parse import urlparse, parse_qs
+
+# entity -> (fetch path, search path, id field, name field, date field)
+ROUTES = {
+    "patients": ("patients/patients-fetch/", "patients/patients-search/", "patient_id", "patient_name", "date_added"),
+    "drugs": ("drugs/drugs-fetch/", "drugs/drugs-search/", "drug_id", "drug_name", "date_added"),
+    "workers": ("workers/workers-fetch/", "workers/workers-search/", "worker_id", "worker_name", "date_added"),
+    "services": ("services/services-fetch/", "services/services-search/", "service_id", "service_name", "date_added"),
+    "lab_tests": ("lab_tests/lab_tests-fetch/", "lab_tests/lab_tests-search/", "test_id", "test_name", "date_added"),
+    "diagnoses": ("diagnosis/diagnosis-fetch/", "diagnosis/diagnosis-search/", "diagnosis_id", "patient.patient_name", "date_added"),
+    "prescriptions": ("prescription/prescriptions-fetch/", "prescription/prescriptions-search/", "prescription_id", "patient_name", "date_added"),
+    "appointments": ("appointments/appointments-fetch/", "appointments/appointments-search/", "appointment_id", "patient.patient_name", "date_requested"),
+    "lab_requests": ("lab_requests/lab_requests-fetch/", "lab_requests/lab_requests-search/", "request_id", "patient.patient_name", "date_added"),
+    "lab_results": ("lab_results/lab_results-fetch/", "lab_results/lab_results-search/", "result_id", "patient.patient_name", "date_added"),
+    "billings": ("billings/billings/show-all/", "billings/billings/search/", "billing_id", "patient.patient_name", "created_at"),
+}
+
+# "patients/patients-" -> "patients": the prefix of that entity's add/edit/delete paths.
+WRITE_PREFIXES = {fetch.split("-fetch")[0] + "-": entity for entity, (fetch, *_) in ROUTES.items() if "-fetch/" in fetch}
+
+FIRST = ["John", "Jane", "Amina", "Brian", "Wanjiku", "Otieno", "Fatuma", "Kevin", "Mercy", "Hassan"]
+LAST = ["Kamau", "Odhiambo", "Mwangi", "Njeri", "Kiprop", "Achieng", "Mutua", "Wekesa", "Ali", "Chebet"]
+DRUGS = ["Paracetamol", "Amoxicillin", "Ibuprofen", "Metformin", "Omeprazole", "Ciprofloxacin", "Cetirizine"]
+CATEGORIES = ["Analgesic", "Antibiotic", "Antidiabetic", "Antacid", "Antihistamine"]
+
+
+def field(row, dotted):
+    for part in dotted.split("."):
+        row = row.get(part) if isinstance(row, dict) else None
+    return row
+
+
+class Store:
+    def __init__(self):
+        self.lock = Lock()
+        self.tables = {entity: {} for entity in ROUTES}
+        self.tombstones = {entity: {} for entity in ROUTES}
+        self.clock = datetime(2024, 1, 1)
+        self.idempotent = {}
+        self.outage_until = 0
+        self.stats = {"requests": 0, "bytes_out": 0, "full": 0, "delta": 0, "writes": 0, "replayed": 0, "pings": 0, "not_modified": 0}
+
+    def tick(self):
+        # Strictly increasing, fixed-width stamps compare correctly as strings.
+        self.clock += timedelta(microseconds=1)
+        return self.clock.isoformat(timespec="microseconds")
+
+    def upsert(self, entity, row):
+        with self.lock:
+            return self._put(entity, row)
+
+    def _put(self, entity, row):
+        # Caller holds the lock.
+        id_field = ROUTES[entity][2]
+        if row.get(id_field) is None:
+            row[id_field] = max(self.tables[entity], default=0) + 1
+        row["updated_at"] = self.tick()
+        self.tables[entity][row[id_field]] = row
+        self.tombstones[entity].pop(row[id_field], None)
+        return row
+
+    def edit(self, entity, row_id, data):
+        id_field = ROUTES[entity][2]
+        with self.lock:
+            current = self.tables[entity].get(row_id)
+        if current is None:
+            return None
+        return self.upsert(entity, {**current, **data, id_field: row_id})
+
+    def sell(self, drug_id, qty):
+        """Take `qty` of a drug off stock, checked and taken under one lock."""
+        with self.lock:
+            drug = self.tables["drugs"].get(drug_id)
+            if drug is None:
+                return {"detail": "Drug not found"}, 400
+            if qty <= 0:
+                return {"detail": "Quantity must be greater than 0"}, 400
+            if drug["drug_quantity"] < qty:
+                return {"detail": f"Only {drug['drug_quantity']} left"}, 400
+            self._put("drugs", {**drug, "drug_quantity": drug["drug_quantity"] - qty})
+        return {"message": "sold"}, 200
+
+    def down(self):
+        return time.time() < self.outage_until
+
+    def delete(self, entity, row_id):
+        with self.lock:
+            if self.tables[entity].pop(row_id, None) is None:
+                return False
+            self.tombstones[entity][row_id] = self.tick()
+            return True
+
+    def rows(self, entity, sort_term="all", sort_dir="desc"):
+        _, _, id_field, name_field, date_field = ROUTES[entity]
+        with self.lock:
+            rows = list(self.tables[entity].values())
+        key = {"name": lambda r: str(field(r, name_field) or "").lower(),
+               "date": lambda r: str(field(r, date_field) or "")}.get(sort_term, lambda r: r[id_field])
+        return sorted(rows, key=key, reverse=sort_dir != "asc")
+
+    def changes(self, entity, since):
+        with self.lock:
+            rows = [r for r in self.tables[entity].values() if r["updated_at"] > since]
+            deleted = [i for i, stamp in self.tombstones[entity].items() if stamp > since]
+            cursor = max([since] + [r["updated_at"] for r in rows] + list(self.tombstones[entity].values()))
+        return {"rows": rows, "deleted": deleted, "cursor": cursor}
+
+    def search(self, entity, term):
+        term = term.lower()
+        with self.lock:
+            rows = list(self.tables[entity].values())
+        return [r for r in rows if term in json.dumps(r).lower()]
+
+
+def page(rows, id_field, after, size, id_order=None):
+    """The `size` rows that follow the row whose id is `after` in `rows`' order.
+
+    If that row was deleted meanwhile, id-ordered listings resume at the
+    next id in their direction.
+    """
+    start = 0
+    if after is not None:
+        ids = [str(r[id_field]) for r in rows]
+        if after in ids:
+            start = ids.index(after) + 1
+        elif id_order:
+            beyond = (lambda i: i < int(after)) if id_order == "desc" else (lambda i: i > int(after))
+            start = next((n for n, r in enumerate(rows) if beyond(r[id_field])), len(rows))
+        else:
+            start = len(rows)
+    return rows[start:start + size]
+
+
+def seed(store, count):
+    rnd = random.Random(7)
+    day = lambda: (datetime(2023, 1, 1) + timedelta(days=rnd.randrange(700))).strftime("%Y-%m-%d")
+    name = lambda: f"{rnd.choice(FIRST)} {rnd.choice(LAST)}"
+    patients = []
+    for i in range(1, count + 1):
+        patients.append(store.upsert("patients", {
+            "patient_id": i, "patient_name": name(), "patient_email": f"patient{i}@example.com",
+            "patient_phone": f"07{rnd.randrange(10**8):08d}", "patient_id_no": str(20000000 + i),
+            "patient_gender": rnd.choice(["male", "female"]), "patient_dob": f"{rnd.randrange(1950, 2020)}-{rnd.randrange(1, 13):02d}-{rnd.randrange(1, 29):02d}",
+            "patient_address": "Nairobi", "date_added": day(),
+        }))
+    brief = lambda: {k: v for k, v in rnd.choice(patients).items() if k in ("patient_id", "patient_name", "patient_phone")}
+    for i in range(1, max(count // 20, 10) + 1):
+        store.upsert("drugs", {
+            "drug_id": i, "drug_name": f"{rnd.choice(DRUGS)} {rnd.choice([250, 500, 1000])}mg",
+            "drug_category": rnd.choice(CATEGORIES), "drug_quantity": rnd.randrange(0, 500),
+            "drug_price": rnd.randrange(5, 400), "drug_expiry": day(), "date_added": day(),
+        })
+    for i in range(1, 21):
+        store.upsert("workers", {
+            "worker_id": i, "worker_name": name(), "worker_email": f"worker{i}@example.com",
+            "worker_phone": f"07{rnd.randrange(10**8):08d}", "worker_role": rnd.choice(["doctor", "lab", "pharmacy", "reception"]),
+            "date_added": day(),
+        })
+        store.upsert("services", {"service_id": i, "service_name": f"Service {i}", "service_desc": "Consultation", "service_price": 500 + i, "date_added": day()})
+        store.upsert("lab_tests", {"test_id": i, "test_name": f"Test {i}", "test_desc": "Blood panel", "test_price": 300 + i, "date_added": day()})
+    for i in range(1, count // 2 + 1):
+        patient = brief()
+        store.upsert("diagnoses", {"diagnosis_id": i, "patient": patient, "symptoms": "Fever", "findings": "Mild", "suggested_diagnosis": "Malaria", "date_added": day()})
+        store.upsert("prescriptions", {"prescription_id": i, "patient_name": patient["patient_name"], "entries": [{"drug_name": rnd.choice(DRUGS), "quantity": 2, "notes": "Twice daily"}], "date_added": day()})
+        store.upsert("appointments", {"appointment_id": i, "patient": patient, "appointment_desc": "Review", "date_requested": day(), "time_requested": "10:00"})
+        store.upsert("lab_requests", {"request_id": i, "patient": patient, "test": {"test_id": 1, "test_name": "Test 1", "test_desc": "Blood panel"}, "date_added": day()})
+        store.upsert("lab_results", {"result_id": i, "patient": patient, "observations": "Normal", "conclusion": "Negative", "date_added": day()})
+        store.upsert("billings", {"billing_id": i, "patient": patient, "item": rnd.choice(DRUGS), "source": "pharmacy", "qty": 1, "total": rnd.randrange(50, 3000), "created_at": day()})
+
+
+class Handler(BaseHTTPRequestHandler):
+    store = None
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        if status == 200 and self.command == "GET":
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+                return self.send_not_modified(etag)
+            headers = {**(headers or {}), "ETag": etag}
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.store.lock:
+            self.store.stats["requests"] += 1
+            self.store.stats["bytes_out"] += len(body)
+
+    def send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        with self.store.lock:
+            self.store.stats["requests"] += 1
+            self.store.stats["not_modified"] += 1
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def route(self):
+        parsed = urlparse(self.path)
+        path = parsed.path.strip("/") + "/"
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        return path, query
+
+    def do_GET(self):
+        path, query = self.route()
+        if path == "_stub/stats/":
+            return self.send_json(self.store.stats)
+        if self.store.down():
+            return self.send_json({"detail": "Service Unavailable"}, 503)
+        for entity, (fetch, search, *_) in ROUTES.items():
+            if path == fetch:
+                since = query.get("since")
+                with self.store.lock:
+                    self.store.stats["delta" if since else "full"] += 1
+                if since:
+                    return self.send_json(self.store.changes(entity, since))
+                rows = self.store.rows(entity, query.get("sort_term", "all"), query.get("sort_dir", "desc"))
+                if "page_size" in query:
+                    total = len(rows)
+                    rows = page(rows, ROUTES[entity][2], query.get("after"), int(query["page_size"]),
+                                id_order=query.get("sort_dir", "desc") if query.get("sort_term", "all") == "all" else None)
+                    return self.send_json(rows, headers={"X-Total-Count": str(total)})
+                return self.send_json(rows)
+            if path == search:
+                return self.send_json(self.store.search(entity, query.get("search_term", "")))
+        self.send_json({"detail": "Not Found"}, 404)
+
+    def do_HEAD(self):
+        # Keepalive pings; answered without a body or touching any data.
+        with self.store.lock:
+            self.store.stats["pings"] += 1
+        self.send_response(503 if self.store.down() else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        self.write("POST")
+
+    def do_PUT(self):
+        self.write("PUT")
+
+    def do_DELETE(self):
+        self.write("DELETE")
+
+    def write(self, method):
+        path, query = self.route()
+        if path.startswith("_stub/"):
+            return self.stub_hook(method, path)
+        if self.store.down():
+            return self.send_json({"detail": "Service Unavailable"}, 503)
+
+        key = self.headers.get("Idempotency-Key")
+        with self.store.lock:
+            seen = self.store.idempotent.get(key) if key else None
+            self.store.stats["replayed" if seen else "writes"] += 1
+        if seen:
+            return self.send_json(*seen)
+
+        payload, status = self.apply_write(method, path, query)
+        if key:
+            with self.store.lock:
+                self.store.idempotent[key] = (payload, status)
+        self.send_json(payload, status)
+
+    def apply_write(self, method, path, query):
+        if method == "PUT" and path == "drugs/drugs/drug-sale/":
+            return self.store.sell(int(query.get("drug_id", 0)), int(query.get("drug_qty", 0)))
+
+        for prefix, entity in WRITE_PREFIXES.items():
+            if not path.startswith(prefix):
+                continue
+            action = path[len(prefix):].strip("/")
+            row_id = next((int(v) for k, v in query.items() if k.endswith("_id") and k != "hospital_id"), None)
+            if action == "add" and method == "POST":
+                data = dict(self.read_json() or {})
+                data.pop(ROUTES[entity][2], None)
+                return {"message": "added", "data": self.store.upsert(entity, data)}, 200
+            if action == "edit" and method == "PUT":
+                row = self.store.edit(entity, row_id, dict(self.read_json() or {}))
+                return ({"message": "edited", "data": row}, 200) if row else ({"detail": "Not Found"}, 404)
+            if action == "delete" and method == "DELETE":
+                return ({"message": "deleted"}, 200) if self.store.delete(entity, row_id) else ({"detail": "Not Found"}, 404)
+        return {"detail": "Not Found"}, 404
+
+    def stub_hook(self, method, path):
+        parts = path.strip("/").split("/")
+        if method == "POST" and parts == ["_stub", "outage"]:
+            seconds = float((self.read_json() or {}).get("seconds", 0))
+            self.store.outage_until = time.time() + seconds
+            return self.send_json({"down_for": seconds})
+        if method == "POST" and len(parts) == 2 and parts[1] in ROUTES:
+            data = self.read_json()
+            rows = data if isinstance(data, list) else [data]
+            return self.send_json([self.store.upsert(parts[1], dict(r)) for r in rows])
+        if method == "DELETE" and len(parts) == 3 and parts[1] in ROUTES:
+            if self.store.delete(parts[1], int(parts[2])):
+                return self.send_json({"message": "deleted"})
+        self.send_json({"detail": "Not Found"}, 404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=8000, rows=200):
+    store = Store()
+    seed(store, rows)
+    handler = type("StubHandler", (Handler,), {"store": store})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--rows", type=int, default=200, help="patients to generate; other tables scale from it")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.rows)
+    print(f"Stub server on http://{args.host}:{args.port}/ ({args.rows} patients)")
+    server.serve_forever()
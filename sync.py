@@ -0,0 +1,160 @@
+from threading import Lock
+from urllib.parse import quote
+
+from config import SYNC_PAGE_SIZE
+from mirror import MIRROR, ENTITIES
+from network import HTTP
+
+
+class SyncEngine:
+    """Keeps the local mirror current by pulling only what changed.
+
+    Each entity remembers the cursor (high-water mark) the server handed back
+    on its last sync and sends it as `since` on the next `*-fetch` call. A
+    server that understands deltas answers with
+
+        {"rows": [changed or new rows], "deleted": [ids], "cursor": "..."}
+
+    and those rows are merged into the mirror, tombstoned ids removed. A
+    server that ignores `since` still returns the plain full list, which
+    simply replaces the entity's mirror as before.
+
+    A full pull (no cursor yet) walks the listing in keyset pages of
+    `page_size` rows, `after` being the last id received, so no single
+    response has to carry a whole hospital's records. Each page is merged
+    into the mirror as it lands, and `on_first_page()` runs once the first
+    one is in, so a view can paint it while the rest of the walk goes on in
+    the background; rows the walk did not see are dropped at the end. A
+    server that ignores the paging parameters answers the first request
+    with everything and the walk stops there.
+    """
+
+    def __init__(self, mirror=MIRROR, http=HTTP, page_size=SYNC_PAGE_SIZE):
+        self.mirror = mirror
+        self.http = http
+        self.page_size = page_size
+        self.lock = Lock()
+        self.applied = {}
+        self.walking = {}
+        self.pages = 0
+        self.full_pulls = 0
+        self.delta_pulls = 0
+        self.rows_received = 0
+
+    def pull(self, entity, url, on_done=None, on_first_page=None, **kwargs):
+        """Sync `entity` from its fetch `url`, then call `on_done(ok)`.
+
+        `on_first_page()` is called only by a full pull that spans several
+        pages, after the first of them is in the mirror.
+        """
+        cursor = self.mirror.cursor(entity)
+        if not cursor:
+            self.pull_full(entity, url, on_done, on_first_page, **kwargs)
+            return
+
+        def apply(data):
+            ok = self.apply(entity, data)
+            if on_done:
+                on_done(ok)
+
+        self.http.get_json(f"{url}&since={quote(str(cursor))}", apply, **kwargs)
+
+    def pull_full(self, entity, url, on_done=None, on_first_page=None, **kwargs):
+        # One page walk per entity at a time; later callers wait for its result.
+        with self.lock:
+            waiters = self.walking.get(entity)
+            if waiters is not None:
+                waiters.append(on_done)
+                return
+            self.walking[entity] = [on_done]
+
+        ok = False
+        try:
+            ok = self.walk(entity, url, on_first_page, **kwargs)
+        finally:
+            with self.lock:
+                waiters = self.walking.pop(entity)
+            for waiter in waiters:
+                if waiter:
+                    waiter(ok)
+
+    def walk(self, entity, url, on_first_page=None, **kwargs):
+        """Pull the listing at `url` a page at a time into the mirror; returns ok."""
+        rows, seen, after = [], set(), None
+        while True:
+            page_url = f"{url}&page_size={self.page_size}"
+            if after is not None:
+                page_url = f"{page_url}&after={quote(str(after))}"
+            data = self.fetch(page_url, **kwargs)
+            if not isinstance(data, list):
+                # A failure, or a first answer that is not a listing at all.
+                # Pages already merged stay; without a cursor the next sync
+                # walks again.
+                return self.apply(entity, data) if after is None else False
+
+            fresh = []
+            for row in data:
+                row_id = self.mirror.record_id(entity, row) if isinstance(row, dict) else None
+                if row_id is not None and row_id not in seen:
+                    seen.add(row_id)
+                    fresh.append(row)
+            rows.extend(fresh)
+            # A short page is the last one; a long one means paging was ignored.
+            last = len(data) != self.page_size or not fresh or fresh[-1].get(ENTITIES[entity]["id"]) is None
+            if last and after is None:
+                return self.apply(entity, rows)
+
+            self.mirror.upsert(entity, fresh)
+            if last:
+                self.mirror.delete(entity, self.mirror.ids(entity) - seen)
+                self.mirror.set_cursor(entity, high_water_mark(entity, rows))
+                self.full_pulls += 1
+                self.rows_received += len(rows)
+                return True
+            if after is None and on_first_page:
+                on_first_page()
+            after = fresh[-1].get(ENTITIES[entity]["id"])
+
+    def fetch(self, url, **kwargs):
+        self.pages += 1
+        return self.http.fetch_json(url, **kwargs)
+
+    def apply(self, entity, data):
+        # Coalesced pulls hand every waiter the same parsed object; merge it once.
+        with self.lock:
+            if data is not None and self.applied.get(entity) is data:
+                return True
+            self.applied[entity] = data
+
+        if isinstance(data, list):
+            self.mirror.replace_all(entity, data)
+            self.mirror.set_cursor(entity, high_water_mark(entity, data))
+            self.full_pulls += 1
+            self.rows_received += len(data)
+            return True
+
+        if isinstance(data, dict) and "rows" in data:
+            rows = data.get("rows") or []
+            self.mirror.upsert(entity, rows)
+            self.mirror.delete(entity, data.get("deleted") or [])
+            self.mirror.set_cursor(entity, data.get("cursor") or high_water_mark(entity, rows) or self.mirror.cursor(entity))
+            self.delta_pulls += 1
+            self.rows_received += len(rows)
+            return True
+
+        return False
+
+    def reset(self, entity=None):
+        for name in [entity] if entity else ENTITIES:
+            self.mirror.set_cursor(name, None)
+
+
+def high_water_mark(entity, rows):
+    """Latest `updated_at` among `rows`; None (full pull next time) if they carry none."""
+    stamps = [str(r["updated_at"]) for r in rows if isinstance(r, dict) and r.get("updated_at")]
+    if stamps:
+        return max(stamps)
+    return None
+
+
+SYNC = SyncEngine()
@@ -0,0 +1,169 @@
+from concurrent.futures import Future
+from threading import Thread, Lock
+import queue
+import time
+
+MAX_WORKERS = 6
+
+
+class TaskPool:
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self.queue = queue.Queue()
+        self.lock = Lock()
+        self.groups = {}
+        self.workers = []
+
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.peak_depth = 0
+
+    def _ensure_workers(self):
+        # Workers are daemon threads (like the per-request threads they
+        # replace) so a hung request never blocks the app from exiting.
+        if len(self.workers) >= self.max_workers:
+            return
+        worker = Thread(target=self._work, name=f"pool-worker-{len(self.workers)}", daemon=True)
+        self.workers.append(worker)
+        worker.start()
+
+    def submit(self, fn, *args, group=None, **kwargs):
+        future = Future()
+        with self.lock:
+            self.submitted += 1
+            if group is not None:
+                self.groups.setdefault(group, set()).add(future)
+                future.add_done_callback(lambda f, g=group: self._forget(g, f))
+            self.queue.put((future, fn, args, kwargs, time.monotonic()))
+            self.peak_depth = max(self.peak_depth, self.queue.qsize())
+            if self.running + self.queue.qsize() > len(self.workers):
+                self._ensure_workers()
+        return future
+
+    def cancel(self, group):
+        """Cancel every queued task of `group`; returns how many were dropped.
+
+        Tasks that already started keep running, callers that care about
+        late results should check `future.cancelled()` or their own tokens.
+        """
+        with self.lock:
+            futures = list(self.groups.get(group, ()))
+        dropped = 0
+        for future in futures:
+            if future.cancel():
+                dropped += 1
+        return dropped
+
+    def _forget(self, group, future):
+        with self.lock:
+            members = self.groups.get(group)
+            if members is None:
+                return
+            members.discard(future)
+            if not members:
+                del self.groups[group]
+
+    def _work(self):
+        while True:
+            future, fn, args, kwargs, _queued_at = self.queue.get()
+            if not future.set_running_or_notify_cancel():
+                with self.lock:
+                    self.cancelled += 1
+                continue
+
+            with self.lock:
+                self.running += 1
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                with self.lock:
+                    self.failed += 1
+                print(f"Background task {getattr(fn, '__name__', fn)} failed: {e}")
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.completed += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "workers": len(self.workers),
+                "max_workers": self.max_workers,
+                "running": self.running,
+                "queued": self.queue.qsize(),
+                "peak_queued": self.peak_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+            }
+
+
+class LoadBatch:
+    """Coordinates several fetches started together and times each stage.
+
+    `deliver(name)` returns the callback for one dataset. As each arrives,
+    `on_item(name, data)` runs straight away so its panel can render; once
+    all have landed `on_complete(results, timings)` runs; `timings` is the
+    batch's own dict and gains `final_pass_ms` and `total_ms` once that
+    call returns. A dataset that
+    arrives again (fresh rows replacing last session's) is rendered again,
+    and the final pass reruns if it already ran. Callbacks are expected on
+    the main thread (the fetch helpers already hop there). Cancelling a
+    batch makes any late arrivals no-ops.
+    """
+
+    def __init__(self, names, on_item, on_complete=None):
+        self.names = list(names)
+        self.pending = set(self.names)
+        self.on_item = on_item
+        self.on_complete = on_complete
+        self.results = {}
+        self.timings = {}
+        self.cancelled = False
+        self.started = time.perf_counter()
+
+    def elapsed_ms(self, since=None):
+        return round((time.perf_counter() - (since or self.started)) * 1000, 1)
+
+    def deliver(self, name):
+        def arrived(data):
+            if self.cancelled:
+                return
+            if name not in self.pending:
+                if name in self.results:
+                    self.results[name] = data
+                    self.on_item(name, data)
+                    if not self.pending:
+                        self.complete()
+                return
+            self.timings[f"{name}_fetch_ms"] = self.elapsed_ms()
+            self.pending.discard(name)
+            self.results[name] = data
+
+            render_start = time.perf_counter()
+            self.on_item(name, data)
+            self.timings[f"{name}_render_ms"] = self.elapsed_ms(render_start)
+
+            if not self.pending:
+                self.complete()
+        return arrived
+
+    def complete(self):
+        final_start = time.perf_counter()
+        if self.on_complete:
+            self.on_complete(self.results, self.timings)
+        self.timings["final_pass_ms"] = self.elapsed_ms(final_start)
+        self.timings["total_ms"] = self.elapsed_ms()
+
+    def cancel(self):
+        self.cancelled = True
+
+
+POOL = TaskPool()
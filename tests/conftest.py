@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pytest
+
+# The app modules open their settings store and queues under the user's
+# data directory at import time; keep them out of the real one.
+_home = tempfile.mkdtemp(prefix="neptune-tests-")
+os.environ["HOME"] = _home
+os.environ["APPDATA"] = _home
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import HOSPITAL  # noqa: E402
+from network import HttpClient  # noqa: E402
+from stub_server import make_server  # noqa: E402
+
+
+@pytest.fixture
+def stub():
+    """The stand-in API on a free local port, seeded with 250 patients."""
+    server = make_server("127.0.0.1", 0, rows=250)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    server.store = server.RequestHandlerClass.store
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def hospital(monkeypatch):
+    monkeypatch.setattr(HOSPITAL, "id", 1)
+
+
+@pytest.fixture
+def http():
+    client = HttpClient()
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def wait_for():
+    def wait(condition, timeout=10):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, "timed out waiting"
+            time.sleep(0.02)
+    return wait
@@ -0,0 +1,67 @@
+import pytest
+
+from mirror import LocalMirror
+from outbox import Outbox
+
+
+@pytest.fixture
+def drugs_screen(monkeypatch, tmp_path, stub, http):
+    """screens.drugs wired to the stub, with main-thread hops made direct."""
+    pytest.importorskip("kivymd")
+    from screens import drugs
+    monkeypatch.setattr(drugs, "SERVER_URL", stub.url)
+    monkeypatch.setattr(drugs, "OUTBOX", Outbox(str(tmp_path / "outbox.db"), http=http))
+    monkeypatch.setattr(drugs, "MIRROR", LocalMirror(str(tmp_path / "mirror.db")))
+    monkeypatch.setattr(drugs, "run_on_main_thread", lambda callback, data: callback(data))
+    return drugs
+
+
+def test_sale_lines_are_applied_independently(stub, http, tmp_path, wait_for):
+    # What a checkout queues: one drug-sale per line, keys sharing a batch prefix.
+    store = stub.store
+    drug = next(d for d in store.tables["drugs"].values() if d["drug_quantity"] > 0)
+    stock = drug["drug_quantity"]
+    outbox = Outbox(str(tmp_path / "outbox.db"), http=http)
+    results = []
+    for n, qty in enumerate((1, stock + 1)):
+        outbox.enqueue("PUT", f"{stub.url}drugs/drugs/drug-sale?hospital_id=1&drug_id={drug['drug_id']}&drug_qty={qty}",
+                       on_response=lambda status, payload: results.append((status, payload)), key=f"batch-{n}")
+    wait_for(lambda: len(results) == 2)
+
+    assert results == [(200, {"message": "sold"}), (400, {"detail": f"Only {stock - 1} left"})]
+    assert store.tables["drugs"][drug["drug_id"]]["drug_quantity"] == stock - 1
+
+
+def cart_line(drug, qty, known_stock=None):
+    stock = drug["drug_quantity"] if known_stock is None else known_stock
+    return {"drug_id": drug["drug_id"], "item": drug["drug_name"], "qty": qty,
+            "drug": {**drug, "drug_quantity": stock}}
+
+
+def test_each_cart_line_gets_its_own_result(stub, drugs_screen, wait_for):
+    store = stub.store
+    in_stock, short = [d for d in store.tables["drugs"].values() if d["drug_quantity"] > 0][:2]
+    stock, short_stock = in_stock["drug_quantity"], short["drug_quantity"]
+    # The second line passes the local check on a stale stock figure and
+    # is refused by the server.
+    cart = [cart_line(in_stock, 1), cart_line(short, short_stock + 1, known_stock=short_stock + 100)]
+    done = []
+
+    assert drugs_screen.start_cart_sale(cart, on_done=done.append)
+    wait_for(lambda: done)
+
+    lines = done[0]
+    assert [line["ok"] for line in lines] == [True, False]
+    assert lines[1]["detail"] == f"Only {short_stock} left"
+    assert store.tables["drugs"][in_stock["drug_id"]]["drug_quantity"] == stock - 1
+    assert store.tables["drugs"][short["drug_id"]]["drug_quantity"] == short_stock
+
+
+def test_a_cart_failing_the_local_check_is_not_sent(stub, drugs_screen):
+    drug = next(iter(stub.store.tables["drugs"].values()))
+    done = []
+
+    assert not drugs_screen.start_cart_sale([cart_line(drug, drug["drug_quantity"] + 1)], on_done=done.append)
+
+    assert [line["ok"] for line in done[0]] == [False]
+    assert stub.store.stats["writes"] == 0
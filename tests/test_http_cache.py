@@ -0,0 +1,21 @@
+def patients_url(stub):
+    return f"{stub.url}patients/patients-fetch/?hospital_id=1&sort_term=all&sort_dir=desc"
+
+
+def test_not_modified_reuses_the_parsed_body(stub, http):
+    first = http.fetch_json(patients_url(stub))
+    second = http.fetch_json(patients_url(stub))
+
+    assert second is first
+    assert stub.store.stats["not_modified"] == 1
+    assert http.cache.stats()["hits"] == 1
+
+
+def test_a_changed_listing_is_downloaded_again(stub, http):
+    first = http.fetch_json(patients_url(stub))
+    stub.store.upsert("patients", {"patient_name": "New Patient"})
+    second = http.fetch_json(patients_url(stub))
+
+    assert second is not first
+    assert len(second) == len(first) + 1
+    assert stub.store.stats["not_modified"] == 0
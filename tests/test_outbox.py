@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from outbox import Outbox
+
+
+@pytest.fixture
+def outbox(tmp_path, http):
+    return Outbox(str(tmp_path / "outbox.db"), http=http)
+
+
+def test_writes_queued_during_an_outage_are_replayed_in_order(stub, outbox, wait_for):
+    store = stub.store
+    store.outage_until = time.time() + 60
+    for name in ("First Queued", "Second Queued", "Third Queued"):
+        outbox.enqueue("POST", f"{stub.url}patients/patients-add/?hospital_id=1", json={"patient_name": name})
+    wait_for(lambda: outbox.retries >= 1)
+    assert outbox.pending() == 3
+
+    store.outage_until = 0
+    outbox.kick()
+    wait_for(lambda: outbox.pending() == 0)
+
+    added = sorted((row for row in store.tables["patients"].values() if row["patient_name"].endswith("Queued")),
+                   key=lambda row: row["patient_id"])
+    assert [row["patient_name"] for row in added] == ["First Queued", "Second Queued", "Third Queued"]
+
+
+def test_a_replayed_write_is_applied_once(stub, outbox, wait_for):
+    store = stub.store
+    drug = next(d for d in store.tables["drugs"].values() if d["drug_quantity"] > 0)
+    stock = drug["drug_quantity"]
+    url = f"{stub.url}drugs/drugs/drug-sale?hospital_id=1&drug_id={drug['drug_id']}&drug_qty=1"
+    results = []
+
+    outbox.enqueue("PUT", url, on_result=results.append, key="sale-1")
+    wait_for(lambda: len(results) == 1)
+    # Sent again under the same key, as after a crash between the server
+    # applying it and the request leaving the queue.
+    outbox.enqueue("PUT", url, on_result=results.append, key="sale-1")
+    wait_for(lambda: len(results) == 2)
+
+    assert results == [True, True]
+    assert store.tables["drugs"][drug["drug_id"]]["drug_quantity"] == stock - 1
+    assert store.stats["replayed"] == 1
+
+
+def test_a_refused_write_is_rejected_without_retrying(stub, outbox, wait_for):
+    responses = []
+    outbox.enqueue("PUT", f"{stub.url}patients/patients-edit/?hospital_id=1&patient_id=99999",
+                   json={"patient_name": "Nobody"}, on_response=lambda status, payload: responses.append(status))
+    wait_for(lambda: responses)
+
+    assert responses == [404]
+    assert outbox.pending() == 0
+    assert outbox.stats()["rejected"] == 1
@@ -0,0 +1,72 @@
+import pytest
+
+from mirror import LocalMirror
+from sync import SyncEngine
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    return LocalMirror(str(tmp_path / "mirror.db"))
+
+
+@pytest.fixture
+def engine(mirror, http):
+    return SyncEngine(mirror, http, page_size=100)
+
+
+def patients_url(stub):
+    return f"{stub.url}patients/patients-fetch/?hospital_id=1&sort_term=all&sort_dir=desc"
+
+
+def test_first_sync_walks_keyset_pages(stub, mirror, engine):
+    first_page, done = [], []
+    engine.pull("patients", patients_url(stub), done.append, lambda: first_page.append(len(mirror.ids("patients"))))
+
+    assert done == [True]
+    assert first_page == [100]
+    assert engine.pages == 3
+    assert mirror.ids("patients") == {str(i) for i in stub.store.tables["patients"]}
+    assert mirror.cursor("patients")
+
+
+def test_full_sync_drops_rows_the_server_no_longer_has(stub, mirror, engine):
+    mirror.upsert("patients", [{"patient_id": 99999, "patient_name": "Gone Away"}])
+
+    engine.pull("patients", patients_url(stub))
+
+    assert "99999" not in mirror.ids("patients")
+    assert len(mirror.ids("patients")) == 250
+
+
+def test_delta_sync_applies_changes_and_tombstones(stub, mirror, engine):
+    url = patients_url(stub)
+    engine.pull("patients", url)
+    store = stub.store
+    full_requests = store.stats["full"]
+
+    store.edit("patients", 1, {"patient_name": "Renamed Patient"})
+    store.delete("patients", 2)
+    added = store.upsert("patients", {"patient_name": "New Patient"})
+    done = []
+    engine.pull("patients", url, done.append)
+
+    assert done == [True]
+    assert store.stats["full"] == full_requests
+    assert store.stats["delta"] == 1
+    assert engine.delta_pulls == 1
+    assert engine.rows_received == 250 + 2
+    rows = mirror.get("patients", [1, 2, added["patient_id"]])
+    assert rows["1"]["patient_name"] == "Renamed Patient"
+    assert "2" not in rows
+    assert str(added["patient_id"]) in rows
+
+
+def test_delta_sync_with_nothing_changed_leaves_the_mirror_alone(stub, mirror, engine):
+    url = patients_url(stub)
+    engine.pull("patients", url)
+    version = mirror.version("patients")
+
+    engine.pull("patients", url)
+
+    assert mirror.version("patients") == version
+    assert len(mirror.ids("patients")) == 250
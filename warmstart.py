@@ -0,0 +1,63 @@
+from threading import Lock
+
+from mirror import MIRROR
+
+
+class WarmStart:
+    """Shows last session's rows while a list's first sync is still running.
+
+    The mirror already keeps every synced row on disk, so it is the
+    snapshot. On the first `all` fetch of an entity in a session, `serve`
+    hands the view the mirrored rows at once instead of leaving it empty
+    until the (often cold) backend answers. When that sync lands, the rows
+    are delivered again only if it changed something. Once an entity has
+    synced for the signed-in hospital, later fetches take the normal path.
+
+    Callers opt in with `warm=True` on the fetch helpers, which also has a
+    first sync deliver its opening page before the rest of the walk is in.
+    List views simply redraw on the later delivery; pickers that open a
+    dialog per delivery keep the single, fresh answer.
+    """
+
+    def __init__(self, mirror=MIRROR):
+        self.mirror = mirror
+        self.lock = Lock()
+        self.synced = set()
+        self.served = 0
+        self.refreshed = 0
+
+    def serve(self, entity, show_stale):
+        """Call `show_stale()` if `entity` has not synced yet this session.
+
+        Returns `settle(ok)`, to be called when the sync finishes; it says
+        whether the fresh rows still need delivering.
+        """
+        scope = (self.mirror.hospital(), entity)
+        with self.lock:
+            first = scope not in self.synced
+        if not first or not self.mirror.has(entity):
+            return lambda ok: True
+
+        version = self.mirror.version(entity)
+        show_stale()
+        with self.lock:
+            self.served += 1
+
+        def settle(ok):
+            if ok:
+                with self.lock:
+                    self.synced.add(scope)
+            if self.mirror.version(entity) == version:
+                return False
+            with self.lock:
+                self.refreshed += 1
+            return True
+
+        return settle
+
+    def stats(self):
+        with self.lock:
+            return {"served": self.served, "refreshed": self.refreshed, "synced": sorted(self.synced)}
+
+
+WARM = WarmStart()